@@ -0,0 +1,454 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Benchmark of the overhead of the Kedro-Neptune hooks on top of a plain `kedro run`.
+
+Every scenario generates a Kedro project with a synthetic pipeline of `--nodes` nodes, organised in parallel chains,
+and a catalog in which the outputs of the first `--datasets` nodes are saved to text files.
+The pipeline is run with the plugin hooks disabled (baseline) and enabled, alternately and every time
+in a fresh process, so that peak memory is measured for a single run.
+
+Neptune runs use the "debug" mode, which keeps all the metadata in memory, or the offline journal
+with `--backend offline`. Plugin options can be benchmarked with `--config`, e.g. `--config async_logging=true`.
+
+The results are written as JSON: for every runner and pipeline size, the median wall time of both modes,
+the overhead, the peak RSS of the main process and of the workers, and the latency of every plugin hook.
+`ParallelRunner` scenarios need the "fork" start method of `multiprocessing`.
+
+Usage:
+
+    $ python benchmarks/hooks_overhead.py --output results.json
+    $ python benchmarks/hooks_overhead.py --nodes 10,1000 --datasets 10 --runners sequential,thread --repeat 5
+"""
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+RUNNERS = ("sequential", "thread", "parallel")
+WORKERS = 4
+# Number of independent chains of nodes, which is the maximum parallelism of the pipeline
+CHAINS = 8
+
+SETTINGS_TEMPLATE = """\
+from kedro.config import OmegaConfigLoader
+
+CONFIG_LOADER_CLASS = OmegaConfigLoader
+CONFIG_LOADER_ARGS = {{
+    "config_patterns": {{
+        "credentials_neptune": ["*/credentials_neptune*"],
+        "neptune": ["*/neptune*"],
+    }}
+}}
+DISABLE_HOOKS_FOR_PLUGINS = {disabled_plugins!r}
+"""
+
+NODES_SOURCE = """\
+def source(parameters):
+    return "x" * parameters["size"]
+
+
+def step(value):
+    return value
+"""
+
+PIPELINE_REGISTRY_TEMPLATE = """\
+from kedro.pipeline import Pipeline, node
+
+from {package}.nodes import source, step
+
+
+def register_pipelines():
+    nodes = []
+    for index in range({nodes}):
+        if index < {chains}:
+            nodes.append(node(source, "params:source", f"output_{{index}}", name=f"node_{{index}}"))
+        else:
+            nodes.append(node(step, f"output_{{index - {chains}}}", f"output_{{index}}", name=f"node_{{index}}"))
+
+    return {{"__default__": Pipeline(nodes)}}
+"""
+
+PARAMETERS = """\
+source:
+  size: 64
+model:
+  learning_rate: 0.01
+  layers: [64, 32, 16]
+  optimizer:
+    name: adam
+    betas: [0.9, 0.999]
+"""
+
+
+def _write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(content)
+
+
+def create_project(path: str, nodes: int, datasets: int, plugin: bool, backend: str, options: Dict[str, str]) -> str:
+    """Creates a Kedro project with a synthetic pipeline and returns the name of its package."""
+    package = "neptune_benchmark"
+
+    _write(
+        os.path.join(path, "src", package, "settings.py"),
+        SETTINGS_TEMPLATE.format(disabled_plugins=() if plugin else ("kedro-neptune",)),
+    )
+    _write(os.path.join(path, "src", package, "__init__.py"), "")
+    _write(os.path.join(path, "src", package, "nodes.py"), NODES_SOURCE)
+    _write(
+        os.path.join(path, "src", package, "pipeline_registry.py"),
+        PIPELINE_REGISTRY_TEMPLATE.format(package=package, nodes=nodes, chains=CHAINS),
+    )
+
+    _write(os.path.join(path, "conf", "base", "parameters.yml"), PARAMETERS)
+    _write(
+        os.path.join(path, "conf", "base", "catalog.yml"),
+        "".join(
+            f"output_{index}:\n  type: text.TextDataset\n  filepath: data/output_{index}.txt\n"
+            for index in range(min(datasets, nodes))
+        ),
+    )
+
+    config = {
+        "project": "workspace/benchmark",
+        "base_namespace": "kedro",
+        "enabled": "true",
+        "cache_dir": os.path.join(path, "cache"),
+        "offline": "true" if backend == "offline" else "false",
+        "journal_dir": os.path.join(path, "journal"),
+        **options,
+    }
+    _write(
+        os.path.join(path, "conf", "base", "neptune.yml"),
+        "neptune:\n"
+        + "".join(f"  {key}: {json.dumps(value)}\n" for key, value in config.items())
+        + "  upload_source_files: []\n",
+    )
+    _write(os.path.join(path, "conf", "local", "credentials_neptune.yml"), 'neptune:\n  api_token: ""\n')
+
+    return package
+
+
+class HookLatencies:
+    """Measures the latency of every hook of `NeptuneHooks`.
+
+    The hook methods are wrapped on the class, so that forked `ParallelRunner` workers measure them too.
+    Workers append their measurements to their own file, since they are stopped without any notice.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._pid = os.getpid()
+        self._stats: Dict[str, List[int]] = {}
+        self._file = None
+
+    def install(self) -> None:
+        from kedro_neptune import NeptuneHooks
+
+        for name, method in list(vars(NeptuneHooks).items()):
+            if callable(method) and hasattr(method, "kedro_impl"):
+                setattr(NeptuneHooks, name, self._wrap(name, method))
+
+    def _wrap(self, name: str, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._record(name, time.perf_counter_ns() - start)
+
+        return wrapper
+
+    def _record(self, name: str, duration: int) -> None:
+        if os.getpid() == self._pid:
+            stats = self._stats.setdefault(name, [0, 0, 0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+            return
+
+        if self._file is None or self._file.closed:
+            os.makedirs(self._directory, exist_ok=True)
+            self._file = open(os.path.join(self._directory, f"{os.getpid()}.txt"), "a")
+        self._file.write(f"{name} {duration}\n")
+        self._file.flush()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        merged = {name: list(stats) for name, stats in self._stats.items()}
+
+        if os.path.isdir(self._directory):
+            for file_name in os.listdir(self._directory):
+                with open(os.path.join(self._directory, file_name)) as latencies_file:
+                    for line in latencies_file:
+                        name, duration = line.split()
+                        stats = merged.setdefault(name, [0, 0, 0])
+                        stats[0] += 1
+                        stats[1] += int(duration)
+                        stats[2] = max(stats[2], int(duration))
+
+        return {
+            name: {"calls": calls, "total_time": total / 1e9, "mean_time": total / calls / 1e9, "max_time": peak / 1e9}
+            for name, (calls, total, peak) in sorted(merged.items())
+        }
+
+
+def _peak_rss_mb(who: int) -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(who).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def run_once(nodes: int, datasets: int, runner: str, plugin: bool, backend: str, options: Dict[str, str]) -> dict:
+    """Runs the pipeline of a scenario in the current process, which should not be reused."""
+    import resource
+
+    with tempfile.TemporaryDirectory() as path:
+        package = create_project(path, nodes, datasets, plugin, backend, options)
+        sys.path.insert(0, os.path.join(path, "src"))
+        os.chdir(path)
+        os.environ["NEPTUNE_CUSTOM_RUN_ID"] = f"benchmark-{os.getpid()}-{time.time_ns()}"
+
+        import neptune
+        from kedro.framework.project import configure_project
+        from kedro.framework.session import KedroSession
+        from kedro.runner import (
+            ParallelRunner,
+            SequentialRunner,
+            ThreadRunner,
+        )
+
+        import kedro_neptune  # noqa: F401
+
+        init_run = neptune.init_run
+
+        @functools.wraps(init_run)
+        def init_debug_run(*args, **kwargs):
+            return init_run(*args, **{**kwargs, "mode": "debug"})
+
+        neptune.init_run = init_debug_run
+
+        latencies = HookLatencies(os.path.join(path, "latencies"))
+        if plugin:
+            latencies.install()
+
+        if runner == "parallel":
+            multiprocessing.set_start_method("fork", force=True)
+            kedro_runner = ParallelRunner(max_workers=WORKERS)
+        elif runner == "thread":
+            kedro_runner = ThreadRunner(max_workers=WORKERS)
+        else:
+            kedro_runner = SequentialRunner()
+
+        configure_project(package)
+
+        start = time.perf_counter()
+        with KedroSession.create(project_path=path) as session:
+            session.run(runner=kedro_runner)
+        wall_time = time.perf_counter() - start
+
+        return {
+            "wall_time": wall_time,
+            "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+            "peak_worker_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if runner == "parallel" else None,
+            "hooks": latencies.stats() if plugin else {},
+        }
+
+
+def _run_in_subprocess(spec: dict, timeout: float) -> dict:
+    with tempfile.TemporaryDirectory() as path:
+        result_path = os.path.join(path, "result.json")
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-once", json.dumps(spec), "--result", result_path],
+            check=True,
+            timeout=timeout,
+            stdout=subprocess.DEVNULL,
+        )
+        with open(result_path) as result_file:
+            return json.load(result_file)
+
+
+def _summarize(runs: List[dict]) -> Dict[str, Any]:
+    def peak(key: str) -> Optional[float]:
+        values = [run[key] for run in runs if run[key] is not None]
+        return max(values) if values else None
+
+    return {
+        "wall_time": statistics.median(run["wall_time"] for run in runs),
+        "wall_times": [run["wall_time"] for run in runs],
+        "peak_rss_mb": peak("peak_rss_mb"),
+        "peak_worker_rss_mb": peak("peak_worker_rss_mb"),
+    }
+
+
+def _summarize_hooks(runs: List[dict]) -> Dict[str, Dict[str, float]]:
+    hooks: Dict[str, Dict[str, float]] = {}
+    for run in runs:
+        for name, stats in run["hooks"].items():
+            merged = hooks.setdefault(name, {"calls": 0, "total_time": 0.0, "mean_time": 0.0, "max_time": 0.0})
+            merged["calls"] += stats["calls"]
+            merged["total_time"] += stats["total_time"]
+            merged["max_time"] = max(merged["max_time"], stats["max_time"])
+
+    # Per run, averaged over the repeats
+    for stats in hooks.values():
+        stats["mean_time"] = stats["total_time"] / stats["calls"] if stats["calls"] else 0.0
+        stats["calls"] //= len(runs)
+        stats["total_time"] /= len(runs)
+
+    return hooks
+
+
+def benchmark(
+    nodes: int, datasets: int, runner: str, repeat: int, backend: str, options: Dict[str, str], timeout: float
+) -> dict:
+    baseline_runs, plugin_runs = [], []
+    spec = {"nodes": nodes, "datasets": datasets, "runner": runner, "backend": backend, "options": options}
+
+    # Alternate the modes, so that a slower period of the machine affects both
+    for _ in range(repeat):
+        baseline_runs.append(_run_in_subprocess({**spec, "plugin": False}, timeout))
+        plugin_runs.append(_run_in_subprocess({**spec, "plugin": True}, timeout))
+
+    baseline = _summarize(baseline_runs)
+    plugin = _summarize(plugin_runs)
+    overhead = plugin["wall_time"] - baseline["wall_time"]
+
+    return {
+        "runner": runner,
+        "nodes": nodes,
+        "datasets": min(datasets, nodes),
+        "baseline": baseline,
+        "plugin": {**plugin, "hooks": _summarize_hooks(plugin_runs)},
+        "overhead": {
+            "time": overhead,
+            "ratio": overhead / baseline["wall_time"] if baseline["wall_time"] > 0 else None,
+            "time_per_node": overhead / nodes,
+            "peak_rss_mb": (
+                plugin["peak_rss_mb"] - baseline["peak_rss_mb"]
+                if plugin["peak_rss_mb"] is not None and baseline["peak_rss_mb"] is not None
+                else None
+            ),
+        },
+    }
+
+
+def _environment() -> Dict[str, Any]:
+    from importlib.metadata import version
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "kedro": version("kedro"),
+        "neptune": version("neptune"),
+        "kedro_neptune": version("kedro-neptune"),
+        "timestamp": time.time(),
+    }
+
+
+def _parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_options(options: List[str]) -> Dict[str, str]:
+    parsed = {}
+    for option in options:
+        key, separator, value = option.partition("=")
+        if not separator:
+            raise argparse.ArgumentTypeError(f"Plugin options are passed as key=value, got: {option}")
+        parsed[key.strip()] = value.strip()
+
+    return parsed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the overhead of the Kedro-Neptune hooks.")
+    parser.add_argument("--nodes", default="10,1000,10000", help="Comma-separated numbers of pipeline nodes.")
+    parser.add_argument("--datasets", default="10,1000", help="Comma-separated numbers of catalog datasets.")
+    parser.add_argument("--runners", default=",".join(RUNNERS), help="Comma-separated Kedro runners.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs of every scenario and mode.")
+    parser.add_argument("--backend", choices=("debug", "offline"), default="debug", help="Neptune backend.")
+    parser.add_argument("--config", action="append", default=[], help="Plugin option as key=value.")
+    parser.add_argument("--timeout", type=float, default=3600, help="Timeout of a single run in seconds.")
+    parser.add_argument("--output", default=None, help="Path of the JSON results, printed when not set.")
+    parser.add_argument("--run-once", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_once is not None:
+        result = run_once(**json.loads(args.run_once))
+        with open(args.result, "w") as result_file:
+            json.dump(result, result_file)
+        return
+
+    runners = _parse_list(args.runners)
+    unknown = set(runners) - set(RUNNERS)
+    if unknown:
+        parser.error(f"Unknown runners: {', '.join(sorted(unknown))}")
+    if "parallel" in runners and "fork" not in multiprocessing.get_all_start_methods():
+        print("ParallelRunner scenarios are skipped, the fork start method is not available", file=sys.stderr)
+        runners.remove("parallel")
+
+    options = _parse_options(args.config)
+    results = []
+    for runner in runners:
+        for nodes in map(int, _parse_list(args.nodes)):
+            # Catalogs larger than the pipeline would repeat the previous scenario
+            for datasets in sorted({min(int(datasets), nodes) for datasets in _parse_list(args.datasets)}):
+                result = benchmark(nodes, datasets, runner, args.repeat, args.backend, options, args.timeout)
+                results.append(result)
+                print(
+                    f"{runner:>10} nodes={nodes:<6} datasets={result['datasets']:<5} "
+                    f"baseline={result['baseline']['wall_time']:.3f}s plugin={result['plugin']['wall_time']:.3f}s "
+                    f"overhead={result['overhead']['time_per_node'] * 1e3:.3f}ms/node",
+                    file=sys.stderr,
+                )
+
+    report = {
+        "environment": _environment(),
+        "parameters": {"repeat": args.repeat, "backend": args.backend, "options": options, "workers": WORKERS},
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
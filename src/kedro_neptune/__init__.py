@@ -14,6 +14,8 @@
 # limitations under the License.
 #
 
+from __future__ import annotations
+
 __all__ = [
     "NeptuneRunDataset",
     "NeptuneFileDataset",
@@ -23,25 +25,36 @@ __all__ = [
 ]
 
 import hashlib
+import inspect
+import io
 import json
+import logging
 import os
 import sys
+import threading
 import time
 import urllib.parse
+from functools import partial
 from typing import (
+    IO,
+    TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
+    Iterable,
+    List,
     Optional,
+    Tuple,
+    Union,
 )
 
 import click
 from kedro.framework.hooks import hook_impl
 from kedro.framework.project import settings
-from kedro.framework.session import KedroSession
-from kedro.framework.startup import ProjectMetadata
 from kedro.io import (
     DataCatalog,
     MemoryDataset,
+    SharedMemoryDataset,
 )
 from kedro.io.core import (
     AbstractDataset,
@@ -51,29 +64,105 @@ from kedro.io.core import (
 from kedro.pipeline import Pipeline
 from kedro.pipeline.node import Node
 from kedro_datasets.text import TextDataset
-from ruamel.yaml import YAML
 
-from kedro_neptune.config import get_neptune_config
+from kedro_neptune.catalog_index import CatalogIndex
+from kedro_neptune.config import (
+    NeptuneConfig,
+    get_neptune_config,
+    neptune_config_cache,
+)
+from kedro_neptune.coordinator import (
+    Coordinator,
+    CoordinatorClient,
+    coordinator_address,
+)
+from kedro_neptune.data_profiler import profile_data
+from kedro_neptune.dataset_io import (
+    DatasetIOTracker,
+    dataset_size,
+    read_io_records,
+    write_io_records,
+)
+from kedro_neptune.dependencies import DependencyCache
+from kedro_neptune.file_manifest import (
+    FileManifest,
+    hash_stream,
+)
+from kedro_neptune.file_uploader import (
+    FileUploader,
+    UploadResult,
+)
+from kedro_neptune.journal import (
+    Journal,
+    list_journals,
+    read_journal_metadata,
+    sync_journal,
+)
+from kedro_neptune.lineage import (
+    LineageIndex,
+    load_version,
+    save_version,
+)
+from kedro_neptune.neptune_client import (
+    CUSTOM_RUN_ID_ENV_NAME,
+    neptune_client,
+)
+from kedro_neptune.node_cache import (
+    NodeCache,
+    dataset_fingerprint,
+    function_fingerprint,
+    node_fingerprint,
+    read_fingerprints,
+    replay_function,
+    value_fingerprint,
+    write_fingerprints,
+)
+from kedro_neptune.node_profiler import NodeProfiler
+from kedro_neptune.node_timer import NodeTimer
+from kedro_neptune.parameters import (
+    encode_parameters,
+    find_parameter,
+)
+from kedro_neptune.partitions import (
+    PartitionLister,
+    PartitionListing,
+    is_partitioned,
+    sample_partitions,
+)
+from kedro_neptune.pipeline_analysis import analyze_pipeline
+from kedro_neptune.run_pool import run_pool
+from kedro_neptune.source_snapshot import SourceSnapshot
+from kedro_neptune.timeline import (
+    chrome_trace,
+    gantt_html,
+    read_intervals,
+    write_intervals,
+)
 from kedro_neptune.version import __version__
+from kedro_neptune.writer import (
+    AsyncWriter,
+    apply_record,
+)
 
-try:
-    # neptune-client>=1.0.0 package structure
+if TYPE_CHECKING:
     import neptune
-    from neptune.envs import CUSTOM_RUN_ID_ENV_NAME
+    from kedro.framework.startup import ProjectMetadata
     from neptune.handler import Handler
-    from neptune.integrations.utils import join_paths
     from neptune.types import File
-    from neptune.utils import stringify_unsupported
-except ImportError:
-    # neptune-client=0.9.0+ package structure
-    import neptune.new as neptune
-    from neptune.new.envs import CUSTOM_RUN_ID_ENV_NAME
-    from neptune.new.handler import Handler
-    from neptune.new.integrations.utils import join_paths
-    from neptune.new.types import File
-    from neptune.new.utils import stringify_unsupported
+
+    from kedro_neptune.sketches import DatasetSketch
+
+logger = logging.getLogger(__name__)
 
 INTEGRATION_VERSION_KEY = "source_code/integrations/kedro-neptune"
+SOURCE_SNAPSHOT_KEY = "source_code/snapshot"
+REQUIREMENTS_KEY = "source_code/requirements"
+NODE_CACHE_DIR_NAME = "node_cache"
+LINEAGE_DIR_NAME = "lineage"
+SKETCH_DIR_NAME = "sketches"
+DRIFT_DIR_NAME = "drift"
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
 
 
 @click.group(name="Neptune")
@@ -118,6 +207,13 @@ INITIAL_NEPTUNE_CATALOG = """\
 #   type: kedro_neptune.NeptuneFileDataset
 #   filepath: data/01_raw/iris.csv
 #
+# Large files can be uploaded without loading them into memory with streaming: true
+#
+# example_model_checkpoint:
+#   type: kedro_neptune.NeptuneFileDataset
+#   filepath: data/06_models/checkpoint.pt
+#   streaming: true
+#
 # You can use kedro_neptune.NeptuneFileDataset in any catalog including conf/base/catalog.yml
 #
 """
@@ -193,6 +289,9 @@ def init(
     For detailed instructions and examples, see the Kedro-Neptune integration guide:
         https://docs.neptune.ai/integrations/kedro/
     """
+    from kedro.framework.session import KedroSession
+    from ruamel.yaml import YAML
+
     session = KedroSession(metadata.package_name)
     context = session.load_context()
 
@@ -233,10 +332,120 @@ def init(
             click.echo(f"Creating catalog_neptune.yml configuration file: {context.catalog_file}")
 
 
+@neptune_commands.command()
+@click.option("--run-id", "run_ids", multiple=True)
+@click.option("--batch-size", default=1000, type=int)
+@click.pass_obj
+def sync(metadata: ProjectMetadata, run_ids: Tuple[str, ...], batch_size: int):
+    """Command line interface (CLI) command for sending runs logged in offline mode to Neptune.
+
+    With `offline: true` in the neptune.yml configuration file, runs are written to local journals
+    in the `journal_dir` directory (by default 'logs/neptune') instead of being sent to Neptune.
+    This command replays the journals in batches. The progress is saved after every batch,
+    so an interrupted sync can be resumed by running the command again.
+
+    Args:
+        run-id: Custom run ID of the journal to send, can be passed several times.
+            All the journals are sent by default.
+        batch-size: Number of records sent before the progress is saved. Default is 1000.
+
+    Examples:
+
+        Send all the journals:
+        $ kedro neptune sync
+
+        Send a single run:
+        $ kedro neptune sync --run-id 5f2b8c7e
+    """
+    config = get_neptune_config(settings)
+    journal_dir = os.path.join(metadata.project_path, config.journal_dir)
+
+    for path in list_journals(journal_dir):
+        journal = read_journal_metadata(path)
+        if run_ids and journal["run_id"] not in run_ids:
+            continue
+
+        click.echo(f"Sending run {journal['run_id']} from {path}")
+        run = neptune_client().neptune.init_run(
+            api_token=config.api_token,
+            project=journal["project"] or config.project,
+            custom_run_id=journal["run_id"],
+            capture_stdout=False,
+            capture_stderr=False,
+            capture_hardware_metrics=False,
+            capture_traceback=False,
+            source_files=[],
+        )
+        try:
+            sent = sync_journal(
+                path,
+                run,
+                batch_size=batch_size,
+                on_batch=lambda applied: click.echo(f"  {applied} records sent"),
+            )
+        finally:
+            run.stop()
+
+        click.echo(f"Sent {sent} new records of run {journal['run_id']}")
+
+
+@neptune_commands.command()
+@click.argument("dataset")
+@click.argument("version")
+@click.pass_obj
+def lineage(metadata: ProjectMetadata, dataset: str, version: str):
+    """Command line interface (CLI) command for finding the run that saved a version of a versioned dataset.
+
+    Versions saved by runs are indexed locally in the `cache_dir` directory, so the run is found without
+    querying Neptune.
+
+    Args:
+        dataset: Name of the dataset in the catalog.
+        version: Version of the dataset, e.g. 2024-01-31T10.15.00.000Z.
+
+    Examples:
+
+        $ kedro neptune lineage model 2024-01-31T10.15.00.000Z
+    """
+    config = get_neptune_config(settings)
+    index = LineageIndex(directory=os.path.join(metadata.project_path, config.cache_dir, LINEAGE_DIR_NAME))
+
+    entry = index.lookup(name=dataset, version=version)
+    if entry is None:
+        raise click.ClickException(f"Version {version} of the {dataset} dataset was not saved by an indexed run")
+
+    saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.time))
+    click.echo(f"Run: {entry.run_id}")
+    click.echo(f"Project: {entry.project or ''}")
+    click.echo(f"Node: {entry.node or ''}")
+    click.echo(f"Saved: {saved}")
+
+
 def _connection_mode(enabled: bool) -> str:
     return "async" if enabled else "debug"
 
 
+def _run_key() -> str:
+    return os.getenv(CUSTOM_RUN_ID_ENV_NAME, "")
+
+
+def _create_writer(run: neptune.Run, config: NeptuneConfig) -> AsyncWriter:
+    return AsyncWriter(
+        run=run,
+        max_in_flight=config.max_in_flight_operations,
+        flush_interval=config.flush_interval,
+        backpressure=config.backpressure,
+    )
+
+
+def _init_run(config: NeptuneConfig, run_id: str, **kwargs) -> Union[neptune.Run, Journal]:
+    """Creates a Neptune run, or a local journal of the run in offline mode."""
+    if config.offline:
+        return Journal(directory=config.journal_dir, run_id=run_id, project=config.project)
+
+    return neptune_client().neptune.init_run(api_token=config.api_token, project=config.project, **kwargs)
+
+
 class NeptuneRunDataset(AbstractDataset):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -244,7 +453,7 @@ class NeptuneRunDataset(AbstractDataset):
         self._loaded: bool = False
 
     def _save(self, data: Dict[str, Any]) -> None:
-        if self._run is not None:
+        if self._run is not None and not get_neptune_config(settings).async_logging:
             self._run.sync(wait=True)
 
     def _describe(self) -> Dict[str, Any]:
@@ -254,6 +463,10 @@ class NeptuneRunDataset(AbstractDataset):
         return self._run is not None
 
     def __setstate__(self, state):
+        config_cache = state.pop("_config_cache", None)
+        if config_cache is not None:
+            neptune_config_cache.update(config_cache)
+
         self.__dict__ = state
         if self._loaded:
             self._set_run()
@@ -261,21 +474,33 @@ class NeptuneRunDataset(AbstractDataset):
     def __getstate__(self) -> dict:
         properties = self.__dict__.copy()
         properties["_run"] = None
+        properties["_config_cache"] = neptune_config_cache
         return properties
 
     def _set_run(self):
         neptune_config = get_neptune_config(settings)
 
-        if neptune_config.enabled:
-            self._run = neptune.init_run(
-                api_token=neptune_config.api_token,
-                project=neptune_config.project,
-                capture_stdout=False,
-                capture_stderr=False,
-                capture_hardware_metrics=False,
-                capture_traceback=False,
-                source_files=None,
-                dependencies=neptune_config.dependencies,
+        if not neptune_config.enabled:
+            return
+
+        address = coordinator_address()
+        if address is not None:
+            # ParallelRunner worker in coordinator mode, records are sent to the main process
+            self._run = run_pool.acquire(key=_run_key(), factory=lambda: CoordinatorClient(*address))
+        else:
+            self._run = run_pool.acquire(
+                key=_run_key(),
+                factory=lambda: _init_run(
+                    config=neptune_config,
+                    run_id=_run_key(),
+                    mode=_connection_mode(neptune_config.enabled),
+                    capture_stdout=False,
+                    capture_stderr=False,
+                    capture_hardware_metrics=False,
+                    capture_traceback=False,
+                    source_files=None,
+                    # Dependencies are logged once by `before_pipeline_run`, not by every worker
+                ),
             )
 
     def _load(self) -> Optional[Handler]:
@@ -291,11 +516,9 @@ class NeptuneRunDataset(AbstractDataset):
         return self._run[neptune_config.base_namespace]
 
     def _release(self) -> None:
-        if self._run is not None:
-            self._run.sync(wait=True)
-            del self._run
-            self._run = None
-            self._loaded = False
+        # The run itself stays open in the run pool until the end of the pipeline
+        self._run = None
+        self._loaded = False
 
 
 class BinaryFileDataset(TextDataset):
@@ -309,18 +532,19 @@ class BinaryFileDataset(TextDataset):
         super().__init__(filepath=filepath, version=version, credentials=credentials, fs_args=fs_args)
 
     def _describe(self) -> Dict[str, Any]:
-        load_path = get_filepath_str(self._get_load_path(), self._protocol)
-
-        path = urllib.parse.urlparse(load_path).path
+        # Not the load path, which does not exist before the first version of a versioned file is saved
+        path = urllib.parse.urlparse(get_filepath_str(self._filepath, self._protocol)).path
         extension = os.path.splitext(path)[1][1:]
 
         return dict(extension=extension, **super()._describe())
 
     def _save(self, data: bytes) -> None:
-        path = get_filepath_str(self._get_load_path(), self._protocol)
+        path = get_filepath_str(self._get_save_path(), self._protocol)
 
         with self._fs.open(path, mode="wb") as fs_file:
-            return fs_file.write(data)
+            fs_file.write(data)
+
+        self._invalidate_cache()
 
     def _load(self) -> bytes:
         path = get_filepath_str(self._get_load_path(), self._protocol)
@@ -329,6 +553,42 @@ class BinaryFileDataset(TextDataset):
             return fs_file.read()
 
 
+class _ClosingStream(io.BufferedIOBase):
+    """Read-only stream that closes the wrapped stream once it is read to the end.
+
+    Uploads of streams are deferred by asynchronous logging and by the offline journal, so the stream cannot be closed
+    by the code logging it. The wrapped stream is also closed when the upload fails or is dropped, as the stream is
+    closed when it is garbage collected.
+    """
+
+    def __init__(self, stream: IO[bytes]):
+        super().__init__()
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return not self.closed and self._stream.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._stream.seek(offset, whence)
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if self.closed:
+            return b""
+
+        data = self._stream.read(-1 if size is None else size)
+        if not data or size is None or size < 0:
+            self.close()
+        return data
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stream.close()
+        super().close()
+
+
 class NeptuneFileDataset(BinaryFileDataset):
     """NeptuneFileDataset is a Kedro Dataset that lets you log files to Neptune.
 
@@ -342,6 +602,12 @@ class NeptuneFileDataset(BinaryFileDataset):
             Same as for Kedro TextDataset.
         fs_args: Extra arguments to pass into underlying filesystem class constructor.
             Same as for Kedro TextDataset.
+        streaming: If True, the file is uploaded without reading it into memory:
+            local files are uploaded by path, and remote files are streamed. Default is False.
+            Catalog files uploaded concurrently (`upload_concurrency` greater than 1) are always streamed.
+        chunk_size: Size in bytes of the read buffer used when streaming remote files. Default is 8 MiB.
+        version: Version of a versioned file, set by Kedro with `versioned: true`.
+            Same as for Kedro TextDataset.
 
     Examples:
         Log a file to Neptune from any Kedro catalog YML file:
@@ -360,6 +626,21 @@ class NeptuneFileDataset(BinaryFileDataset):
                 type: kedro_neptune.NeptuneFileDataset
                 filepath: data/01_raw/iris.csv
 
+        Log a versioned file:
+
+            example_model@neptune:
+                type: kedro_neptune.NeptuneFileDataset
+                filepath: data/06_models/clf.pkl
+                versioned: true
+
+        Log a large file without loading it into memory:
+
+            example_model_checkpoint:
+                type: kedro_neptune.NeptuneFileDataset
+                filepath: s3://bucket/models/checkpoint.pt
+                streaming: true
+                chunk_size: 16777216
+
     For details, see the documentation:
         https://docs.neptune.ai/api/integrations/kedro/#neptunefiledataset
         https://docs.neptune.ai/integrations/kedro/
@@ -370,32 +651,165 @@ class NeptuneFileDataset(BinaryFileDataset):
         filepath: str,
         credentials: Dict[str, Any] = None,
         fs_args: Dict[str, Any] = None,
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        version: Version = None,
     ):
-        super().__init__(filepath=filepath, version=None, credentials=credentials, fs_args=fs_args)
+        super().__init__(filepath=filepath, version=version, credentials=credentials, fs_args=fs_args)
+        self._streaming = streaming
+        self._chunk_size = chunk_size
+
+    @property
+    def streaming(self) -> bool:
+        return self._streaming
+
+    @property
+    def location(self) -> str:
+        return f"{self._protocol}://{get_filepath_str(self._get_load_path(), self._protocol)}"
+
+    def file_info(self) -> Tuple[int, Optional[str]]:
+        info = self._fs.info(get_filepath_str(self._get_load_path(), self._protocol))
+        mtime = info.get("mtime") or info.get("LastModified") or info.get("last_modified") or info.get("ETag")
+
+        return info.get("size"), None if mtime is None else str(mtime)
+
+    def content_hash(self) -> Tuple[str, int]:
+        path = get_filepath_str(self._get_load_path(), self._protocol)
 
+        with self._fs.open(path, mode="rb", block_size=self._chunk_size) as fs_file:
+            return hash_stream(fs_file, chunk_size=self._chunk_size)
+
+    def as_file(self) -> File:
+        """Returns a Neptune `File` that reads the dataset without loading it into memory.
+
+        Local files are uploaded directly from their path. Files on other filesystems are read as a stream
+        with a read buffer of `chunk_size` bytes, which is closed once the file is uploaded.
+        """
+        File = neptune_client().File
+        path = get_filepath_str(self._get_load_path(), self._protocol)
+
+        if self._protocol == "file":
+            return File(path)
+
+        extension = self._describe().get("extension") or None
+        stream = _ClosingStream(self._fs.open(path, mode="rb", block_size=self._chunk_size))
+        return File.from_stream(stream, extension=extension)
+
+
+def log_file_dataset(
+    namespace: Handler,
+    name: str,
+    dataset: NeptuneFileDataset,
+    manifest: Optional[FileManifest] = None,
+    streaming: Optional[bool] = None,
+):
+    if streaming is None:
+        streaming = dataset.streaming
 
-def log_file_dataset(namespace: Handler, name: str, dataset: NeptuneFileDataset):
     if not namespace.container.exists(f"{namespace._path}/{name}"):
-        data = dataset.load()
-        extension = dataset._describe().get("extension")
+        if manifest is not None:
+            size, mtime = dataset.file_info()
+            digest = manifest.content_hash(key=dataset.location, size=size, mtime=mtime, compute=dataset.content_hash)
+            reference = manifest.find_upload(digest)
+
+            if reference is not None:
+                namespace[name] = {"sha256": digest, **reference}
+                manifest.record_skip(size)
+                return
+
+        if streaming:
+            file = dataset.as_file()
+        else:
+            data = dataset.load()
+            extension = dataset._describe().get("extension")
 
-        try:
-            file = File.create_from(data)
-        except TypeError:
-            file = File.from_content(data, extension=extension)
+            File = neptune_client().File
+            try:
+                file = File.create_from(data)
+            except TypeError:
+                file = File.from_content(data, extension=extension)
 
         namespace[name].upload(file)
 
+        if manifest is not None:
+            attribute_path = neptune_client().join_paths(namespace._path, name)
+            manifest.record_upload(digest=digest, size=size, attribute_path=attribute_path)
+
+
+def _file_size(dataset: NeptuneFileDataset) -> int:
+    try:
+        return dataset.file_info()[0] or 0
+    except Exception:  # noqa: B902
+        return 0
+
+
+def log_file_datasets(
+    namespace: Handler,
+    datasets: List[Tuple[str, NeptuneFileDataset]],
+    manifest: Optional[FileManifest] = None,
+    uploader: Optional[FileUploader] = None,
+):
+    if uploader is None:
+        uploader = FileUploader(max_workers=1)
+
+    def on_done(result: UploadResult) -> None:
+        namespace[f"uploads/files/{result.name}"] = result.to_dict()
+        namespace["uploads/completed"] = uploader.completed
+        namespace["uploads/total"] = uploader.total
+
+    # Files uploaded by the pool are never loaded, so that the largest files are not held in memory at once
+    streaming = True if uploader.concurrent else None
+    jobs = [
+        (
+            name,
+            _file_size(dataset),
+            partial(
+                log_file_dataset,
+                namespace=namespace["files"],
+                name=name,
+                dataset=dataset,
+                manifest=manifest,
+                streaming=streaming,
+            ),
+        )
+        for name, dataset in datasets
+    ]
+    uploader.run(jobs, on_done=on_done)
+
+
+def partition_file_datasets(
+    name: str, dataset: AbstractDataset, listing: PartitionListing, limit: int
+) -> List[Tuple[str, NeptuneFileDataset]]:
+    """Returns file datasets of at most `limit` of the partitions added since the dataset was last listed,
+    sampled uniformly.
+
+    Partitions of versioned datasets are directories of versions, which are not logged.
+    """
+    if "versioned" in dataset._dataset_config:
+        return []
+
+    return [
+        (
+            f"{name}/{partition_id}",
+            NeptuneFileDataset(
+                filepath=dataset._join_protocol(dataset._partition_to_path(partition_id)),
+                credentials=dataset._credentials,
+                fs_args=dataset._fs_args,
+                streaming=True,
+            ),
+        )
+        for partition_id in sample_partitions(listing.added, limit)
+    ]
+
 
-def log_parameters(namespace: Handler, catalog: DataCatalog):
-    parameters = dict(catalog.load("parameters"))
+def log_parameters(namespace: Handler, catalog: DataCatalog) -> Dict[str, Any]:
+    parameters = encode_parameters(dict(catalog.load("parameters")))
 
-    for param_name, param_value in parameters.items():
-        value = param_value
-        if not isinstance(value, (int, float, str)):
-            value = str(param_value)
+    if not isinstance(parameters, dict):
+        return {}
 
-        namespace[f"parameters/{param_name}"] = value
+    namespace["parameters"] = parameters
+    return parameters
 
 
 def log_dataset_metadata(namespace: Handler, name: str, dataset: AbstractDataset):
@@ -405,26 +819,75 @@ def log_dataset_metadata(namespace: Handler, name: str, dataset: AbstractDataset
     except AttributeError:
         pass
 
-    namespace[name] = stringify_unsupported({"type": type(dataset).__name__, "name": name, **additional_parameters})
+    metadata = {"type": type(dataset).__name__, "name": name, **additional_parameters}
+    if isinstance(metadata.get("version"), Version):
+        # Versions resolved by Kedro are logged per node, a missing load version means the latest one
+        metadata["version"] = {key: value for key, value in metadata["version"]._asdict().items() if value is not None}
+    namespace[name] = neptune_client().stringify_unsupported(metadata)
+
+
+def log_data_catalog_metadata(
+    namespace: Handler,
+    catalog: DataCatalog,
+    index: Optional[CatalogIndex] = None,
+    dataset_names: Optional[Iterable[str]] = None,
+    manifest: Optional[FileManifest] = None,
+    uploader: Optional[FileUploader] = None,
+    lister: Optional[PartitionLister] = None,
+    partition_files_limit: int = 0,
+):
+    namespace = namespace["catalog"]
+    join_paths = neptune_client().join_paths
+    file_datasets = []
+
+    if dataset_names is None:
+        dataset_names = list(catalog._datasets.keys())
 
+    for name in dataset_names:
+        dataset = catalog._datasets.get(name)
 
-def log_data_catalog_metadata(namespace: Handler, catalog: DataCatalog):
-    namespace = namespace["catalog"]
+        if dataset is None or (index is not None and index.is_logged(name)):
+            continue
 
-    for name, dataset in catalog._datasets.items():
-        if dataset.exists() and not namespace.container.exists(join_paths(namespace._path, name)):
-            if not isinstance(dataset, MemoryDataset) and not isinstance(dataset, NeptuneRunDataset):
-                log_dataset_metadata(namespace=namespace["datasets"], name=name, dataset=dataset)
+        if isinstance(dataset, (MemoryDataset, SharedMemoryDataset, NeptuneRunDataset)):
+            if index is not None:
+                index.mark_logged(name)
+            continue
+
+        # `exists` of a partitioned dataset lists all its partitions
+        listing = None
+        if is_partitioned(dataset):
+            listing = (lister or PartitionLister()).list(name=name, dataset=dataset)
+            exists = bool(listing.partitions)
+        else:
+            exists = dataset.exists()
+
+        if not exists:
+            continue
+
+        # Other keys of the dataset namespace, e.g. the profile, may be logged before the dataset is saved
+        if not namespace.container.exists(join_paths(namespace._path, "datasets", name, "type")):
+            log_dataset_metadata(namespace=namespace["datasets"], name=name, dataset=dataset)
 
             if isinstance(dataset, NeptuneFileDataset):
-                log_file_dataset(namespace=namespace["files"], name=name, dataset=dataset)
+                file_datasets.append((name, dataset))
+
+        # Partitioned datasets are logged again after partitions are saved to them
+        if listing is not None:
+            namespace[f"datasets/{name}/partitions"] = listing.to_dict()
+            if partition_files_limit and name.endswith("@neptune"):
+                file_datasets.extend(partition_file_datasets(name, dataset, listing, limit=partition_files_limit))
 
-    log_parameters(namespace=namespace, catalog=catalog)
+        if index is not None:
+            index.mark_logged(name)
+
+    if file_datasets:
+        log_file_datasets(namespace=namespace, datasets=file_datasets, manifest=manifest, uploader=uploader)
 
 
 def log_pipeline_metadata(namespace: Handler, pipeline: Pipeline):
     namespace["structure"].upload(
-        File.from_content(
+        neptune_client().File.from_content(
             content=json.dumps(json.loads(pipeline.to_json()), indent=4, sort_keys=True),
             extension="json",
         )
@@ -434,17 +897,382 @@ def log_pipeline_metadata(namespace: Handler, pipeline: Pipeline):
 
 
 def log_run_params(namespace: Handler, run_params: Dict[str, Any]):
-    namespace["run_params"] = stringify_unsupported(run_params)
+    namespace["run_params"] = neptune_client().stringify_unsupported(run_params)
 
 
 def log_command(namespace: Handler):
     namespace["kedro_command"] = " ".join(["kedro"] + sys.argv[1:])
 
 
+def log_source_snapshot(namespace: Handler, config: NeptuneConfig, run_id: str):
+    snapshot = SourceSnapshot(root=os.getcwd(), patterns=config.source_files, cache_dir=config.cache_dir)
+    manifest = FileManifest(directory=config.cache_dir, project=config.project, run_id=run_id)
+    digest, files = snapshot.scan(manifest)
+
+    reference = manifest.find_upload(digest)
+    if reference is not None:
+        namespace.assign({"sha256": digest, **reference})
+    else:
+        File = neptune_client().File
+        archive = snapshot.archive(digest, files)
+
+        namespace["archive"].upload(File(archive))
+        namespace["manifest"].upload(File.from_content(json.dumps(files, indent=4), extension="json"))
+        namespace["sha256"] = digest
+        namespace["files"] = len(files)
+        manifest.record_upload(
+            digest=digest, size=os.path.getsize(archive), attribute_path=f"{SOURCE_SNAPSHOT_KEY}/archive"
+        )
+
+    manifest.save()
+    snapshot.save()
+
+
+def log_dependencies(namespace: Handler, config: NeptuneConfig, run_id: str):
+    requirements, digest = DependencyCache(cache_dir=config.cache_dir).requirements()
+    if not requirements:
+        return
+
+    manifest = FileManifest(directory=config.cache_dir, project=config.project, run_id=run_id)
+    reference = manifest.find_upload(digest)
+
+    if reference is not None:
+        namespace["requirements_reference"] = {"sha256": digest, **reference}
+    else:
+        namespace["requirements"].upload(neptune_client().File.from_content(requirements))
+        manifest.record_upload(digest=digest, size=len(requirements.encode()), attribute_path=REQUIREMENTS_KEY)
+        manifest.save()
+
+
 class NeptuneHooks:
     def __init__(self):
         self._run_id: Optional[str] = None
-        self._node_execution_timers: Dict[str, float] = {}
+        self._pid: Optional[int] = None
+        self._parameters: Dict[str, Any] = {}
+        self._node_timer: NodeTimer = NodeTimer()
+        self._node_profiler: Optional[NodeProfiler] = None
+        self._dataset_io: DatasetIOTracker = DatasetIOTracker()
+        self._lock = threading.Lock()
+        self._catalog_index: CatalogIndex = CatalogIndex()
+        self._file_manifest: Optional[FileManifest] = None
+        self._file_uploader: Optional[FileUploader] = None
+        self._partition_lister: Optional[PartitionLister] = None
+        self._coordinator: Optional[Coordinator] = None
+        self._node_cache: Optional[NodeCache] = None
+        # Fingerprints of the running nodes and of the datasets output by the nodes of the run, by name
+        self._node_fingerprints: Dict[str, str] = {}
+        self._output_fingerprints: Dict[str, str] = {}
+        # Nodes replaying cached outputs and their original functions, restored when the nodes finish
+        self._replayed_nodes: Dict[str, Tuple[Node, Callable]] = {}
+        # Versioned outputs of the running nodes, with the names and namespaces of the nodes, by name,
+        # whose versions are logged and indexed once they are saved
+        self._saved_versions: Dict[str, Tuple[AbstractDataset, str, Handler]] = {}
+        # Sketches of the datasets saved by this process, by name
+        self._sketches: Dict[str, DatasetSketch] = {}
+
+    def _get_file_manifest(self, config: NeptuneConfig) -> Optional[FileManifest]:
+        if config.deduplicate_files and self._file_manifest is None:
+            self._file_manifest = FileManifest(directory=config.cache_dir, project=config.project, run_id=_run_key())
+
+        return self._file_manifest
+
+    def _get_file_uploader(self, config: NeptuneConfig) -> FileUploader:
+        if self._file_uploader is None:
+            self._file_uploader = FileUploader(max_workers=config.upload_concurrency)
+
+        return self._file_uploader
+
+    def _get_partition_lister(self, config: NeptuneConfig) -> PartitionLister:
+        if self._partition_lister is None:
+            self._partition_lister = PartitionLister(cache_dir=config.cache_dir)
+
+        return self._partition_lister
+
+    def _get_node_profiler(self, config: NeptuneConfig) -> Optional[NodeProfiler]:
+        if config.profile_nodes and self._node_profiler is None:
+            with self._lock:
+                if self._node_profiler is None:
+                    self._node_profiler = NodeProfiler(
+                        sample_rate=config.profile_sample_rate,
+                        trace_allocations=config.profile_allocations,
+                        top_allocations=config.profile_top_allocations,
+                    )
+
+        return self._node_profiler
+
+    def _close_node_profiler(self) -> None:
+        if self._node_profiler is not None:
+            self._node_profiler.close()
+            self._node_profiler = None
+
+    def _get_node_cache(self, config: NeptuneConfig) -> Optional[NodeCache]:
+        if config.cache_nodes and self._node_cache is None:
+            with self._lock:
+                if self._node_cache is None:
+                    self._node_cache = NodeCache(
+                        directory=os.path.join(config.cache_dir, NODE_CACHE_DIR_NAME),
+                        max_size=int(config.node_cache_max_size_mb * 1024 * 1024),
+                        manifest=FileManifest(directory=config.cache_dir, project=config.project, run_id=_run_key()),
+                    )
+
+        return self._node_cache
+
+    def _input_fingerprint(
+        self, name: str, value: Any, catalog: DataCatalog, cache: NodeCache, config: NeptuneConfig
+    ) -> Optional[str]:
+        with self._lock:
+            fingerprint = self._output_fingerprints.get(name)
+            if fingerprint is None and os.getpid() != self._pid:
+                # Output of a node run by another ParallelRunner worker
+                self._output_fingerprints.update(read_fingerprints(self._get_fingerprint_dir(config)))
+                fingerprint = self._output_fingerprints.get(name)
+
+        # Outputs of the nodes of the run are identified by the nodes, other datasets by their version or content
+        if fingerprint is None and name != "parameters" and not name.startswith("params:"):
+            fingerprint = dataset_fingerprint(catalog._datasets.get(name), cache.manifest)
+
+        if fingerprint is not None:
+            return fingerprint
+
+        return value_fingerprint(value, max_size=int(config.node_cache_max_input_size_mb * 1024 * 1024))
+
+    def _replay_cached_outputs(
+        self, node: Node, inputs: Dict[str, Any], catalog: DataCatalog, config: NeptuneConfig
+    ) -> Dict[str, Any]:
+        """Fingerprints the node and, when the outputs of a run with the same fingerprint are cached,
+        makes the node return them instead of running. Returns the cache status of the node."""
+        cache = self._get_node_cache(config)
+
+        # Nodes logging to the Neptune run have side effects and generator nodes cannot be replayed
+        if not node.outputs or "neptune_run" in node.inputs or inspect.isgeneratorfunction(node.func):
+            return {"status": "skipped"}
+
+        function = function_fingerprint(node.func)
+        if function is None:
+            return {"status": "skipped"}
+
+        input_fingerprints = {}
+        for name, value in inputs.items():
+            input_fingerprint = self._input_fingerprint(
+                name=name, value=value, catalog=catalog, cache=cache, config=config
+            )
+            if input_fingerprint is None:
+                return {"status": "skipped"}
+            input_fingerprints[name] = input_fingerprint
+
+        fingerprint = node_fingerprint(function=function, inputs=input_fingerprints, outputs=node.outputs)
+        output_fingerprints = {
+            name: hashlib.sha256(f"{fingerprint}\0{name}".encode()).hexdigest() for name in node.outputs
+        }
+        with self._lock:
+            self._node_fingerprints[node.name] = fingerprint
+            self._output_fingerprints.update(output_fingerprints)
+        if os.getpid() != self._pid:
+            write_fingerprints(self._get_fingerprint_dir(config), output_fingerprints)
+
+        entry = cache.get(fingerprint)
+        if entry is None:
+            return {"status": "miss", "fingerprint": fingerprint}
+
+        with self._lock:
+            self._replayed_nodes[node.name] = (node, node.func)
+        node.func = replay_function(node.func, node_outputs=node._outputs, outputs=entry.outputs)
+
+        status = {"status": "hit", "fingerprint": fingerprint}
+        if entry.execution_time is not None:
+            status["saved_time"] = entry.execution_time
+        return status
+
+    def _restore_replayed_nodes(self, *nodes: Node) -> bool:
+        """Restores the functions of the given nodes, or of all the nodes replaying cached outputs,
+        and returns whether any was restored."""
+        with self._lock:
+            names = [node.name for node in nodes] if nodes else list(self._replayed_nodes)
+            replayed = [self._replayed_nodes.pop(name) for name in names if name in self._replayed_nodes]
+
+        for node, func in replayed:
+            node.func = func
+
+        return bool(replayed)
+
+    @staticmethod
+    def _profile_outputs(outputs: Dict[str, Any], config: NeptuneConfig) -> Dict[str, Dict[str, Any]]:
+        profiles = {}
+
+        for name, data in outputs.items():
+            start = time.perf_counter()
+            try:
+                profile = profile_data(
+                    data, sample_size=config.profile_sample_size, max_columns=config.profile_max_columns
+                )
+            except Exception as exception:  # noqa: B902
+                logger.warning("Failed to profile the %s dataset: %s", name, exception)
+                continue
+
+            if profile is not None:
+                profile["time"] = time.perf_counter() - start
+                profiles[name] = profile
+
+        return profiles
+
+    @staticmethod
+    def _get_lineage_index(config: NeptuneConfig) -> LineageIndex:
+        return LineageIndex(directory=os.path.join(config.cache_dir, LINEAGE_DIR_NAME))
+
+    def _resolve_versions(
+        self, node: Node, catalog: DataCatalog, config: NeptuneConfig
+    ) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, AbstractDataset]]:
+        """Returns the versions of the versioned datasets loaded by a node, the IDs of the runs that saved them,
+        and the versioned datasets saved by the node."""
+        index = self._get_lineage_index(config)
+        versions: Dict[str, str] = {}
+        lineage: Dict[str, str] = {}
+
+        for name in node.inputs:
+            version = load_version(catalog._datasets.get(name))
+            if version is not None:
+                versions[name] = version
+                entry = index.lookup(name=name, version=version)
+                if entry is not None:
+                    lineage[name] = entry.run_id
+
+        # Unless it is set, e.g. by `KedroSession`, the save version is only known once the dataset is saved
+        outputs = {}
+        for name in node.outputs:
+            dataset = catalog._datasets.get(name)
+            if save_version(dataset) is not None:
+                outputs[name] = dataset
+
+        return versions, lineage, outputs
+
+    @staticmethod
+    def _get_sketch_dir(config: NeptuneConfig) -> str:
+        return os.path.join(config.cache_dir, SKETCH_DIR_NAME, _run_key())
+
+    def _sketch_dataset(self, name: str, data: Any, config: NeptuneConfig) -> None:
+        # Only data of an already imported library can be sketched, which always imports numpy
+        if "numpy" not in sys.modules:
+            return
+
+        from kedro_neptune.sketches import (
+            DatasetSketch,
+            write_sketch,
+        )
+
+        sketch = DatasetSketch(max_columns=config.profile_max_columns)
+        try:
+            if not sketch.update(data):
+                return
+        except Exception as exception:  # noqa: B902
+            logger.warning("Failed to sketch the %s dataset: %s", name, exception)
+            return
+
+        if os.getpid() != self._pid:
+            # Sketches of the ParallelRunner workers are merged by the main process at the end of the run
+            write_sketch(self._get_sketch_dir(config), name=name, sketch=sketch)
+            return
+
+        with self._lock:
+            if name in self._sketches:
+                self._sketches[name].merge(sketch)
+            else:
+                self._sketches[name] = sketch
+
+    @staticmethod
+    def _sketches_enabled(config: NeptuneConfig) -> bool:
+        # Drift is computed from the sketches, whether or not they are logged
+        return config.sketch_datasets or config.detect_drift
+
+    def _pop_sketches(self, config: NeptuneConfig) -> Dict[str, DatasetSketch]:
+        """Returns the sketches of the datasets saved by the run, merged with those of the ParallelRunner workers."""
+        from kedro_neptune.sketches import read_sketches
+
+        sketches = self._sketches
+        self._sketches = {}
+        for name, sketch in read_sketches(self._get_sketch_dir(config), remove=True):
+            if name in sketches:
+                sketches[name].merge(sketch)
+            else:
+                sketches[name] = sketch
+
+        return sketches
+
+    @staticmethod
+    def _log_sketches(namespace: Handler, sketches: Dict[str, DatasetSketch]) -> None:
+        File = neptune_client().File
+        for name, sketch in sketches.items():
+            namespace[f"catalog/datasets/{name}/profile/sketch"] = sketch.summary()
+            namespace[f"catalog/datasets/{name}/profile/sketch_data"].upload(
+                File.from_content(sketch.to_bytes(), extension="npz")
+            )
+
+    def _log_drift(self, namespace: Handler, sketches: Dict[str, DatasetSketch], config: NeptuneConfig) -> None:
+        from kedro_neptune.drift import (
+            PREVIOUS_RUN,
+            DriftStore,
+            dataset_drift,
+        )
+
+        store = DriftStore(directory=os.path.join(config.cache_dir, DRIFT_DIR_NAME), max_runs=config.drift_history)
+        keep = [] if config.drift_baseline == PREVIOUS_RUN else [config.drift_baseline]
+
+        for name, sketch in sketches.items():
+            baseline = store.baseline(name=name, run_id=self._run_id, baseline=config.drift_baseline)
+            if baseline is not None:
+                baseline_run_id, baseline_sketch = baseline
+                drift = dataset_drift(baseline=baseline_sketch, current=sketch)
+                namespace[f"catalog/datasets/{name}/drift"] = {"baseline": baseline_run_id, **drift}
+
+            store.put(name=name, run_id=self._run_id, sketch=sketch, keep=keep)
+
+    def _log_dataset_io(self, namespace: Handler, catalog: DataCatalog, config: NeptuneConfig) -> None:
+        sizes: Dict[str, Optional[int]] = {}
+        records = []
+
+        for name, operation, seconds in self._dataset_io.pop_pending():
+            if name not in sizes:
+                sizes[name] = dataset_size(catalog._datasets.get(name))
+            size = sizes[name]
+
+            self._dataset_io.add(name=name, operation=operation, seconds=seconds, size=size)
+            records.append((name, operation, seconds, size))
+
+            current_namespace = namespace[f"catalog/io/{name}/{operation}"]
+            current_namespace["time"].append(seconds)
+            if size is not None:
+                current_namespace["bytes"].append(size)
+                current_namespace["throughput_mb_s"].append(size / 1e6 / seconds if seconds > 0 else 0.0)
+
+        if records and os.getpid() != self._pid:
+            # ParallelRunner worker, the main process merges the records into the statistics of the run
+            write_io_records(self._get_dataset_io_dir(config), records)
+
+    @staticmethod
+    def _get_timeline_dir(config: NeptuneConfig) -> str:
+        return os.path.join(config.cache_dir, "timeline", _run_key())
+
+    @staticmethod
+    def _get_dataset_io_dir(config: NeptuneConfig) -> str:
+        return os.path.join(config.cache_dir, "dataset_io", _run_key())
+
+    @staticmethod
+    def _get_fingerprint_dir(config: NeptuneConfig) -> str:
+        return os.path.join(config.cache_dir, "fingerprints", _run_key())
+
+    def _close_coordinator(self) -> None:
+        if self._coordinator is not None:
+            self._coordinator.close()
+            self._coordinator = None
+
+    @staticmethod
+    def _get_namespace(catalog: DataCatalog, config: NeptuneConfig) -> Handler:
+        run = catalog.load("neptune_run")
+
+        if not config.async_logging or isinstance(run.container, (CoordinatorClient, Journal)):
+            return run
+
+        writer = run_pool.attach(key=_run_key(), factory=lambda root: _create_writer(root, config))
+        return writer.namespace(config.base_namespace)
 
     @hook_impl
     def after_catalog_created(self, catalog: DataCatalog) -> None:
@@ -464,24 +1292,79 @@ class NeptuneHooks:
         if not config.enabled:
             return
 
-        run = neptune.init_run(
-            api_token=config.api_token,
-            project=config.project,
-            mode=_connection_mode(config.enabled),
-            custom_run_id=self._run_id,
-            source_files=config.source_files or None,
+        run = run_pool.acquire(
+            key=self._run_id,
+            factory=lambda: _init_run(
+                config=config,
+                run_id=self._run_id,
+                mode=_connection_mode(config.enabled),
+                custom_run_id=self._run_id,
+                source_files=[] if config.snapshot_source_files else config.source_files or None,
+                dependencies=None if config.dependencies == "infer" else config.dependencies or None,
+            ),
         )
 
         run[INTEGRATION_VERSION_KEY] = __version__
 
-        current_namespace = run[config.base_namespace]
+        if config.snapshot_source_files:
+            log_source_snapshot(namespace=run[SOURCE_SNAPSHOT_KEY], config=config, run_id=self._run_id)
+
+        if config.dependencies == "infer":
+            log_dependencies(namespace=run["source_code"], config=config, run_id=self._run_id)
+
+        # A journal is written locally, so it is not worth a writer thread
+        use_writer = config.async_logging and not config.offline
+        if use_writer:
+            writer = run_pool.attach(key=self._run_id, factory=lambda root: _create_writer(root, config))
+            current_namespace = writer.namespace(config.base_namespace)
+        else:
+            current_namespace = run[config.base_namespace]
+
+        if config.coordinator:
+            self._close_coordinator()
+            self._coordinator = Coordinator(
+                sink=writer.submit if use_writer else partial(apply_record, run), exists=run.exists
+            )
+            self._coordinator.export()
 
         os.environ["NEPTUNE_API_TOKEN"] = config.api_token or ""
         os.environ["NEPTUNE_PROJECT"] = config.project or ""
 
         log_command(namespace=current_namespace)
         log_run_params(namespace=current_namespace, run_params=run_params)
-        log_data_catalog_metadata(namespace=current_namespace, catalog=catalog)
+        self._catalog_index.reset(catalog._datasets.keys())
+        self._node_timer.reset()
+        self._pid = os.getpid()
+        # Intervals and dataset I/O records left over by an interrupted run with the same ID
+        read_intervals(self._get_timeline_dir(config), remove=True)
+        if config.log_dataset_io:
+            read_io_records(self._get_dataset_io_dir(config), remove=True)
+        if config.cache_nodes:
+            read_fingerprints(self._get_fingerprint_dir(config), remove=True)
+        self._sketches = {}
+        if self._sketches_enabled(config) and "numpy" in sys.modules:
+            from kedro_neptune.sketches import read_sketches
+
+            # Sketches left over by an interrupted run with the same ID
+            read_sketches(self._get_sketch_dir(config), remove=True)
+        self._dataset_io.reset()
+        self._file_manifest = None
+        self._file_uploader = None
+        self._partition_lister = None
+        self._node_cache = None
+        self._node_fingerprints = {}
+        self._output_fingerprints = {}
+        self._saved_versions = {}
+        log_data_catalog_metadata(
+            namespace=current_namespace,
+            catalog=catalog,
+            index=self._catalog_index,
+            manifest=self._get_file_manifest(config),
+            uploader=self._get_file_uploader(config),
+            lister=self._get_partition_lister(config),
+            partition_files_limit=config.partition_upload_limit if config.log_partition_files else 0,
+        )
+        self._parameters = log_parameters(namespace=current_namespace["catalog"], catalog=catalog)
         log_pipeline_metadata(namespace=current_namespace, pipeline=pipeline)
 
     @hook_impl
@@ -491,22 +1374,52 @@ class NeptuneHooks:
         if not config.enabled:
             return
 
-        run = catalog.load("neptune_run")
+        run = self._get_namespace(catalog=catalog, config=config)
+
+        cache_status = None
+        if config.cache_nodes:
+            cache_status = self._replay_cached_outputs(node=node, inputs=inputs, catalog=catalog, config=config)
 
-        run["log"].append(f"Running {node.short_name}")
+        versions, lineage, versioned_outputs = self._resolve_versions(node=node, catalog=catalog, config=config)
 
-        current_namespace = run[f"nodes/{node.short_name}"]
+        # Under ThreadRunner several nodes are logged at the same time, keep the writes of each node together
+        with self._lock:
+            run["log"].append(f"Running {node.short_name}")
 
-        current_namespace["status"] = "running"
+            current_namespace = run[f"nodes/{node.short_name}"]
 
-        if inputs:
-            current_namespace["inputs"] = stringify_unsupported(list(sorted(inputs.keys())))
+            current_namespace["status"] = "running"
 
-        for input_name, input_value in inputs.items():
-            if input_name.startswith("params:"):
-                current_namespace[f'parameters/{input_name[len("params:"):]}'] = stringify_unsupported(input_value)
+            if cache_status is not None:
+                current_namespace["cache"] = cache_status
 
-        self._node_execution_timers[node.short_name] = time.time()
+            if inputs:
+                current_namespace["inputs"] = neptune_client().stringify_unsupported(list(sorted(inputs.keys())))
+
+            parameters = {}
+            for input_name, input_value in inputs.items():
+                if input_name.startswith("params:"):
+                    name = input_name[len("params:") :]
+                    value = find_parameter(self._parameters, name)
+                    parameters[name] = value if value is not None else encode_parameters(input_value)
+
+            if parameters:
+                current_namespace["parameters"] = parameters
+
+            if versions:
+                current_namespace["versions/inputs"] = versions
+
+            if lineage:
+                current_namespace["lineage"] = lineage
+
+            for name, dataset in versioned_outputs.items():
+                self._saved_versions[name] = (dataset, node.name, current_namespace)
+
+        profiler = self._get_node_profiler(config)
+        if profiler is not None:
+            profiler.start(node.short_name)
+
+        self._node_timer.start(node.short_name)
 
     @hook_impl
     def after_node_run(self, node: Node, catalog: DataCatalog, outputs: Dict[str, Any]) -> None:
@@ -515,37 +1428,236 @@ class NeptuneHooks:
         if not config.enabled:
             return
 
-        execution_time = float(time.time() - self._node_execution_timers[node.short_name])
+        interval = self._node_timer.stop(node.short_name)
+        execution_time = interval.duration if interval is not None else None
 
-        run = catalog.load("neptune_run")
+        if interval is not None and os.getpid() != self._pid:
+            # ParallelRunner worker, the main process merges the intervals at the end of the pipeline
+            write_intervals(self._get_timeline_dir(config), [interval])
+
+        profiler = self._get_node_profiler(config)
+        profile = profiler.stop(node.short_name) if profiler is not None else None
+
+        cache = self._get_node_cache(config)
+        cache_stored = None
+        if cache is not None:
+            with self._lock:
+                fingerprint = self._node_fingerprints.pop(node.name, None)
+
+            if not self._restore_replayed_nodes(node) and fingerprint is not None:
+                cache_stored = cache.put(fingerprint=fingerprint, outputs=outputs, execution_time=execution_time)
+            cache.manifest.save()
+
+        profiles = self._profile_outputs(outputs=outputs, config=config) if config.profile_datasets else {}
+
+        run = self._get_namespace(catalog=catalog, config=config)
+
+        with self._lock:
+            run["log"].append(f"Finished {node.short_name}")
+
+            current_namespace = run[f"nodes/{node.short_name}"]
+            if execution_time is not None:
+                current_namespace["execution_time"] = execution_time
+            current_namespace["status"] = "done"
 
-        run["log"].append(f"Finished {node.short_name}")
+            if outputs:
+                current_namespace["outputs"] = neptune_client().stringify_unsupported(list(sorted(outputs.keys())))
 
-        current_namespace = run[f"nodes/{node.short_name}"]
-        current_namespace["execution_time"] = execution_time
-        current_namespace["status"] = "done"
+            if profile is not None:
+                current_namespace["profile"] = profile
 
-        if outputs:
-            current_namespace["outputs"] = stringify_unsupported(list(sorted(outputs.keys())))
+            if cache_stored is not None:
+                current_namespace["cache/stored"] = cache_stored
 
-        log_data_catalog_metadata(namespace=run, catalog=catalog)
-        if isinstance(run, Handler):
+            for name, dataset_profile in profiles.items():
+                run[f"catalog/datasets/{name}/profile"] = dataset_profile
+
+        if not self._catalog_index.initialized:
+            self._catalog_index.reset(catalog._datasets.keys())
+        self._catalog_index.mark_dirty(node.outputs)
+        log_data_catalog_metadata(
+            namespace=run,
+            catalog=catalog,
+            index=self._catalog_index,
+            dataset_names=self._catalog_index.pop_dirty(),
+            manifest=self._get_file_manifest(config),
+            uploader=self._get_file_uploader(config),
+            lister=self._get_partition_lister(config),
+            partition_files_limit=config.partition_upload_limit if config.log_partition_files else 0,
+        )
+
+        if self._file_manifest is not None:
+            self._file_manifest.save()
+
+        if config.log_dataset_io:
+            self._log_dataset_io(namespace=run, catalog=catalog, config=config)
+
+        if isinstance(run, neptune_client().Handler):
             run.get_root_object().sync()
+        elif isinstance(run.container, (CoordinatorClient, Journal)):
+            run.container.sync()
+
+    @hook_impl
+    def on_node_error(self, node: Node) -> None:
+        self._restore_replayed_nodes(node)
+
+        with self._lock:
+            self._node_fingerprints.pop(node.name, None)
+
+    @staticmethod
+    def _tracks_dataset_io(dataset_name: str) -> bool:
+        if dataset_name == "neptune_run" or dataset_name == "parameters" or dataset_name.startswith("params:"):
+            return False
+
+        config = get_neptune_config(settings)
+        return config.enabled and config.log_dataset_io
+
+    @hook_impl
+    def before_dataset_loaded(self, dataset_name: str) -> None:
+        if self._tracks_dataset_io(dataset_name):
+            self._dataset_io.start("load", dataset_name)
+
+    @hook_impl
+    def after_dataset_loaded(self, dataset_name: str) -> None:
+        if self._tracks_dataset_io(dataset_name):
+            self._dataset_io.stop("load", dataset_name)
+
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str) -> None:
+        if self._tracks_dataset_io(dataset_name):
+            self._dataset_io.start("save", dataset_name)
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str, data: Any) -> None:
+        if self._partition_lister is not None and self._partition_lister.invalidate(dataset_name):
+            # New partitions are listed, logged and uploaded with the other datasets saved by the node
+            self._catalog_index.mark_changed([dataset_name])
         else:
-            run.sync()
-        catalog.release("neptune_run")
+            self._catalog_index.mark_dirty([dataset_name])
+
+        with self._lock:
+            saved_version = self._saved_versions.pop(dataset_name, None)
+        if saved_version is not None:
+            self._log_saved_version(dataset_name, *saved_version)
+
+        if self._tracks_dataset_io(dataset_name):
+            self._dataset_io.stop("save", dataset_name)
+
+        if dataset_name != "neptune_run":
+            config = get_neptune_config(settings)
+            if config.enabled and self._sketches_enabled(config):
+                self._sketch_dataset(name=dataset_name, data=data, config=config)
+
+    def _log_saved_version(self, name: str, dataset: AbstractDataset, node_name: str, namespace: Handler) -> None:
+        # Resolved by the save and cached by the dataset
+        version = save_version(dataset)
+        if version is None:
+            return
+
+        with self._lock:
+            namespace[f"versions/outputs/{name}"] = version
+
+        config = get_neptune_config(settings)
+        try:
+            self._get_lineage_index(config).record(
+                name=name, version=version, run_id=_run_key(), project=config.project, node=node_name
+            )
+        except OSError as exception:
+            logger.warning("Failed to index version %s of the %s dataset: %s", version, name, exception)
 
     @hook_impl
-    def after_pipeline_run(self, catalog: DataCatalog) -> None:
+    def after_pipeline_run(self, pipeline: Pipeline, catalog: DataCatalog) -> None:
         config = get_neptune_config(settings)
 
         if not config.enabled:
             return
 
-        run = catalog.load("neptune_run")
-        log_data_catalog_metadata(namespace=run, catalog=catalog)
+        # Records of the ParallelRunner workers have to be applied before the run is closed
+        self._close_coordinator()
+
+        run = self._get_namespace(catalog=catalog, config=config)
+        log_data_catalog_metadata(
+            namespace=run,
+            catalog=catalog,
+            index=self._catalog_index,
+            dataset_names=self._catalog_index.pop_dirty(),
+            manifest=self._get_file_manifest(config),
+            uploader=self._get_file_uploader(config),
+            lister=self._get_partition_lister(config),
+            partition_files_limit=config.partition_upload_limit if config.log_partition_files else 0,
+        )
+        if self._file_manifest is not None:
+            run["catalog/files/bytes_uploaded"] = self._file_manifest.bytes_uploaded
+            run["catalog/files/bytes_skipped"] = self._file_manifest.bytes_skipped
+            self._file_manifest.save()
+
+        if config.log_dataset_io:
+            self._log_dataset_io(namespace=run, catalog=catalog, config=config)
+            for name, operation, seconds, size in read_io_records(self._get_dataset_io_dir(config), remove=True):
+                self._dataset_io.add(name=name, operation=operation, seconds=seconds, size=size)
+            for name, stats in self._dataset_io.stats().items():
+                run[f"catalog/io/{name}"] = stats
+            summary = neptune_client().File.from_content(self._dataset_io.summary(), extension="csv")
+            run["catalog/io_summary"].upload(summary)
+
+        # Intervals of the ParallelRunner workers
+        worker_intervals = read_intervals(self._get_timeline_dir(config), remove=True)
+        concurrency = self._node_timer.stats(worker_intervals)
+        if concurrency:
+            run["concurrency"] = concurrency
+
+            if config.analyze_pipeline:
+                durations: Dict[str, float] = {}
+                for interval in self._node_timer.intervals() + worker_intervals:
+                    durations[interval.name] = durations.get(interval.name, 0.0) + interval.duration
+
+                run["analysis"] = neptune_client().stringify_unsupported(
+                    analyze_pipeline(pipeline=pipeline, durations=durations, wall_time=concurrency["wall_time"])
+                )
+
+        if config.log_timeline:
+            intervals = sorted(
+                self._node_timer.intervals() + worker_intervals,
+                key=lambda interval: interval.start,
+            )
+            if intervals:
+                File = neptune_client().File
+                run["timeline/trace"].upload(File.from_content(chrome_trace(intervals), extension="json"))
+                run["timeline/gantt"].upload(File.from_content(gantt_html(intervals), extension="html"))
+
+        if self._sketches_enabled(config) and "numpy" in sys.modules:
+            sketches = self._pop_sketches(config)
+            if config.sketch_datasets:
+                self._log_sketches(namespace=run, sketches=sketches)
+            if config.detect_drift:
+                self._log_drift(namespace=run, sketches=sketches, config=config)
+
+        failures = self._get_file_uploader(config).failures
+        if failures:
+            run["catalog/uploads/errors"] = failures
+            logger.warning("Failed to upload %d file(s) to Neptune: %s", len(failures), ", ".join(sorted(failures)))
+
+        if config.cache_nodes:
+            read_fingerprints(self._get_fingerprint_dir(config), remove=True)
+
         run["log"].append("Finished pipeline")
-        run.container.sync()
+
+        self._close_node_profiler()
+        catalog.release("neptune_run")
+        run_pool.close(self._run_id)
+
+    @hook_impl
+    def on_pipeline_error(self, catalog: DataCatalog) -> None:
+        config = get_neptune_config(settings)
+
+        if not config.enabled:
+            return
+
+        self._close_coordinator()
+        self._close_node_profiler()
+        self._restore_replayed_nodes()
+        catalog.release("neptune_run")
+        run_pool.close(self._run_id)
 
 
 neptune_hooks = NeptuneHooks()
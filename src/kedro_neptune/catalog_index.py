@@ -0,0 +1,80 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = ["CatalogIndex"]
+
+import threading
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+)
+
+
+class CatalogIndex:
+    """In-memory index of the catalog datasets already logged to the Neptune run.
+
+    Instead of scanning the whole catalog after every node, datasets are marked as dirty
+    when a node produces them (`outputs` or `after_dataset_saved`) and only those are checked.
+    Marking a dataset also marks its `@neptune` companions, e.g. `planets@neptune` for `planets`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._logged: Set[str] = set()
+        self._dirty: Set[str] = set()
+        self._aliases: Optional[Dict[str, List[str]]] = None
+
+    def reset(self, dataset_names: Iterable[str]) -> None:
+        aliases: Dict[str, List[str]] = {}
+        for name in dataset_names:
+            aliases.setdefault(name.split("@", 1)[0], []).append(name)
+
+        with self._lock:
+            self._logged = set()
+            self._dirty = set()
+            self._aliases = aliases
+
+    @property
+    def initialized(self) -> bool:
+        return self._aliases is not None
+
+    def mark_dirty(self, names: Iterable[str]) -> None:
+        with self._lock:
+            for name in names:
+                self._dirty.add(name)
+                self._dirty.update((self._aliases or {}).get(name, ()))
+
+    def mark_changed(self, names: Iterable[str]) -> None:
+        """Marks datasets as dirty and logs them again even if they were logged, e.g. partitioned datasets."""
+        with self._lock:
+            for name in names:
+                changed = {name, *(self._aliases or {}).get(name, ())}
+                self._dirty.update(changed)
+                self._logged.difference_update(changed)
+
+    def mark_logged(self, name: str) -> None:
+        with self._lock:
+            self._logged.add(name)
+
+    def is_logged(self, name: str) -> bool:
+        return name in self._logged
+
+    def pop_dirty(self) -> List[str]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return sorted(dirty - self._logged)
@@ -13,8 +13,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import glob
+import os
+import threading
 from dataclasses import dataclass
-from typing import List
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
 from kedro_neptune.utils import (
     ensure_bool,
@@ -22,6 +31,9 @@ from kedro_neptune.utils import (
     parse_config_value,
 )
 
+DEFAULT_CACHE_DIR = os.path.join(".neptune", "kedro")
+DEFAULT_JOURNAL_DIR = os.path.join("logs", "neptune")
+
 
 @dataclass()
 class NeptuneConfig:
@@ -31,14 +43,139 @@ class NeptuneConfig:
     source_files: List[str]
     enabled: bool
     dependencies: str
+    async_logging: bool = False
+    max_in_flight_operations: int = 1000
+    flush_interval: float = 5.0
+    backpressure: str = "block"
+    cache_dir: str = DEFAULT_CACHE_DIR
+    deduplicate_files: bool = False
+    upload_concurrency: int = 4
+    coordinator: bool = False
+    profile_nodes: bool = False
+    profile_sample_rate: float = 1.0
+    profile_allocations: bool = False
+    profile_top_allocations: int = 10
+    log_dataset_io: bool = False
+    analyze_pipeline: bool = False
+    log_timeline: bool = False
+    offline: bool = False
+    journal_dir: str = DEFAULT_JOURNAL_DIR
+    snapshot_source_files: bool = False
+    cache_nodes: bool = False
+    node_cache_max_size_mb: float = 1024.0
+    node_cache_max_input_size_mb: float = 256.0
+    profile_datasets: bool = False
+    profile_sample_size: int = 100000
+    profile_max_columns: int = 100
+    sketch_datasets: bool = False
+    detect_drift: bool = False
+    drift_baseline: str = "previous"
+    drift_history: int = 20
+    log_partition_files: bool = False
+    partition_upload_limit: int = 100
+
+
+# Keys of the configuration loaded by the plugin
+CONFIG_KEYS = ("neptune", "credentials_neptune")
+
+
+def _conf_paths(settings, env: Optional[str]) -> List[str]:
+    """Returns the patterns of the files from which the configuration loader reads the Neptune configuration."""
+    loader_args = settings.CONFIG_LOADER_ARGS
+    config_patterns = loader_args.get("config_patterns", {})
+    environments = {loader_args.get("base_env", "base"), env or loader_args.get("default_run_env", "local")}
+
+    return [
+        os.path.join(str(settings.CONF_SOURCE), environment, pattern)
+        for environment in sorted(environments)
+        for key in CONFIG_KEYS
+        for pattern in config_patterns.get(key, [f"{key}*"])
+    ]
+
+
+def _conf_fingerprint(conf_source: str, patterns: List[str]) -> Tuple:
+    if os.path.isfile(conf_source):
+        stat = os.stat(conf_source)
+        return ((conf_source, stat.st_mtime_ns, stat.st_size),)
+
+    # Only the Neptune configuration files are checked, not the whole configuration source
+    fingerprint = []
+    for path in sorted({path for pattern in patterns for path in glob.glob(pattern, recursive=True)}):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+
+    return tuple(fingerprint)
+
+
+class NeptuneConfigCache:
+    """Process-wide cache of the raw `neptune` and `credentials_neptune` configuration.
+
+    Entries are keyed on the Kedro environment and the configuration source, and are invalidated as soon as
+    a Neptune configuration file (matching the `neptune` or `credentials_neptune` patterns of the base
+    or run environment) is added or removed, or its modification time or size changes.
+    The cache can be pickled, so that `ParallelRunner` workers start with the entries of the main process.
+
+    Attributes:
+        loads: Number of times the configuration was actually loaded with `CONFIG_LOADER_CLASS`.
+        hits: Number of times the configuration was served from the cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Optional[str]], Tuple[Tuple, Dict[str, Any], Dict[str, Any]]] = {}
+        self.loads: int = 0
+        self.hits: int = 0
+
+    def get(self, settings) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        conf_source = os.path.abspath(str(settings.CONF_SOURCE))
+        env = get_kedro_env(settings)
+        key = (conf_source, env)
+        fingerprint = _conf_fingerprint(conf_source, _conf_paths(settings, env))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self.hits += 1
+                return entry[1], entry[2]
+
+        config_loader = settings.CONFIG_LOADER_CLASS(settings.CONF_SOURCE, env=env, **settings.CONFIG_LOADER_ARGS)
+        credentials = config_loader["credentials_neptune"]
+        config = config_loader["neptune"]
+
+        with self._lock:
+            self._entries[key] = (fingerprint, credentials, config)
+            self.loads += 1
+
+        return credentials, config
+
+    def update(self, other: "NeptuneConfigCache") -> None:
+        with self._lock:
+            for key, entry in other._entries.items():
+                self._entries.setdefault(key, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.loads = 0
+            self.hits = 0
+
+    def __getstate__(self) -> dict:
+        with self._lock:
+            return {"_entries": dict(self._entries), "loads": self.loads, "hits": self.hits}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+        self.__dict__.update(state)
+
+
+neptune_config_cache = NeptuneConfigCache()
 
 
 def get_neptune_config(settings) -> NeptuneConfig:
-    config_loader = settings.CONFIG_LOADER_CLASS(
-        settings.CONF_SOURCE, env=get_kedro_env(settings), **settings.CONFIG_LOADER_ARGS
-    )
-    credentials = config_loader["credentials_neptune"]
-    config = config_loader["neptune"]
+    credentials, config = neptune_config_cache.get(settings)
 
     api_token = parse_config_value(credentials["neptune"]["api_token"])
     project = parse_config_value(config["neptune"]["project"])
@@ -46,6 +183,38 @@ def get_neptune_config(settings) -> NeptuneConfig:
     source_files = parse_config_value(config["neptune"]["upload_source_files"])
     enabled = ensure_bool(parse_config_value(config["neptune"].get("enabled", True)))
     dependencies = parse_config_value(config["neptune"].get("dependencies", None))
+    async_logging = ensure_bool(parse_config_value(config["neptune"].get("async_logging", False)))
+    max_in_flight_operations = int(parse_config_value(config["neptune"].get("max_in_flight_operations", 1000)))
+    flush_interval = float(parse_config_value(config["neptune"].get("flush_interval", 5.0)))
+    backpressure = parse_config_value(config["neptune"].get("backpressure", "block"))
+    cache_dir = parse_config_value(config["neptune"].get("cache_dir", DEFAULT_CACHE_DIR))
+    deduplicate_files = ensure_bool(parse_config_value(config["neptune"].get("deduplicate_files", False)))
+    upload_concurrency = int(parse_config_value(config["neptune"].get("upload_concurrency", 4)))
+    coordinator = ensure_bool(parse_config_value(config["neptune"].get("coordinator", False)))
+    profile_nodes = ensure_bool(parse_config_value(config["neptune"].get("profile_nodes", False)))
+    profile_sample_rate = float(parse_config_value(config["neptune"].get("profile_sample_rate", 1.0)))
+    profile_allocations = ensure_bool(parse_config_value(config["neptune"].get("profile_allocations", False)))
+    profile_top_allocations = int(parse_config_value(config["neptune"].get("profile_top_allocations", 10)))
+    log_dataset_io = ensure_bool(parse_config_value(config["neptune"].get("log_dataset_io", False)))
+    analyze_pipeline = ensure_bool(parse_config_value(config["neptune"].get("analyze_pipeline", False)))
+    log_timeline = ensure_bool(parse_config_value(config["neptune"].get("log_timeline", False)))
+    offline = ensure_bool(parse_config_value(config["neptune"].get("offline", False)))
+    journal_dir = parse_config_value(config["neptune"].get("journal_dir", DEFAULT_JOURNAL_DIR))
+    snapshot_source_files = ensure_bool(parse_config_value(config["neptune"].get("snapshot_source_files", False)))
+    cache_nodes = ensure_bool(parse_config_value(config["neptune"].get("cache_nodes", False)))
+    node_cache_max_size_mb = float(parse_config_value(config["neptune"].get("node_cache_max_size_mb", 1024.0)))
+    node_cache_max_input_size_mb = float(
+        parse_config_value(config["neptune"].get("node_cache_max_input_size_mb", 256.0))
+    )
+    profile_datasets = ensure_bool(parse_config_value(config["neptune"].get("profile_datasets", False)))
+    profile_sample_size = int(parse_config_value(config["neptune"].get("profile_sample_size", 100000)))
+    profile_max_columns = int(parse_config_value(config["neptune"].get("profile_max_columns", 100)))
+    sketch_datasets = ensure_bool(parse_config_value(config["neptune"].get("sketch_datasets", False)))
+    detect_drift = ensure_bool(parse_config_value(config["neptune"].get("detect_drift", False)))
+    drift_baseline = parse_config_value(config["neptune"].get("drift_baseline", "previous"))
+    drift_history = int(parse_config_value(config["neptune"].get("drift_history", 20)))
+    log_partition_files = ensure_bool(parse_config_value(config["neptune"].get("log_partition_files", False)))
+    partition_upload_limit = int(parse_config_value(config["neptune"].get("partition_upload_limit", 100)))
 
     return NeptuneConfig(
         api_token=api_token,
@@ -54,4 +223,34 @@ def get_neptune_config(settings) -> NeptuneConfig:
         source_files=source_files,
         enabled=enabled,
         dependencies=dependencies,
+        async_logging=async_logging,
+        max_in_flight_operations=max_in_flight_operations,
+        flush_interval=flush_interval,
+        backpressure=backpressure,
+        cache_dir=cache_dir,
+        deduplicate_files=deduplicate_files,
+        upload_concurrency=upload_concurrency,
+        coordinator=coordinator,
+        profile_nodes=profile_nodes,
+        profile_sample_rate=profile_sample_rate,
+        profile_allocations=profile_allocations,
+        profile_top_allocations=profile_top_allocations,
+        log_dataset_io=log_dataset_io,
+        analyze_pipeline=analyze_pipeline,
+        log_timeline=log_timeline,
+        offline=offline,
+        journal_dir=journal_dir,
+        snapshot_source_files=snapshot_source_files,
+        cache_nodes=cache_nodes,
+        node_cache_max_size_mb=node_cache_max_size_mb,
+        node_cache_max_input_size_mb=node_cache_max_input_size_mb,
+        profile_datasets=profile_datasets,
+        profile_sample_size=profile_sample_size,
+        profile_max_columns=profile_max_columns,
+        sketch_datasets=sketch_datasets,
+        detect_drift=detect_drift,
+        drift_baseline=drift_baseline,
+        drift_history=drift_history,
+        log_partition_files=log_partition_files,
+        partition_upload_limit=partition_upload_limit,
     )
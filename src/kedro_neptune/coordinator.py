@@ -0,0 +1,263 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "Coordinator",
+    "CoordinatorClient",
+    "coordinator_address",
+]
+
+import json
+import logging
+import os
+import pickle
+import secrets
+import threading
+from multiprocessing.connection import (
+    Client,
+    Connection,
+    Listener,
+)
+from typing import (
+    Any,
+    Callable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from kedro_neptune.writer import (
+    Record,
+    RecordingNamespace,
+)
+
+logger = logging.getLogger(__name__)
+
+COORDINATOR_ADDRESS_ENV_NAME = "KEDRO_NEPTUNE_COORDINATOR_ADDRESS"
+COORDINATOR_AUTHKEY_ENV_NAME = "KEDRO_NEPTUNE_COORDINATOR_AUTHKEY"
+COORDINATOR_PID_ENV_NAME = "KEDRO_NEPTUNE_COORDINATOR_PID"
+
+
+def coordinator_address() -> Optional[Tuple[Any, bytes]]:
+    """Returns the address and authkey of the coordinator if the current process is one of its workers."""
+    address = os.getenv(COORDINATOR_ADDRESS_ENV_NAME)
+
+    if not address or os.getenv(COORDINATOR_PID_ENV_NAME) == str(os.getpid()):
+        return None
+
+    address = json.loads(address)
+    if isinstance(address, list):
+        address = tuple(address)
+
+    return address, bytes.fromhex(os.environ[COORDINATOR_AUTHKEY_ENV_NAME])
+
+
+class Coordinator:
+    """Receives log records from `ParallelRunner` workers and applies them in the main process.
+
+    The coordinator listens on a local socket, whose address is exported through environment variables
+    inherited by the worker processes. Every worker sends batches of records over a single connection,
+    so the main process holds the only connection to Neptune.
+
+    Workers also ask the coordinator whether a path exists before logging values that are logged once per run,
+    such as catalog files. A path that does not exist is claimed by the first worker asking for it, and reported
+    as existing to the others, so that only one worker logs it.
+
+    Args:
+        sink: Function applying a single record, e.g. to the Neptune run or to an `AsyncWriter`.
+        exists: Function returning whether a path exists in the run. If None, only claimed paths exist.
+    """
+
+    def __init__(self, sink: Callable[[Record], None], exists: Optional[Callable[[str], bool]] = None):
+        self._sink = sink
+        self._exists = exists
+        self._claimed: Set[str] = set()
+        self._claim_lock = threading.Lock()
+        self._authkey = secrets.token_bytes(32)
+        self._listener = Listener(authkey=self._authkey)
+        self._readers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.received: int = 0
+        self.connections: int = 0
+
+        self._acceptor = threading.Thread(target=self._accept_loop, name="kedro-neptune-coordinator", daemon=True)
+        self._acceptor.start()
+
+    def export(self) -> None:
+        os.environ[COORDINATOR_ADDRESS_ENV_NAME] = json.dumps(self._listener.address)
+        os.environ[COORDINATOR_AUTHKEY_ENV_NAME] = self._authkey.hex()
+        os.environ[COORDINATOR_PID_ENV_NAME] = str(os.getpid())
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError):
+                if self._closed:
+                    return
+                continue
+
+            if self._closed:
+                connection.close()
+                return
+
+            reader = threading.Thread(target=self._read_loop, args=(connection,), daemon=True)
+            with self._lock:
+                self.connections += 1
+                self._readers.append(reader)
+            reader.start()
+
+    def _read_loop(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    batch = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                if isinstance(batch, tuple):
+                    # Request of `CoordinatorClient.exists`
+                    _, path = batch
+                    try:
+                        connection.send(self.claim(path))
+                    except (EOFError, OSError):
+                        return
+                    continue
+
+                for record in batch:
+                    try:
+                        self._sink(record)
+                    except Exception as exception:  # noqa: B902
+                        logger.warning("Failed to log '%s' to Neptune: %s", record[1], exception)
+
+                with self._lock:
+                    self.received += len(batch)
+
+    def claim(self, path: str) -> bool:
+        """Returns whether the path exists in the run or was already claimed, and otherwise claims it."""
+        with self._claim_lock:
+            if path in self._claimed:
+                return True
+
+            try:
+                exists = self._exists is not None and self._exists(path)
+            except Exception as exception:  # noqa: B902
+                logger.warning("Failed to check whether '%s' exists in Neptune: %s", path, exception)
+                exists = False
+
+            self._claimed.add(path)
+            return exists
+
+    def close(self, timeout: Optional[float] = 60.0) -> None:
+        """Stops accepting workers and waits until the records of the connected ones are applied."""
+        if self._closed:
+            return
+
+        self._closed = True
+        for name in (COORDINATOR_ADDRESS_ENV_NAME, COORDINATOR_AUTHKEY_ENV_NAME, COORDINATOR_PID_ENV_NAME):
+            os.environ.pop(name, None)
+
+        # Wake up the acceptor, which is blocked in accept()
+        try:
+            Client(self._listener.address, authkey=self._authkey).close()
+        except OSError:
+            pass
+        self._acceptor.join(timeout)
+        self._listener.close()
+
+        with self._lock:
+            readers = list(self._readers)
+        for reader in readers:
+            reader.join(timeout)
+
+
+class CoordinatorClient:
+    """Run-like object used by `ParallelRunner` workers to send log records to the coordinator.
+
+    It supports item access, assignments, `append`, `extend` and `upload`, which is what the plugin hooks use.
+    `exists` is answered by the coordinator, which reports a missing path as missing to the first worker asking
+    for it only. Values that are read back from the run (e.g. `fetch`) are not available in workers.
+
+    Args:
+        address: Address of the coordinator.
+        authkey: Authentication key of the coordinator.
+        batch_size: Number of records buffered before they are sent.
+    """
+
+    def __init__(self, address: Any, authkey: bytes, batch_size: int = 256):
+        self._connection = Client(address, authkey=authkey)
+        self._batch_size = batch_size
+        self._buffer: List[Record] = []
+        self._lock = threading.Lock()
+
+        self.sent: int = 0
+
+    def __getitem__(self, path: str) -> RecordingNamespace:
+        return RecordingNamespace(sink=self.submit, path=path, container=self)
+
+    def __setitem__(self, path: str, value: Any) -> None:
+        self.submit(("assign", path, value))
+
+    def exists(self, path: str) -> bool:
+        with self._lock:
+            # Records sent earlier are applied before the request is answered
+            self._send()
+            try:
+                self._connection.send(("exists", path))
+                return bool(self._connection.recv())
+            except (EOFError, OSError):
+                return False
+
+    def get_root_object(self) -> "CoordinatorClient":
+        return self
+
+    def submit(self, record: Record) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self._batch_size:
+                self._send()
+
+    def sync(self, wait: bool = True) -> None:
+        with self._lock:
+            self._send()
+
+    def _send(self) -> None:
+        if not self._buffer:
+            return
+
+        batch, self._buffer = self._buffer, []
+        try:
+            self._connection.send(batch)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Some records cannot be pickled (e.g. uploads of open streams), send the others one by one
+            batch = [record for record in batch if self._send_one(record)]
+
+        self.sent += len(batch)
+
+    def _send_one(self, record: Record) -> bool:
+        try:
+            self._connection.send([record])
+            return True
+        except (pickle.PicklingError, TypeError, AttributeError) as exception:
+            logger.warning("Cannot send '%s' to the Neptune coordinator: %s", record[1], exception)
+            return False
+
+    def stop(self) -> None:
+        with self._lock:
+            self._send()
+            self._connection.close()
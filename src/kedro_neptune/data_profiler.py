@@ -0,0 +1,247 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "profile_data",
+]
+
+import math
+import sys
+import warnings
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
+
+DEFAULT_SAMPLE_SIZE = 100_000
+DEFAULT_MAX_COLUMNS = 100
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def _float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+
+    value = float(value)
+    # Neptune does not store NaN and infinite floats
+    return value if math.isfinite(value) else None
+
+
+def _column_key(name: Any) -> str:
+    # A slash would start a nested namespace
+    return str(name).replace("/", "_")
+
+
+def _sample_indices(numpy: Any, rows: int, sample_size: int, seed: int) -> Any:
+    """Returns the sorted indices of a uniform sample of `sample_size` rows, or None if all the rows are used.
+
+    The sample has the distribution of a reservoir sample of the rows, but the rows of an in-memory frame can be
+    indexed directly, so drawing the indices takes time proportional to the sample size, not to the rows.
+    """
+    if rows <= sample_size:
+        return None
+
+    indices = numpy.random.default_rng(seed).choice(rows, size=sample_size, replace=False)
+    indices.sort()
+    return indices
+
+
+def _column_statistics(minimum: Any, maximum: Any, mean: Any, quantiles: Sequence[Any]) -> Dict[str, Any]:
+    statistics: Dict[str, Any] = {"min": _float(minimum), "max": _float(maximum), "mean": _float(mean)}
+    statistics["quantiles"] = {
+        f"p{round(q * 100)}": _float(value) for q, value in zip(QUANTILES, quantiles) if _float(value) is not None
+    }
+
+    return {key: value for key, value in statistics.items() if value is not None and value != {}}
+
+
+def _numeric_statistics(numpy: Any, values: Any) -> List[Dict[str, Any]]:
+    """Returns the statistics of every column of a 2D float array, computed with one reduction per statistic
+    over all the columns at once. NaNs are ignored."""
+    if values.size == 0:
+        return [{} for _ in range(values.shape[1])]
+
+    with warnings.catch_warnings(), numpy.errstate(all="ignore"):
+        # Columns that are entirely null
+        warnings.simplefilter("ignore", RuntimeWarning)
+        minimums = numpy.nanmin(values, axis=0)
+        maximums = numpy.nanmax(values, axis=0)
+        means = numpy.nanmean(values, axis=0)
+        quantiles = numpy.nanquantile(values, QUANTILES, axis=0)
+
+    return [
+        _column_statistics(minimums[column], maximums[column], means[column], quantiles[:, column])
+        for column in range(values.shape[1])
+    ]
+
+
+def _profile(
+    rows: int,
+    columns: int,
+    sample_rows: Optional[int],
+    names: Sequence[Any],
+    dtypes: Sequence[Any],
+    null_rates: Sequence[Optional[float]],
+    numeric: Dict[int, Dict[str, Any]],
+) -> Dict[str, Any]:
+    profile: Dict[str, Any] = {"rows": rows, "columns": columns}
+    if sample_rows is not None:
+        profile["sample_rows"] = sample_rows
+
+    column_profiles = {}
+    for index, name in enumerate(names):
+        column_profile = {"dtype": str(dtypes[index])}
+        if null_rates[index] is not None:
+            column_profile["null_rate"] = null_rates[index]
+        column_profile.update(numeric.get(index, {}))
+        column_profiles[_column_key(name)] = column_profile
+
+    if column_profiles:
+        profile["column"] = column_profiles
+
+    return profile
+
+
+def _profile_pandas(frame: Any, sample_size: int, max_columns: int, seed: int) -> Dict[str, Any]:
+    pandas = sys.modules["pandas"]
+    numpy = sys.modules["numpy"]
+    types = pandas.api.types
+
+    if isinstance(frame, pandas.Series):
+        frame = frame.to_frame()
+
+    rows, columns = frame.shape
+    indices = _sample_indices(numpy, rows, sample_size, seed)
+    # A single indexing operation, so that only the sampled rows of the profiled columns are copied
+    frame = frame.iloc[slice(None) if indices is None else indices, :max_columns]
+
+    null_rates = frame.isna().to_numpy().mean(axis=0) if len(frame) else [0.0] * frame.shape[1]
+    numeric_columns = [
+        index
+        for index, dtype in enumerate(frame.dtypes)
+        if types.is_numeric_dtype(dtype) and not types.is_complex_dtype(dtype)
+    ]
+    values = frame.iloc[:, numeric_columns].to_numpy(dtype="float64", na_value=numpy.nan)
+
+    return _profile(
+        rows=rows,
+        columns=columns,
+        sample_rows=None if indices is None else len(indices),
+        names=list(frame.columns),
+        dtypes=list(frame.dtypes),
+        null_rates=[float(rate) for rate in null_rates],
+        numeric=dict(zip(numeric_columns, _numeric_statistics(numpy, values))),
+    )
+
+
+def _profile_polars(frame: Any, sample_size: int, max_columns: int, seed: int) -> Dict[str, Any]:
+    polars = sys.modules["polars"]
+
+    rows, columns = frame.height, frame.width
+    frame = frame.select(frame.columns[:max_columns])
+    sampled = rows > sample_size
+    if sampled:
+        frame = frame.sample(n=sample_size, seed=seed)
+
+    names = frame.columns
+    dtypes = [frame.schema[name] for name in names]
+    null_counts = frame.null_count().row(0)
+    numeric_columns = [index for index, dtype in enumerate(dtypes) if dtype.is_numeric() or dtype == polars.Boolean]
+
+    # All the statistics are computed by a single query over the profiled columns
+    expressions = []
+    for index in numeric_columns:
+        column = polars.col(names[index]).cast(polars.Float64).fill_nan(None)
+        expressions.extend([column.min(), column.max(), column.mean()])
+        expressions.extend(column.quantile(q, interpolation="linear") for q in QUANTILES)
+    results = frame.select([e.alias(str(i)) for i, e in enumerate(expressions)]).row(0) if expressions else ()
+
+    numeric = {}
+    width = 3 + len(QUANTILES)
+    for position, index in enumerate(numeric_columns):
+        minimum, maximum, mean, *quantiles = results[position * width : (position + 1) * width]
+        numeric[index] = _column_statistics(minimum, maximum, mean, quantiles)
+
+    return _profile(
+        rows=rows,
+        columns=columns,
+        sample_rows=sample_size if sampled else None,
+        names=names,
+        dtypes=dtypes,
+        null_rates=[count / frame.height if frame.height else 0.0 for count in null_counts],
+        numeric=numeric,
+    )
+
+
+def _profile_numpy(array: Any, sample_size: int, max_columns: int, seed: int) -> Optional[Dict[str, Any]]:
+    numpy = sys.modules["numpy"]
+
+    if array.ndim == 0 or array.dtype.names is not None:
+        return None
+
+    rows = array.shape[0]
+    columns = int(numpy.prod(array.shape[1:], dtype="int64"))
+    indices = _sample_indices(numpy, rows, sample_size, seed)
+    # Only the sampled rows are copied, before they are reshaped to columns
+    values = array if indices is None else array[indices]
+    values = values.reshape(len(values), columns)[:, :max_columns]
+
+    # Only floats have a null value, NaN
+    null_rates: List[Optional[float]] = [None] * values.shape[1]
+    if numpy.issubdtype(values.dtype, numpy.floating) and len(values):
+        null_rates = [float(rate) for rate in numpy.isnan(values).mean(axis=0)]
+
+    numeric = {}
+    is_real = numpy.issubdtype(values.dtype, numpy.number) and not numpy.issubdtype(values.dtype, numpy.complexfloating)
+    if is_real or values.dtype == numpy.bool_:
+        numeric = dict(enumerate(_numeric_statistics(numpy, values.astype("float64"))))
+
+    return _profile(
+        rows=rows,
+        columns=columns,
+        sample_rows=None if indices is None else len(indices),
+        names=list(range(values.shape[1])),
+        dtypes=[values.dtype] * values.shape[1],
+        null_rates=null_rates,
+        numeric=numeric,
+    )
+
+
+def profile_data(
+    data: Any, sample_size: int = DEFAULT_SAMPLE_SIZE, max_columns: int = DEFAULT_MAX_COLUMNS, seed: int = 0
+) -> Optional[Dict[str, Any]]:
+    """Returns summary statistics of a pandas, polars or numpy in-memory dataset, or None for other data.
+
+    The numbers of rows and columns are exact. Above `sample_size` rows, dtypes, null rates, minimums, maximums,
+    means and quantiles are computed on a uniform sample of the rows, so the time spent does not grow with the
+    size of the data. At most `max_columns` columns are profiled.
+
+    The libraries are never imported, data can only be a DataFrame of a library that is already imported.
+    """
+    if "pandas" in sys.modules:
+        pandas = sys.modules["pandas"]
+        if isinstance(data, (pandas.DataFrame, pandas.Series)):
+            return _profile_pandas(data, sample_size=sample_size, max_columns=max_columns, seed=seed)
+
+    if "polars" in sys.modules and isinstance(data, sys.modules["polars"].DataFrame):
+        return _profile_polars(data, sample_size=sample_size, max_columns=max_columns, seed=seed)
+
+    if "numpy" in sys.modules and isinstance(data, sys.modules["numpy"].ndarray):
+        return _profile_numpy(data, sample_size=sample_size, max_columns=max_columns, seed=seed)
+
+    return None
@@ -0,0 +1,210 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "DatasetIOTracker",
+    "IOStats",
+    "dataset_size",
+    "read_io_records",
+    "write_io_records",
+]
+
+import csv
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from kedro.io.core import (
+    AbstractDataset,
+    get_filepath_str,
+)
+
+# (dataset name, operation, seconds) where operation is "load" or "save"
+IORecord = Tuple[str, str, float]
+# IORecord with the size in bytes of the dataset, if known
+SizedIORecord = Tuple[str, str, float, Optional[int]]
+
+
+def _throughput(size: int, seconds: float) -> float:
+    """Throughput in MB/s."""
+    return size / 1e6 / seconds if seconds > 0 else 0.0
+
+
+def dataset_size(dataset: Optional[AbstractDataset]) -> Optional[int]:
+    """Returns the size in bytes of a file based dataset, or None if the filesystem does not report it."""
+    fs = getattr(dataset, "_fs", None)
+    if fs is None:
+        return None
+
+    try:
+        return fs.info(get_filepath_str(dataset._get_load_path(), dataset._protocol)).get("size")
+    except Exception:  # noqa: B902
+        return None
+
+
+def write_io_records(directory: str, records: Iterable[SizedIORecord]) -> None:
+    """Appends the records of the current process to its own file, so that workers never write to the same file."""
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, f"{os.getpid()}.jsonl"), "a") as records_file:
+        for record in records:
+            records_file.write(json.dumps(record) + "\n")
+
+
+def read_io_records(directory: str, remove: bool = False) -> List[SizedIORecord]:
+    records: List[SizedIORecord] = []
+
+    if os.path.isdir(directory):
+        for file_name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, file_name)) as records_file:
+                for line in records_file:
+                    if line.strip():
+                        name, operation, seconds, size = json.loads(line)
+                        records.append((name, operation, seconds, size))
+
+    if remove:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return records
+
+
+@dataclass()
+class IOStats:
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    total_bytes: int = 0
+    # Time spent on the operations whose size is known, used for the throughput
+    sized_time: float = field(default=0.0, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        return _throughput(self.total_bytes, self.sized_time)
+
+    def add(self, seconds: float, size: Optional[int]) -> None:
+        self.count += 1
+        self.total_time += seconds
+        self.max_time = max(self.max_time, seconds)
+
+        if size is not None:
+            self.total_bytes += size
+            self.sized_time += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "total_bytes": self.total_bytes,
+            "mean_throughput_mb_s": self.throughput,
+        }
+
+
+class DatasetIOTracker:
+    """Measures dataset load and save latencies from the `before/after_dataset_loaded/saved` hooks.
+
+    Kedro calls the `before_` and `after_` hooks of an operation in the same thread,
+    so start times are kept per thread. Finished operations wait in `pending` until the hooks
+    look up the dataset sizes and log them, and are then added to the per-run statistics with `add`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pending: List[IORecord] = []
+        self._stats: Dict[Tuple[str, str], IOStats] = {}
+
+    def _started(self) -> Dict[Tuple[str, str], int]:
+        started = getattr(self._local, "started", None)
+        if started is None:
+            started = self._local.started = {}
+
+        return started
+
+    def reset(self) -> None:
+        with self._lock:
+            self._local = threading.local()
+            self._pending = []
+            self._stats = {}
+
+    def start(self, operation: str, name: str) -> None:
+        self._started()[(operation, name)] = time.perf_counter_ns()
+
+    def stop(self, operation: str, name: str) -> None:
+        end = time.perf_counter_ns()
+        start = self._started().pop((operation, name), None)
+
+        if start is not None:
+            with self._lock:
+                self._pending.append((name, operation, (end - start) / 1e9))
+
+    def pop_pending(self) -> List[IORecord]:
+        with self._lock:
+            pending, self._pending = self._pending, []
+            return pending
+
+    def add(self, name: str, operation: str, seconds: float, size: Optional[int]) -> None:
+        with self._lock:
+            self._stats.setdefault((name, operation), IOStats()).add(seconds, size)
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            items = list(self._stats.items())
+
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (name, operation), stats in items:
+            result.setdefault(name, {})[operation] = stats.to_dict()
+
+        return result
+
+    def summary(self, limit: int = 10) -> str:
+        """Returns a CSV table of the slowest dataset operations by total time."""
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1].total_time, reverse=True)[:limit]
+
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(
+            ["dataset", "operation", "count", "total_time", "max_time", "total_bytes", "mean_throughput_mb_s"]
+        )
+        for (name, operation), stats in items:
+            writer.writerow(
+                [
+                    name,
+                    operation,
+                    stats.count,
+                    f"{stats.total_time:.6f}",
+                    f"{stats.max_time:.6f}",
+                    stats.total_bytes,
+                    f"{stats.throughput:.3f}",
+                ]
+            )
+
+        return output.getvalue()
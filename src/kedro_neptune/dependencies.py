@@ -0,0 +1,130 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "DependencyCache",
+    "environment_key",
+    "infer_requirements",
+]
+
+import hashlib
+import json
+import os
+import site
+import sys
+import sysconfig
+import threading
+from typing import (
+    Dict,
+    List,
+    Tuple,
+)
+
+from kedro_neptune.utils import write_json_atomically
+
+if sys.version_info >= (3, 8):
+    from importlib.metadata import distributions
+else:
+    from importlib_metadata import distributions
+
+DEPENDENCIES_FILE_NAME = "dependencies.json"
+
+
+def _site_packages_dirs() -> List[str]:
+    """Returns the directories packages are installed in: the site-packages directories and the user site."""
+    paths = [sysconfig.get_paths()["purelib"], sysconfig.get_paths()["platlib"]]
+
+    if hasattr(site, "getsitepackages"):
+        paths.extend(site.getsitepackages())
+    if site.ENABLE_USER_SITE:
+        paths.append(site.getusersitepackages())
+
+    return sorted({os.path.abspath(path) for path in paths})
+
+
+def environment_key() -> str:
+    """Returns a key of the installed environment: the interpreter and the modification times of the
+    site-packages directories, which change whenever a package is installed or removed. Other `sys.path` entries,
+    such as the sources of the project, are not part of the key, so editing them keeps the key."""
+    key = hashlib.sha256(f"{sys.executable}\0{sys.prefix}\n".encode())
+
+    for path in _site_packages_dirs():
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        key.update(f"{path}\0{mtime}\n".encode())
+
+    return key.hexdigest()
+
+
+def infer_requirements() -> str:
+    """Returns the installed distributions as `name==version` lines, the way Neptune does for `dependencies: infer`."""
+    requirements = {}
+
+    for distribution in distributions():
+        name = distribution.metadata["Name"]
+        if isinstance(name, str) and name:
+            # The first distribution found on `sys.path` is the one that is imported
+            requirements.setdefault(name.lower(), f"{name}=={distribution.metadata['Version']}")
+
+    return "\n".join(requirement for _, requirement in sorted(requirements.items()))
+
+
+class DependencyCache:
+    """Requirements of the installed environment, computed once per environment.
+
+    The requirements are kept in memory for the process and saved in `cache_dir` with the environment key,
+    so later runs and other processes using the same environment read them instead of listing all the
+    installed distributions again.
+
+    Args:
+        cache_dir: Directory where the requirements are stored.
+    """
+
+    _memory: Dict[str, Tuple[str, str]] = {}
+    _memory_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str):
+        self._path = os.path.join(cache_dir, DEPENDENCIES_FILE_NAME)
+
+        self.computed: bool = False
+
+    def requirements(self) -> Tuple[str, str]:
+        """Returns the requirements and their SHA-256 hash."""
+        key = environment_key()
+
+        with self._memory_lock:
+            if key in self._memory:
+                return self._memory[key]
+
+        try:
+            with open(self._path) as dependencies_file:
+                content = json.load(dependencies_file)
+        except (OSError, ValueError):
+            content = {}
+
+        if content.get("key") == key:
+            requirements, digest = content["requirements"], content["sha256"]
+        else:
+            requirements = infer_requirements()
+            digest = hashlib.sha256(requirements.encode()).hexdigest()
+            write_json_atomically(self._path, {"key": key, "requirements": requirements, "sha256": digest})
+            self.computed = True
+
+        with self._memory_lock:
+            self._memory[key] = requirements, digest
+
+        return requirements, digest
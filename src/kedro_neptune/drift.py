@@ -0,0 +1,211 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "PREVIOUS_RUN",
+    "DriftStore",
+    "column_drift",
+    "dataset_drift",
+    "kolmogorov_smirnov_distance",
+    "population_stability_index",
+]
+
+import os
+import threading
+import urllib.parse
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# Optional dependency (`sketches` extra): the hooks import this module only once numpy is imported
+import numpy as np
+
+from kedro_neptune.sketches import (
+    ColumnSketch,
+    DatasetSketch,
+    TDigest,
+)
+from kedro_neptune.utils import write_bytes_atomically
+
+PREVIOUS_RUN = "previous"
+PSI_BINS = 10
+# Proportions below this are rounded up, so that a bin missing from one of the runs gives a finite index
+PSI_EPSILON = 1e-4
+STORE_SUFFIX = ".npz"
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Returns the population stability index of two distributions given as proportions per bin.
+
+    Below 0.1 the distributions are usually considered the same, above 0.25 significantly different.
+    """
+    expected = np.maximum(expected, PSI_EPSILON)
+    actual = np.maximum(actual, PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def kolmogorov_smirnov_distance(baseline: TDigest, current: TDigest) -> float:
+    """Returns the largest difference between the estimated cumulative distributions of two digests."""
+    points = np.concatenate(
+        [baseline.means, current.means, [baseline.minimum, baseline.maximum, current.minimum, current.maximum]]
+    )
+    return float(np.max(np.abs(baseline.cdf(points) - current.cdf(points))))
+
+
+def _numeric_drift(baseline: TDigest, current: TDigest) -> Dict[str, float]:
+    # Bins of equal baseline frequency, bins of repeated values are empty in both runs and do not count
+    edges = baseline.quantile(np.arange(1, PSI_BINS) / PSI_BINS)
+    expected = np.diff(np.concatenate([[0.0], baseline.cdf(edges), [1.0]]))
+    actual = np.diff(np.concatenate([[0.0], current.cdf(edges), [1.0]]))
+
+    return {
+        "psi": population_stability_index(expected, actual),
+        "ks": kolmogorov_smirnov_distance(baseline, current),
+    }
+
+
+def _categorical_drift(baseline: ColumnSketch, current: ColumnSketch) -> Dict[str, float]:
+    # Bins of the most frequent values of either run, and one bin of all the other values
+    hashes = np.fromiter(set(baseline.candidates) | set(current.candidates), dtype=np.uint64)
+    proportions = []
+    for column in (baseline, current):
+        frequent = np.minimum(column.frequencies.estimate(hashes) / column.count, 1.0)
+        proportions.append(np.append(frequent, max(0.0, 1.0 - float(frequent.sum()))))
+
+    return {"psi": population_stability_index(*proportions)}
+
+
+def _null_rate(column: ColumnSketch) -> float:
+    total = column.count + column.nulls
+    return column.nulls / total if total else 0.0
+
+
+def column_drift(baseline: ColumnSketch, current: ColumnSketch) -> Dict[str, float]:
+    """Returns the distances between the distributions of a column in two runs, computed from their sketches.
+
+    Numbers are compared by the population stability index over deciles of the baseline and by the
+    Kolmogorov-Smirnov distance, other values by the population stability index over the most frequent values.
+    """
+    drift = {"null_rate_change": _null_rate(current) - _null_rate(baseline)}
+
+    if baseline.count and current.count:
+        if baseline.digest.means.size and current.digest.means.size:
+            drift.update(_numeric_drift(baseline.digest, current.digest))
+        else:
+            drift.update(_categorical_drift(baseline, current))
+
+    return drift
+
+
+def dataset_drift(baseline: DatasetSketch, current: DatasetSketch) -> Dict[str, Any]:
+    """Returns the drift of every column sketched in both runs, and the largest distances over the columns."""
+    columns = {
+        name.replace("/", "_"): column_drift(baseline.columns[name], column)
+        for name, column in current.columns.items()
+        if name in baseline.columns
+    }
+
+    drift: Dict[str, Any] = {"rows_change": current.rows - baseline.rows}
+    for distance in ("psi", "ks"):
+        values = [column[distance] for column in columns.values() if distance in column]
+        if values:
+            drift[f"max_{distance}"] = max(values)
+    if columns:
+        drift["column"] = columns
+
+    return drift
+
+
+def _quote(name: str) -> str:
+    return urllib.parse.quote(name, safe="")
+
+
+class DriftStore:
+    """Local store of the sketches of the datasets saved by the runs, the only data that drift is computed from.
+
+    Sketches are stored as one compressed numpy archive per dataset and run, in a directory per dataset named after
+    the dataset and a file named after the run, so that a baseline is read without reading any other run.
+    Only the `max_runs` most recent runs of every dataset are kept, besides the runs passed to `put` to be kept.
+
+    Args:
+        directory: Directory where the sketches are stored.
+        max_runs: Number of runs kept per dataset.
+    """
+
+    def __init__(self, directory: str, max_runs: int):
+        self._directory = directory
+        self._max_runs = max_runs
+        self._lock = threading.Lock()
+
+    def _path(self, name: str, run_id: str) -> str:
+        return os.path.join(self._directory, _quote(name), f"{_quote(run_id)}{STORE_SUFFIX}")
+
+    def runs(self, name: str) -> List[str]:
+        """Returns the IDs of the runs that saved the dataset, from the oldest to the most recent."""
+        directory = os.path.join(self._directory, _quote(name))
+        entries: List[Tuple[int, str]] = []
+
+        if os.path.isdir(directory):
+            with os.scandir(directory) as items:
+                for item in items:
+                    if not item.name.endswith(STORE_SUFFIX):
+                        continue
+                    try:
+                        entries.append((item.stat().st_mtime_ns, item.name))
+                    except OSError:
+                        continue
+
+        return [urllib.parse.unquote(file_name[: -len(STORE_SUFFIX)]) for _, file_name in sorted(entries)]
+
+    def get(self, name: str, run_id: str) -> Optional[DatasetSketch]:
+        try:
+            with open(self._path(name, run_id), "rb") as sketch_file:
+                return DatasetSketch.from_bytes(sketch_file.read())
+        except FileNotFoundError:
+            return None
+        except Exception:  # noqa: B902
+            # Written by an incompatible version, or removed in the meantime
+            return None
+
+    def baseline(self, name: str, run_id: str, baseline: str = PREVIOUS_RUN) -> Optional[Tuple[str, DatasetSketch]]:
+        """Returns the ID and the sketch of the baseline run of a dataset: the most recent run other than `run_id`,
+        or the run with the ID `baseline`. Returns None if the baseline run did not save the dataset."""
+        if baseline == PREVIOUS_RUN:
+            previous = [other for other in self.runs(name) if other != run_id]
+            if not previous:
+                return None
+            baseline = previous[-1]
+
+        sketch = self.get(name, baseline)
+        return None if sketch is None else (baseline, sketch)
+
+    def put(self, name: str, run_id: str, sketch: DatasetSketch, keep: Iterable[str] = ()) -> None:
+        write_bytes_atomically(self._path(name, run_id), sketch.to_bytes())
+        self._prune(name, keep={run_id, *keep})
+
+    def _prune(self, name: str, keep: Iterable[str]) -> None:
+        with self._lock:
+            # The run being put is one of the most recent runs
+            runs = [run for run in self.runs(name) if run not in keep]
+            for run in runs[: max(0, len(runs) - self._max_runs + 1)]:
+                try:
+                    os.remove(self._path(name, run))
+                except OSError:
+                    continue
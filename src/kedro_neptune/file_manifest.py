@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "FileManifest",
+    "hash_stream",
+]
+
+import hashlib
+import json
+import os
+import threading
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+from kedro_neptune.utils import write_json_atomically
+
+MANIFEST_FILE_NAME = "file_manifest.json"
+
+
+def hash_stream(stream: IO[bytes], chunk_size: int) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+
+    chunk = stream.read(chunk_size)
+    while chunk:
+        digest.update(chunk)
+        size += len(chunk)
+        chunk = stream.read(chunk_size)
+
+    return digest.hexdigest(), size
+
+
+class FileManifest:
+    """Local cache of file content hashes and of the runs the contents were uploaded to.
+
+    Hashes are keyed by file location, size and modification time, so unchanged files are never re-hashed.
+    Uploads are keyed by content hash and Neptune project, so identical contents can be logged
+    as a reference to the run that already holds the bytes.
+
+    Args:
+        directory: Directory where the manifest file is stored.
+        project: Neptune project of the current run.
+        run_id: Custom run ID of the current run.
+    """
+
+    def __init__(self, directory: str, project: Optional[str], run_id: Optional[str]):
+        self._path = os.path.join(directory, MANIFEST_FILE_NAME)
+        self._project = project or ""
+        self._run_id = run_id or ""
+        self._lock = threading.Lock()
+        self._hashes: Dict[str, Dict[str, Any]] = {}
+        self._uploads: Dict[str, Dict[str, Any]] = {}
+        self._dirty: bool = False
+
+        self.bytes_uploaded: int = 0
+        self.bytes_skipped: int = 0
+
+        self._read()
+
+    def _read(self) -> None:
+        try:
+            with open(self._path) as manifest_file:
+                content = json.load(manifest_file)
+        except (OSError, ValueError):
+            return
+
+        self._hashes.update(content.get("hashes", {}))
+        self._uploads.update(content.get("uploads", {}))
+
+    def content_hash(self, key: str, size: int, mtime: Optional[Any], compute: Callable[[], Tuple[str, int]]) -> str:
+        with self._lock:
+            entry = self._hashes.get(key)
+            if entry is not None and mtime is not None and entry["size"] == size and entry["mtime"] == mtime:
+                return entry["sha256"]
+
+        digest, _ = compute()
+
+        with self._lock:
+            self._hashes[key] = {"size": size, "mtime": mtime, "sha256": digest}
+            self._dirty = True
+
+        return digest
+
+    def find_upload(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._uploads.get(f"{self._project}/{digest}")
+
+    def record_upload(self, digest: str, size: int, attribute_path: str) -> None:
+        with self._lock:
+            self._uploads[f"{self._project}/{digest}"] = {
+                "run_id": self._run_id,
+                "path": attribute_path,
+                "size": size,
+            }
+            self.bytes_uploaded += size
+            self._dirty = True
+
+    def record_skip(self, size: int) -> None:
+        with self._lock:
+            self.bytes_skipped += size
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+
+            # Merge with entries saved in the meantime by other processes
+            hashes, uploads = self._hashes, self._uploads
+            self._hashes, self._uploads = {}, {}
+            self._read()
+            self._hashes.update(hashes)
+            self._uploads.update(uploads)
+
+            write_json_atomically(self._path, {"hashes": self._hashes, "uploads": self._uploads})
+            self._dirty = False
@@ -0,0 +1,133 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "FileUploader",
+    "UploadJob",
+    "UploadResult",
+]
+
+import threading
+import time
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    as_completed,
+)
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# (name, size in bytes, function performing the upload)
+UploadJob = Tuple[str, int, Callable[[], None]]
+
+
+@dataclass()
+class UploadResult:
+    """Result of an upload job.
+
+    `enqueue_seconds` is the time spent in the upload function. The Neptune client only queues the upload
+    and sends the file in the background, so this is the latency of queuing the file, not its transfer time.
+    """
+
+    name: str
+    size: int
+    enqueue_seconds: float
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "status": "failed" if self.error else "done",
+            "size": self.size,
+            "enqueue_seconds": self.enqueue_seconds,
+        }
+        if self.error:
+            result["error"] = self.error
+
+        return result
+
+
+class FileUploader:
+    """Uploads files with a pool of threads, largest files first.
+
+    Failed uploads do not interrupt the others, they are collected in `failures`
+    so that they can be reported at the end of the pipeline.
+
+    Args:
+        max_workers: Maximum number of concurrent uploads. With 1, files are uploaded in the calling thread.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._max_workers = max(1, int(max_workers))
+        self._lock = threading.Lock()
+        self.total: int = 0
+        self.completed: int = 0
+        self.failures: Dict[str, str] = {}
+
+    @property
+    def concurrent(self) -> bool:
+        return self._max_workers > 1
+
+    def run(
+        self, jobs: Iterable[UploadJob], on_done: Optional[Callable[[UploadResult], None]] = None
+    ) -> List[UploadResult]:
+        jobs = sorted(jobs, key=lambda job: job[1], reverse=True)
+
+        with self._lock:
+            self.total += len(jobs)
+
+        if self._max_workers == 1 or len(jobs) <= 1:
+            return [self._finish(self._upload(job), on_done) for job in jobs]
+
+        results = []
+        with ThreadPoolExecutor(
+            max_workers=min(self._max_workers, len(jobs)), thread_name_prefix="kedro-neptune-upload"
+        ) as executor:
+            futures = [executor.submit(self._upload, job) for job in jobs]
+            for future in as_completed(futures):
+                results.append(self._finish(future.result(), on_done))
+
+        return results
+
+    @staticmethod
+    def _upload(job: UploadJob) -> UploadResult:
+        name, size, upload = job
+        start = time.perf_counter()
+
+        try:
+            upload()
+        except Exception as exception:  # noqa: B902
+            return UploadResult(
+                name=name, size=size, enqueue_seconds=time.perf_counter() - start, error=repr(exception)
+            )
+
+        return UploadResult(name=name, size=size, enqueue_seconds=time.perf_counter() - start)
+
+    def _finish(self, result: UploadResult, on_done: Optional[Callable[[UploadResult], None]]) -> UploadResult:
+        with self._lock:
+            self.completed += 1
+            if result.error:
+                self.failures[result.name] = result.error
+
+        if on_done is not None:
+            on_done(result)
+
+        return result
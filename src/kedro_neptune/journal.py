@@ -0,0 +1,290 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "Journal",
+    "list_journals",
+    "read_journal_metadata",
+    "sync_journal",
+]
+
+import hashlib
+import heapq
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from kedro_neptune.neptune_client import neptune_client
+from kedro_neptune.utils import write_json_atomically
+from kedro_neptune.writer import (
+    Record,
+    RecordingNamespace,
+    apply_record,
+)
+
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+METADATA_FILE_NAME = "journal.json"
+CHECKPOINT_FILE_NAME = "checkpoint.json"
+BLOBS_DIR_NAME = "blobs"
+SEGMENT_SUFFIX = ".jsonl"
+BLOB_CHUNK_SIZE = 8 * 1024 * 1024
+
+FILE_KEY = "__neptune_file__"
+DATETIME_KEY = "__datetime__"
+
+
+class Journal:
+    """Run-like object writing records to an append-only local journal instead of sending them to Neptune.
+
+    Every process appends JSON lines to its own segment files, which are rotated when they reach `segment_size`.
+    Uploaded files are copied to a content-addressed `blobs` directory, so the journal stays valid
+    when the original files change. Journals are replayed to Neptune with `sync_journal`.
+
+    It supports item access, assignments, `append`, `extend` and `upload`, which is what the plugin hooks use.
+    Values that are read back from the run (e.g. `fetch`) are not available.
+
+    Args:
+        directory: Directory of the journals, the journal of the run is stored in its `run_id` subdirectory.
+        run_id: Custom run ID the journal is replayed to.
+        project: Neptune project the journal is replayed to.
+        segment_size: Size in bytes after which a new segment file is started.
+    """
+
+    def __init__(
+        self, directory: str, run_id: str, project: Optional[str] = None, segment_size: int = DEFAULT_SEGMENT_SIZE
+    ):
+        self._path = os.path.join(directory, run_id)
+        self._segment_size = segment_size
+        self._lock = threading.Lock()
+        self._segment: Optional[IO[str]] = None
+        self._segment_index: int = 0
+        self._sequence: int = 0
+
+        os.makedirs(os.path.join(self._path, BLOBS_DIR_NAME), exist_ok=True)
+        if not os.path.exists(os.path.join(self._path, METADATA_FILE_NAME)):
+            write_json_atomically(
+                os.path.join(self._path, METADATA_FILE_NAME),
+                {"run_id": run_id, "project": project, "created": time.time()},
+            )
+
+        self.written: int = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def __getitem__(self, path: str) -> RecordingNamespace:
+        return RecordingNamespace(sink=self.submit, path=path, container=self)
+
+    def __setitem__(self, path: str, value: Any) -> None:
+        self.submit(("assign", path, value))
+
+    def exists(self, path: str) -> bool:
+        return False
+
+    def get_root_object(self) -> "Journal":
+        return self
+
+    def _open_segment(self) -> IO[str]:
+        if self._segment is not None and self._segment.tell() < self._segment_size:
+            return self._segment
+
+        if self._segment is not None:
+            self._segment.close()
+            self._segment_index += 1
+
+        # Segments of the same process sort in the order they were written
+        name = f"{os.getpid()}-{self._segment_index:06d}{SEGMENT_SUFFIX}"
+        self._segment = open(os.path.join(self._path, name), "a")
+        return self._segment
+
+    def _encode(self, value: Any) -> Any:
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+
+        if isinstance(value, dict):
+            return {str(key): self._encode(item) for key, item in value.items()}
+
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+
+        if isinstance(value, neptune_client().File):
+            return {FILE_KEY: self._store_blob(value)}
+
+        if isinstance(value, datetime):
+            return {DATETIME_KEY: value.isoformat()}
+
+        return str(value)
+
+    def _store_blob(self, file: Any) -> str:
+        digest = hashlib.sha256()
+        tmp_path = os.path.join(self._path, BLOBS_DIR_NAME, f".{os.getpid()}-{threading.get_ident()}.tmp")
+
+        def write(blob: IO[bytes], chunk: bytes) -> None:
+            blob.write(chunk)
+            digest.update(chunk)
+
+        def copy(source: IO[Any], blob: IO[bytes]) -> None:
+            chunk = source.read(BLOB_CHUNK_SIZE)
+            while chunk:
+                write(blob, chunk.encode() if isinstance(chunk, str) else chunk)
+                chunk = source.read(BLOB_CHUNK_SIZE)
+
+        file_type = file.file_type.name
+        with open(tmp_path, "wb") as blob:
+            if file_type == "LOCAL_FILE":
+                with open(file.path, "rb") as source:
+                    copy(source, blob)
+            elif file_type == "STREAM":
+                # `File.content` reads the whole stream at once, and a stream can only be read once
+                copy(_take_stream(file), blob)
+            else:
+                write(blob, file.content)
+
+        name = digest.hexdigest() + (f".{file.extension}" if file.extension else "")
+        os.replace(tmp_path, os.path.join(self._path, BLOBS_DIR_NAME, name))
+
+        return f"{BLOBS_DIR_NAME}/{name}"
+
+    def submit(self, record: Record) -> None:
+        method, path, value = record
+        encoded = self._encode(value)
+
+        with self._lock:
+            self._sequence += 1
+            line = json.dumps({"t": time.time_ns(), "s": self._sequence, "m": method, "p": path, "v": encoded})
+            self._open_segment().write(line + "\n")
+            self.written += 1
+
+    def sync(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._segment is not None:
+                self._segment.flush()
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+
+
+def _take_stream(file: Any) -> IO[Any]:
+    composite = file._file_composite
+    if composite._stream_read:
+        raise neptune_client().neptune.exceptions.StreamAlreadyUsedException()
+    composite._stream_read = True
+
+    return composite._stream
+
+
+def _decode(value: Any, path: str) -> Any:
+    if isinstance(value, dict):
+        if FILE_KEY in value:
+            return neptune_client().File(os.path.join(path, value[FILE_KEY]))
+        if DATETIME_KEY in value:
+            return datetime.fromisoformat(value[DATETIME_KEY])
+        return {key: _decode(item, path) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_decode(item, path) for item in value]
+
+    return value
+
+
+def list_journals(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, name, METADATA_FILE_NAME))
+    )
+
+
+def read_journal_metadata(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, METADATA_FILE_NAME)) as metadata_file:
+        return json.load(metadata_file)
+
+
+def _read_segment(path: str, name: str, offset: int) -> Iterator[Tuple[int, int, str, int, Dict[str, Any]]]:
+    with open(os.path.join(path, name), "rb") as segment:
+        segment.seek(offset)
+        for line in segment:
+            # A line without a newline is still being written
+            if not line.endswith(b"\n"):
+                return
+            offset += len(line)
+            entry = json.loads(line)
+            yield entry["t"], entry["s"], name, offset, entry
+
+
+def sync_journal(
+    path: str,
+    run: Any,
+    batch_size: int = 1000,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Replays the records of a journal that were not replayed yet, and returns their number.
+
+    Records of all the segments are merged by time. After every `batch_size` records the run is synchronized
+    and the position reached in every segment is saved to a checkpoint, so an interrupted sync resumes
+    from the last finished batch.
+    """
+    checkpoint_path = os.path.join(path, CHECKPOINT_FILE_NAME)
+    try:
+        with open(checkpoint_path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+    except (OSError, ValueError):
+        checkpoint = {"offsets": {}, "applied": 0}
+
+    offsets: Dict[str, int] = checkpoint["offsets"]
+    segments = sorted(name for name in os.listdir(path) if name.endswith(SEGMENT_SUFFIX))
+    merged = heapq.merge(*(_read_segment(path, name, offsets.get(name, 0)) for name in segments))
+
+    def save_checkpoint() -> None:
+        run.sync()
+        write_json_atomically(checkpoint_path, checkpoint)
+        if on_batch is not None:
+            on_batch(checkpoint["applied"])
+
+    applied = pending = 0
+    for _, _, name, offset, entry in merged:
+        apply_record(run, (entry["m"], entry["p"], _decode(entry["v"], path)))
+        offsets[name] = offset
+        checkpoint["applied"] += 1
+        applied += 1
+        pending += 1
+
+        if pending >= batch_size:
+            save_checkpoint()
+            pending = 0
+
+    if pending:
+        save_checkpoint()
+
+    return applied
@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "LineageEntry",
+    "LineageIndex",
+    "load_version",
+    "save_version",
+]
+
+import json
+import os
+import time
+import urllib.parse
+from typing import (
+    NamedTuple,
+    Optional,
+)
+
+from kedro.io.core import (
+    AbstractDataset,
+    AbstractVersionedDataset,
+)
+
+from kedro_neptune.utils import write_json_atomically
+
+ENTRY_SUFFIX = ".json"
+
+
+def _is_versioned(dataset: Optional[AbstractDataset]) -> bool:
+    return isinstance(dataset, AbstractVersionedDataset) and dataset._version is not None
+
+
+def load_version(dataset: Optional[AbstractDataset]) -> Optional[str]:
+    """Returns the version loaded by a versioned dataset, the latest one unless a version is pinned,
+    or None if the dataset is not versioned or has no version yet."""
+    if not _is_versioned(dataset):
+        return None
+
+    try:
+        # Cached by the dataset, already resolved when the dataset was loaded
+        return dataset.resolve_load_version()
+    except Exception:  # noqa: B902
+        return None
+
+
+def save_version(dataset: Optional[AbstractDataset]) -> Optional[str]:
+    """Returns the version saved by a versioned dataset, or None if the dataset is not versioned."""
+    if not _is_versioned(dataset):
+        return None
+
+    try:
+        return dataset.resolve_save_version()
+    except Exception:  # noqa: B902
+        return None
+
+
+class LineageEntry(NamedTuple):
+    run_id: str
+    project: Optional[str]
+    # Name of the node that saved the version, None if it was not saved by a node
+    node: Optional[str]
+    # Time at which the version was saved, in seconds since the epoch
+    time: float
+
+
+def _quote(name: str) -> str:
+    return urllib.parse.quote(name, safe="")
+
+
+class LineageIndex:
+    """Local index of the runs that saved the versions of versioned datasets.
+
+    Every version is a single small file in a directory per dataset, named after the version, so that finding the run
+    that saved a version opens one file whatever the number of versions and runs, without querying Neptune.
+    Entries are written atomically, so `ParallelRunner` workers and concurrent runs can share the index.
+
+    Args:
+        directory: Directory where the index is stored.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def _path(self, name: str, version: str) -> str:
+        return os.path.join(self._directory, _quote(name), f"{_quote(version)}{ENTRY_SUFFIX}")
+
+    def record(
+        self, name: str, version: str, run_id: str, project: Optional[str] = None, node: Optional[str] = None
+    ) -> None:
+        entry = LineageEntry(run_id=run_id, project=project, node=node, time=time.time())
+        write_json_atomically(self._path(name, version), entry._asdict())
+
+    def lookup(self, name: str, version: str) -> Optional[LineageEntry]:
+        """Returns the run that saved the version of the dataset, or None if it is not in the index."""
+        try:
+            with open(self._path(name, version), encoding="utf-8") as entry_file:
+                return LineageEntry(**json.load(entry_file))
+        except (OSError, TypeError, ValueError):
+            # Not in the index, or written by an incompatible version
+            return None
@@ -0,0 +1,60 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "CUSTOM_RUN_ID_ENV_NAME",
+    "neptune_client",
+]
+
+from functools import lru_cache
+from types import SimpleNamespace
+
+# Same in all the client versions, defined here so that reading the run ID does not import the client
+CUSTOM_RUN_ID_ENV_NAME = "NEPTUNE_CUSTOM_RUN_ID"
+
+
+@lru_cache(maxsize=None)
+def neptune_client() -> SimpleNamespace:
+    """Imports the Neptune client on first use and returns the parts of it used by the plugin.
+
+    Importing the client takes most of the import time of the plugin, which is loaded by every `kedro` command
+    through its entry points, including the ones that never run a pipeline.
+
+    Returns:
+        Namespace with the `neptune` package, the `Handler` and `File` classes,
+        and the `join_paths` and `stringify_unsupported` functions.
+    """
+    try:
+        # neptune-client>=1.0.0 package structure
+        import neptune
+        from neptune.handler import Handler
+        from neptune.integrations.utils import join_paths
+        from neptune.types import File
+        from neptune.utils import stringify_unsupported
+    except ImportError:
+        # neptune-client=0.9.0+ package structure
+        import neptune.new as neptune
+        from neptune.new.handler import Handler
+        from neptune.new.integrations.utils import join_paths
+        from neptune.new.types import File
+        from neptune.new.utils import stringify_unsupported
+
+    return SimpleNamespace(
+        neptune=neptune,
+        Handler=Handler,
+        File=File,
+        join_paths=join_paths,
+        stringify_unsupported=stringify_unsupported,
+    )
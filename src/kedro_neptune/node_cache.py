@@ -0,0 +1,362 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "CacheEntry",
+    "NodeCache",
+    "dataset_fingerprint",
+    "function_fingerprint",
+    "node_fingerprint",
+    "read_fingerprints",
+    "replay_function",
+    "value_fingerprint",
+    "write_fingerprints",
+]
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from kedro.io.core import (
+    AbstractDataset,
+    get_filepath_str,
+)
+
+from kedro_neptune.file_manifest import (
+    FileManifest,
+    hash_stream,
+)
+from kedro_neptune.utils import write_bytes_atomically
+
+ENTRY_SUFFIX = ".pkl"
+HASH_CHUNK_SIZE = 1024 * 1024
+# Keys of the `info()` of fsspec filesystems identifying the content of an object: S3, then Azure and GCS
+REMOTE_CHECKSUM_KEYS = ("ETag", "etag", "md5Hash", "crc32c")
+
+
+class CacheEntry(NamedTuple):
+    outputs: Dict[str, Any]
+    # Execution time of the node run that produced the outputs, i.e. the time saved by a hit
+    execution_time: Optional[float]
+
+
+class _ValueTooLarge(Exception):
+    pass
+
+
+class _HashWriter:
+    """File-like object hashing the pickle stream as it is written, so that no copy of the value is made."""
+
+    def __init__(self, max_size: Optional[int]):
+        self.digest = hashlib.sha256()
+        self._size = 0
+        self._max_size = max_size
+
+    def update(self, data: Any) -> None:
+        self._size += memoryview(data).nbytes
+        if self._max_size is not None and self._size > self._max_size:
+            raise _ValueTooLarge()
+        self.digest.update(data)
+
+    def write(self, data: Any) -> None:
+        self.update(data)
+
+    def buffer_callback(self, buffer: pickle.PickleBuffer) -> bool:
+        # Large contiguous buffers, e.g. of NumPy arrays, are hashed in place instead of being copied into the stream
+        try:
+            self.update(buffer.raw())
+        except BufferError:
+            return True
+        return False
+
+
+def value_fingerprint(value: Any, max_size: Optional[int] = None) -> Optional[str]:
+    """Returns the SHA-256 hash of the pickled value, or None if it cannot be pickled or if it pickles to more than
+    `max_size` bytes.
+
+    The value is hashed as it is pickled, without keeping the pickle in memory, but every byte is still hashed.
+    Values are not sampled, as two values differing outside of the sample would return outputs of the wrong run.
+    """
+    writer = _HashWriter(max_size=max_size)
+
+    try:
+        pickle.Pickler(writer, protocol=5, buffer_callback=writer.buffer_callback).dump(value)
+    except Exception:  # noqa: B902
+        return None
+
+    return writer.digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=256)
+def _source_file_hash(path: str, mtime: int) -> Optional[str]:
+    try:
+        with open(path, "rb") as source_file:
+            return hash_stream(source_file, chunk_size=HASH_CHUNK_SIZE)[0]
+    except OSError:
+        return None
+
+
+def _module_fingerprint(func: Callable) -> str:
+    """Returns the hash of the source file of the module defining the function, so that changes to the helpers
+    and constants of the module invalidate the fingerprint. Returns an empty string if the source is unavailable."""
+    try:
+        path = inspect.getsourcefile(func)
+    except TypeError:
+        return ""
+
+    if path is None or not os.path.isfile(path):
+        return ""
+
+    return _source_file_hash(path, os.stat(path).st_mtime_ns) or ""
+
+
+def function_fingerprint(func: Callable) -> Optional[str]:
+    """Returns a hash of the source code of a node function, of the source file of its module and of the arguments
+    bound by `functools.partial`, or None if neither the source nor the bytecode of the function is available.
+
+    Code called by the function from other modules, such as helpers of the project imported by the module,
+    and the versions of the libraries are not part of the fingerprint.
+    """
+    digest = hashlib.sha256()
+
+    while isinstance(func, functools.partial):
+        arguments = value_fingerprint((func.args, func.keywords))
+        if arguments is None:
+            return None
+        digest.update(f"partial\0{arguments}\n".encode())
+        func = func.func
+
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        if code is None:
+            return None
+        source = code.co_code.hex()
+
+    digest.update(f"module\0{_module_fingerprint(func)}\n".encode())
+    digest.update(f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', '')}\0{source}".encode())
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(dataset: Optional[AbstractDataset], manifest: FileManifest) -> Optional[str]:
+    """Returns a fingerprint of the data loaded by a file based dataset: the load path of a versioned dataset,
+    which contains the version, the content hash of a local file, or the entity tag or checksum and size reported
+    by a remote filesystem. Returns None for other datasets."""
+    if getattr(dataset, "_fs", None) is None or not hasattr(dataset, "_get_load_path"):
+        return None
+
+    try:
+        path = get_filepath_str(dataset._get_load_path(), dataset._protocol)
+    except Exception:  # noqa: B902
+        return None
+
+    if getattr(dataset, "_version", None) is not None:
+        return f"version\0{dataset._protocol}\0{path}"
+
+    if dataset._protocol != "file":
+        return _remote_file_fingerprint(dataset, path)
+
+    if not os.path.isfile(path):
+        return None
+
+    stat = os.stat(path)
+
+    def compute() -> Any:
+        with open(path, "rb") as dataset_file:
+            return hash_stream(dataset_file, chunk_size=HASH_CHUNK_SIZE)
+
+    return manifest.content_hash(key=os.path.abspath(path), size=stat.st_size, mtime=stat.st_mtime_ns, compute=compute)
+
+
+def _remote_file_fingerprint(dataset: AbstractDataset, path: str) -> Optional[str]:
+    try:
+        info = dataset._fs.info(path)
+    except Exception:  # noqa: B902
+        return None
+
+    if info.get("type") != "file":
+        return None
+
+    # Object stores change the entity tag or checksum of an object when it is rewritten
+    for key in REMOTE_CHECKSUM_KEYS:
+        if info.get(key):
+            return f"remote\0{dataset._protocol}\0{path}\0{info.get('size')}\0{info[key]}"
+
+    return None
+
+
+def node_fingerprint(function: str, inputs: Dict[str, str], outputs: List[str]) -> str:
+    """Returns the fingerprint of a node run from the fingerprints of its function and of its inputs."""
+    digest = hashlib.sha256(function.encode())
+
+    for name in sorted(inputs):
+        digest.update(f"\0input\0{name}\0{inputs[name]}".encode())
+    for name in sorted(outputs):
+        digest.update(f"\0output\0{name}".encode())
+
+    return digest.hexdigest()
+
+
+def _return(result: Any, *args, **kwargs) -> Any:
+    return result
+
+
+def replay_function(func: Callable, node_outputs: Union[None, str, List[str], Dict[str, str]], outputs: Dict[str, Any]):
+    """Returns a function that returns the cached outputs in the structure of the node outputs instead of running.
+
+    The function has the name and the signature of `func`, so that Kedro names and binds the node as before.
+    """
+    if isinstance(node_outputs, str):
+        result: Any = outputs[node_outputs]
+    elif isinstance(node_outputs, dict):
+        result = {key: outputs[name] for key, name in node_outputs.items()}
+    else:
+        result = [outputs[name] for name in node_outputs or []]
+
+    if hasattr(func, "__name__"):
+        replay = functools.update_wrapper(functools.partial(_return, result), func)
+    else:
+        # Kedro names nodes of functions without a name, e.g. partials, after their repr
+        replay = functools.partial(_return, result)
+
+    try:
+        replay.__signature__ = inspect.signature(func)
+    except (TypeError, ValueError):
+        pass
+
+    return replay
+
+
+def write_fingerprints(directory: str, fingerprints: Dict[str, str]) -> None:
+    """Appends the output fingerprints of the nodes run by the current process to its own file, so that
+    `ParallelRunner` workers running the downstream nodes identify their inputs the same way."""
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, f"{os.getpid()}.jsonl"), "a") as fingerprints_file:
+        for name, fingerprint in fingerprints.items():
+            fingerprints_file.write(json.dumps({"name": name, "fingerprint": fingerprint}) + "\n")
+
+
+def read_fingerprints(directory: str, remove: bool = False) -> Dict[str, str]:
+    fingerprints = {}
+
+    if os.path.isdir(directory):
+        for file_name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, file_name)) as fingerprints_file:
+                for line in fingerprints_file:
+                    if line.strip():
+                        record = json.loads(line)
+                        fingerprints[record["name"]] = record["fingerprint"]
+
+    if remove:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return fingerprints
+
+
+class NodeCache:
+    """Local store of node outputs keyed by node fingerprints, with size based least recently used eviction.
+
+    Every entry is a single pickle file named after the fingerprint. The modification time of an entry is updated
+    when it is read, and when the total size of the entries exceeds `max_size` the least recently used entries are
+    removed. Entries are written atomically and the directory is the only state, so `ParallelRunner` workers
+    and concurrent runs can share the store.
+
+    Args:
+        directory: Directory where the entries are stored.
+        max_size: Maximum total size of the entries in bytes.
+        manifest: Cache of the content hashes of the input files.
+    """
+
+    def __init__(self, directory: str, max_size: int, manifest: FileManifest):
+        self._directory = directory
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+        self.manifest = manifest
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self._directory, f"{fingerprint}{ENTRY_SUFFIX}")
+
+    def get(self, fingerprint: str) -> Optional[CacheEntry]:
+        path = self._path(fingerprint)
+
+        try:
+            with open(path, "rb") as entry_file:
+                entry = pickle.load(entry_file)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception:  # noqa: B902
+            # Written by an incompatible version of a library, or removed in the meantime
+            return None
+
+        return CacheEntry(outputs=entry["outputs"], execution_time=entry["execution_time"])
+
+    def put(self, fingerprint: str, outputs: Dict[str, Any], execution_time: Optional[float]) -> bool:
+        """Stores the outputs of a node run and returns whether they were stored. Outputs that cannot be pickled
+        or that are larger than `max_size` are not stored."""
+        try:
+            data = pickle.dumps({"outputs": outputs, "execution_time": execution_time}, protocol=4)
+        except Exception:  # noqa: B902
+            return False
+
+        if len(data) > self._max_size:
+            return False
+
+        write_bytes_atomically(self._path(fingerprint), data)
+
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        with self._lock:
+            entries = []
+            with os.scandir(self._directory) as directory:
+                for item in directory:
+                    if not item.name.endswith(ENTRY_SUFFIX):
+                        continue
+                    try:
+                        stat = item.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self._max_size:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
@@ -0,0 +1,164 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = ["NodeProfiler"]
+
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# CPU time of the current thread, only available on Linux
+_RUSAGE_THREAD = getattr(resource, "RUSAGE_THREAD", None)
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+# Allocations made by tracemalloc itself while taking snapshots
+_SNAPSHOT_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),)
+
+
+def _cpu_times() -> Tuple[float, float]:
+    if _RUSAGE_THREAD is not None:
+        usage = resource.getrusage(_RUSAGE_THREAD)
+        return usage.ru_utime, usage.ru_stime
+
+    times = os.times()
+    return times.user, times.system
+
+
+def _peak_rss() -> Optional[int]:
+    if resource is None:
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+
+class _Sample:
+    def __init__(self, trace_allocations: bool):
+        self.start = time.perf_counter()
+        self.cpu_times = _cpu_times()
+        self.peak_rss = _peak_rss()
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+
+        if trace_allocations:
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            tracemalloc.reset_peak()
+
+
+class NodeProfiler:
+    """Measures CPU time, peak RSS and, optionally, memory allocations of the nodes.
+
+    Only a fraction of the node runs, given by `sample_rate`, is profiled, so the profiler can stay on
+    in production. Taking `tracemalloc` snapshots is the most expensive part and is off by default.
+
+    With `ThreadRunner`, CPU times are measured per thread on Linux and per process elsewhere.
+    Peak RSS and allocations are always measured per process, so they include the nodes running concurrently.
+
+    Args:
+        sample_rate: Fraction of the node runs that are profiled, between 0 and 1.
+        trace_allocations: If True, the top allocation sites of each profiled node are recorded with `tracemalloc`.
+        top_allocations: Number of allocation sites recorded per node.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, trace_allocations: bool = False, top_allocations: int = 10):
+        self._sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        self._trace_allocations = trace_allocations
+        self._top_allocations = max(0, int(top_allocations))
+        self._local = threading.local()
+        self._started_tracing = False
+
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def _samples(self) -> Dict[str, _Sample]:
+        samples = getattr(self._local, "samples", None)
+        if samples is None:
+            samples = self._local.samples = {}
+
+        return samples
+
+    def start(self, name: str) -> None:
+        if self._sample_rate < 1.0 and random.random() >= self._sample_rate:
+            return
+
+        self._samples()[name] = _Sample(trace_allocations=self._trace_allocations)
+
+    def stop(self, name: str) -> Optional[Dict[str, Any]]:
+        """Returns the profile of the node, or None if this run of the node was not sampled."""
+        sample = self._samples().pop(name, None)
+        if sample is None:
+            return None
+
+        wall_time = time.perf_counter() - sample.start
+        user_time, system_time = _cpu_times()
+        user_time -= sample.cpu_times[0]
+        system_time -= sample.cpu_times[1]
+
+        profile: Dict[str, Any] = {
+            "cpu_user_time": user_time,
+            "cpu_system_time": system_time,
+            "cpu_utilization": (user_time + system_time) / wall_time if wall_time > 0 else 0.0,
+        }
+
+        peak_rss = _peak_rss()
+        if peak_rss is not None:
+            profile["peak_rss"] = peak_rss
+            profile["peak_rss_delta"] = peak_rss - sample.peak_rss
+
+        if sample.snapshot is not None:
+            profile["allocations"] = self._allocations(sample.snapshot)
+
+        return profile
+
+    def _allocations(self, before: tracemalloc.Snapshot) -> Dict[str, Any]:
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        differences = after.compare_to(before, "lineno")
+
+        top = {}
+        for rank, difference in enumerate(differences[: self._top_allocations], start=1):
+            frame = difference.traceback[0]
+            top[str(rank)] = {
+                "site": f"{frame.filename}:{frame.lineno}",
+                "size_diff": difference.size_diff,
+                "count_diff": difference.count_diff,
+            }
+
+        return {
+            "peak": peak,
+            "net": sum(difference.size_diff for difference in differences),
+            "top": top,
+        }
+
+    def close(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
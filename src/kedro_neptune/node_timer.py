@@ -0,0 +1,154 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "NodeInterval",
+    "NodeTimer",
+]
+
+import os
+import threading
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+
+class NodeInterval(NamedTuple):
+    name: str
+    # Nanoseconds of `time.perf_counter_ns`, which is a system-wide monotonic clock
+    start: int
+    end: int
+    pid: int
+    thread_id: int
+    thread_name: str
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return (self.end - self.start) / 1e9
+
+
+class _ThreadBuffer:
+    def __init__(self):
+        thread = threading.current_thread()
+        self.pid = os.getpid()
+        self.thread_id = thread.native_id
+        self.thread_name = thread.name
+        self.started: Dict[str, int] = {}
+        self.intervals: List[NodeInterval] = []
+
+
+class NodeTimer:
+    """Measures node execution times with a monotonic clock, safely under `ThreadRunner`.
+
+    Every thread writes to its own buffer, so starting and stopping a timer never takes a lock.
+    Kedro runs `before_node_run` and `after_node_run` of a node in the same thread,
+    so a node is always stopped in the buffer it was started in. Buffers are merged by `stats()`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._buffers: List[_ThreadBuffer] = []
+
+    def _buffer(self) -> _ThreadBuffer:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = _ThreadBuffer()
+            with self._lock:
+                self._buffers.append(buffer)
+
+        return buffer
+
+    def reset(self) -> None:
+        with self._lock:
+            self._local = threading.local()
+            self._buffers = []
+
+    def start(self, name: str) -> None:
+        self._buffer().started[name] = time.perf_counter_ns()
+
+    def stop(self, name: str) -> Optional[NodeInterval]:
+        """Returns the finished interval, or None if the timer was not started in this thread."""
+        end = time.perf_counter_ns()
+        buffer = self._buffer()
+        start = buffer.started.pop(name, None)
+
+        if start is None:
+            return None
+
+        interval = NodeInterval(
+            name=name,
+            start=start,
+            end=end,
+            pid=buffer.pid,
+            thread_id=buffer.thread_id,
+            thread_name=buffer.thread_name,
+        )
+        buffer.intervals.append(interval)
+        return interval
+
+    def intervals(self) -> List[NodeInterval]:
+        """Returns all the finished intervals, ordered by start."""
+        with self._lock:
+            buffers = list(self._buffers)
+
+        return sorted(
+            (interval for buffer in buffers for interval in list(buffer.intervals)),
+            key=lambda interval: interval.start,
+        )
+
+    def stats(self, worker_intervals: Iterable[NodeInterval] = ()) -> Dict[str, Any]:
+        """Returns the concurrency stats of the intervals, merged with the intervals of other processes,
+        e.g. `ParallelRunner` workers, whose threads are named after their process."""
+        pid = os.getpid()
+        intervals = sorted([*self.intervals(), *worker_intervals], key=lambda interval: interval.start)
+        if not intervals:
+            return {}
+
+        threads: Dict[str, Dict[str, Any]] = {}
+        for interval in intervals:
+            thread_name = interval.thread_name
+            if interval.pid != pid:
+                thread_name = f"{thread_name} (pid {interval.pid})"
+            thread = threads.setdefault(thread_name, {"nodes": 0, "busy_time": 0.0})
+            thread["nodes"] += 1
+            thread["busy_time"] += interval.duration
+
+        # Sweep over start (+1) and end (-1) events, ends first when they happen at the same time
+        events = sorted(
+            [(interval.start, 1) for interval in intervals] + [(interval.end, -1) for interval in intervals]
+        )
+        active = max_active = 0
+        for _, change in events:
+            active += change
+            max_active = max(max_active, active)
+
+        wall_time = (max(interval.end for interval in intervals) - intervals[0].start) / 1e9
+        busy_time = sum(thread["busy_time"] for thread in threads.values())
+
+        return {
+            "threads": threads,
+            "thread_count": len(threads),
+            "max_concurrent_nodes": max_active,
+            "mean_concurrent_nodes": busy_time / wall_time if wall_time > 0 else float(max_active),
+            "wall_time": wall_time,
+        }
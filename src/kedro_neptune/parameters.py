@@ -0,0 +1,66 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "encode_parameters",
+    "find_parameter",
+]
+
+from typing import (
+    Any,
+    Dict,
+    Mapping,
+    Optional,
+)
+
+_MISSING = object()
+
+
+def encode_parameters(value: Any) -> Any:
+    """Encodes parameters into a tree that can be assigned to a Neptune namespace in one call.
+
+    Dicts are walked once, lists and tuples become dicts keyed by the element index,
+    numbers, booleans and strings are kept as they are and any other value is converted to a string.
+    Empty containers are kept as strings, since Neptune does not store empty namespaces.
+    """
+    if isinstance(value, Mapping):
+        return {str(key): encode_parameters(item) for key, item in value.items()} if value else str(dict(value))
+
+    if isinstance(value, (list, tuple)):
+        return {str(index): encode_parameters(item) for index, item in enumerate(value)} if value else str(value)
+
+    if isinstance(value, (bool, int, float, str)):
+        return value
+
+    return str(value)
+
+
+def find_parameter(encoded: Optional[Dict[str, Any]], name: str) -> Any:
+    """Returns the encoded value of a `params:` input, e.g. `model.learning_rate`, or None if it is not found."""
+    if not encoded:
+        return None
+
+    if name in encoded:
+        return encoded[name]
+
+    value: Any = encoded
+    for key in name.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key, _MISSING)
+        if value is _MISSING:
+            return None
+
+    return value
@@ -0,0 +1,271 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "PartitionLister",
+    "PartitionListing",
+    "is_partitioned",
+    "sample_partitions",
+]
+
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from kedro.io.core import AbstractDataset
+
+from kedro_neptune.utils import write_json_atomically
+
+LISTING_DIR_NAME = "partitions"
+# Number of newly added partitions whose IDs are logged
+NEW_PARTITIONS_LOGGED = 10
+
+
+def is_partitioned(dataset: Optional[AbstractDataset]) -> bool:
+    """Returns whether the dataset is a `PartitionedDataset` or an `IncrementalDataset` of `kedro_datasets`."""
+    # Partitioned datasets can only exist if their module is already imported
+    module = sys.modules.get("kedro_datasets.partitions")
+    return module is not None and isinstance(dataset, module.PartitionedDataset)
+
+
+@dataclass()
+class PartitionListing:
+    # Sizes in bytes of the partition files, by partition ID
+    partitions: Dict[str, int]
+    # IDs of the partitions that were not in the listing of the dataset by the previous run
+    new: List[str] = field(default_factory=list)
+    # IDs of the partitions that were not in the previous listing of the dataset by the same lister,
+    # i.e. the new partitions on the first listing and the partitions saved since then on the next ones
+    added: List[str] = field(default_factory=list)
+    # Number of partitions after the checkpoint of an `IncrementalDataset`, i.e. still to be processed
+    pending: Optional[int] = None
+    checkpoint: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "count": len(self.partitions),
+            "total_size": sum(self.partitions.values()),
+            "new": len(self.new),
+        }
+        if self.new:
+            result["new_partitions"] = ", ".join(sorted(self.new)[:NEW_PARTITIONS_LOGGED])
+        if self.pending is not None:
+            result["pending"] = self.pending
+        if self.checkpoint is not None:
+            result["checkpoint"] = self.checkpoint
+
+        return result
+
+
+def sample_partitions(partition_ids: List[str], limit: int, seed: int = 0) -> List[str]:
+    """Returns at most `limit` of the partitions, sampled uniformly and sorted."""
+    partition_ids = sorted(partition_ids)
+    if len(partition_ids) <= limit:
+        return partition_ids
+
+    return sorted(random.Random(seed).sample(partition_ids, limit))
+
+
+class PartitionLister:
+    """Lists the partitions of partitioned datasets without `PartitionedDataset._list_partitions`.
+
+    The directory tree is listed one level at a time, with one delimited listing per directory, which object stores
+    return in pages, instead of a recursive `find`. The listings of the directories are cached in `cache_dir`, and
+    a directory whose modification time is reported by the filesystem, e.g. a local one, is only listed again when it
+    changed. Object stores such as S3 or GCS have no directories with a modification time, so their datasets are
+    listed in full by every run, and the cache only serves to find the new partitions. The size of a partition
+    file rewritten in place does not change the modification time of its directory, so it is only updated when
+    another partition of the directory is added or removed. Partitions missing from the listing of the previous run
+    are reported as new.
+
+    Every dataset is listed at most once per lister, until it is invalidated after being saved. Invalidating
+    a dataset also invalidates its `@neptune` companions.
+
+    Args:
+        cache_dir: Directory where the listings are cached between runs, or None to cache them only in memory.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._listings: Dict[str, PartitionListing] = {}
+        # Partitions listed by the previous run and by the last listing of this lister, by root and by name
+        self._previous: Dict[str, Set[str]] = {}
+        self._listed: Dict[str, Set[str]] = {}
+
+    def invalidate(self, name: str) -> bool:
+        """Drops the listings of the dataset, returns whether it was listed, i.e. is a partitioned dataset."""
+        base_name = name.split("@", 1)[0]
+        with self._lock:
+            listed_names = [key for key in self._listings if key.split("@", 1)[0] == base_name]
+            for listed_name in listed_names:
+                del self._listings[listed_name]
+
+        return bool(listed_names)
+
+    def list(self, name: str, dataset: AbstractDataset) -> PartitionListing:
+        with self._lock:
+            listing = self._listings.get(name)
+        if listing is not None:
+            return listing
+
+        root = dataset._normalized_path
+        fs = dataset._filesystem
+        root_path = fs._strip_protocol(root).rstrip(dataset._sep)
+        cached = self._read(root)
+
+        directories: Dict[str, Dict[str, Any]] = {}
+        files: Dict[str, int] = {}
+        pending: List[Tuple[str, Any]] = [(root_path, _mtime(fs, root_path))]
+        while pending:
+            path, mtime = pending.pop()
+            directory = cached.get(path)
+            if directory is None or mtime is None or directory["mtime"] != mtime:
+                directory = _list_directory(fs, path, mtime)
+            directories[path] = directory
+
+            files.update(directory["files"])
+            # The modification time of a directory does not change with the contents of its subdirectories
+            for child in directory["directories"]:
+                pending.append((child, None if mtime is None else _mtime(fs, child)))
+
+        partitions = _partitions(dataset, files)
+        with self._lock:
+            # The cache is rewritten by the first listing, later ones compare with the listing it replaced
+            previous = self._previous.get(root)
+            listed = self._listed.get(name)
+        if previous is None:
+            previous = {
+                _partition_id(dataset, path)
+                for directory in cached.values()
+                for path in directory["files"]
+                if path.endswith(dataset._filename_suffix)
+            }
+        listing = PartitionListing(
+            partitions=partitions,
+            new=[pid for pid in partitions if pid not in previous],
+            added=[pid for pid in partitions if pid not in (previous if listed is None else listed)],
+        )
+        if hasattr(dataset, "_read_checkpoint"):
+            _add_checkpoint(dataset, listing)
+
+        self._write(root, directories)
+        with self._lock:
+            self._previous.setdefault(root, previous)
+            self._listed[name] = set(partitions)
+            self._listings[name] = listing
+
+        return listing
+
+    def _path(self, root: str) -> Optional[str]:
+        if self._cache_dir is None:
+            return None
+
+        key = hashlib.sha256(root.encode()).hexdigest()
+        return os.path.join(self._cache_dir, LISTING_DIR_NAME, f"{key}.json")
+
+    def _read(self, root: str) -> Dict[str, Dict[str, Any]]:
+        path = self._path(root)
+        if path is None:
+            return {}
+
+        try:
+            with open(path, encoding="utf-8") as listing_file:
+                cached = json.load(listing_file)
+        except (OSError, ValueError):
+            return {}
+
+        return cached.get("directories", {}) if cached.get("root") == root else {}
+
+    def _write(self, root: str, directories: Dict[str, Dict[str, Any]]) -> None:
+        path = self._path(root)
+        if path is None:
+            return
+
+        write_json_atomically(path, {"root": root, "directories": directories})
+
+
+def _mtime(fs: Any, path: str) -> Any:
+    # Only filesystems with real directories report their modification time
+    try:
+        return fs.info(path).get("mtime")
+    except (OSError, ValueError):
+        return None
+
+
+def _list_directory(fs: Any, path: str, mtime: Any) -> Dict[str, Any]:
+    try:
+        entries = fs.ls(path, detail=True)
+    except FileNotFoundError:
+        entries = []
+
+    directory: Dict[str, Any] = {"mtime": mtime, "files": {}, "directories": []}
+    for entry in entries:
+        name = entry["name"].rstrip("/")
+        if name == path:
+            continue
+        if entry.get("type") == "directory":
+            directory["directories"].append(name)
+        else:
+            directory["files"][name] = entry.get("size") or 0
+
+    return directory
+
+
+def _partition_id(dataset: AbstractDataset, path: str) -> str:
+    if "versioned" in dataset._dataset_config:
+        # Versioned partitions are stored as `<partition>/<version>/<partition file name>`
+        path = path.rsplit("/", 2)[0]
+
+    return dataset._path_to_partition(path)
+
+
+def _partitions(dataset: AbstractDataset, files: Dict[str, int]) -> Dict[str, int]:
+    checkpoint_path = None
+    if hasattr(dataset, "_checkpoint_config"):
+        checkpoint_path = dataset._filesystem._strip_protocol(dataset._checkpoint_config[dataset._filepath_arg])
+
+    partitions: Dict[str, int] = {}
+    for path, size in files.items():
+        if path.endswith(dataset._filename_suffix) and path != checkpoint_path:
+            partition_id = _partition_id(dataset, path)
+            partitions[partition_id] = partitions.get(partition_id, 0) + size
+
+    return partitions
+
+
+def _add_checkpoint(dataset: AbstractDataset, listing: PartitionListing) -> None:
+    checkpoint = dataset._read_checkpoint()
+    listing.checkpoint = None if checkpoint is None else str(checkpoint)
+    listing.pending = sum(
+        1
+        for partition_id in listing.partitions
+        if checkpoint is None or dataset._comparison_func(partition_id, checkpoint)
+    )
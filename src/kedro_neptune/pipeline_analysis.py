@@ -0,0 +1,143 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "analyze_pipeline",
+    "simulate_makespan",
+]
+
+import heapq
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
+
+from kedro.pipeline import Pipeline
+
+DEFAULT_WORKER_COUNTS = (1, 2, 4, 8, 16, 32)
+
+
+def simulate_makespan(
+    order: Sequence[str],
+    parents: Dict[str, List[str]],
+    durations: Dict[str, float],
+    priorities: Dict[str, float],
+    workers: int,
+) -> float:
+    """Returns the duration of the pipeline on `workers` workers with greedy list scheduling.
+
+    Whenever a worker is free, it runs the ready node with the highest priority, i.e. the longest path to the end
+    of the pipeline. This is what a dependency-aware runner with `workers` processes can achieve at best
+    without reordering the nodes.
+    """
+    children: Dict[str, List[str]] = {name: [] for name in order}
+    remaining = {name: len(parents[name]) for name in order}
+    for name in order:
+        for parent in parents[name]:
+            children[parent].append(name)
+
+    index = {name: position for position, name in enumerate(order)}
+    ready = [(-priorities[name], index[name], name) for name in order if not remaining[name]]
+    heapq.heapify(ready)
+    running: List = []
+    now = 0.0
+
+    while ready or running:
+        while ready and len(running) < workers:
+            _, _, name = heapq.heappop(ready)
+            heapq.heappush(running, (now + durations[name], index[name], name))
+
+        now, _, name = heapq.heappop(running)
+        for child in children[name]:
+            remaining[child] -= 1
+            if not remaining[child]:
+                heapq.heappush(ready, (-priorities[child], index[child], child))
+
+    return now
+
+
+def analyze_pipeline(
+    pipeline: Pipeline,
+    durations: Dict[str, float],
+    wall_time: Optional[float] = None,
+    worker_counts: Iterable[int] = DEFAULT_WORKER_COUNTS,
+) -> Dict[str, Any]:
+    """Computes the critical path, the slack of each node and the speedup available with more workers.
+
+    Args:
+        pipeline: Executed pipeline, its nodes are identified by `short_name` as in the node hooks.
+        durations: Measured execution time of the nodes in seconds. Nodes without a measurement count as 0.
+        wall_time: Measured duration of the whole run, used to report the parallelism that was achieved.
+        worker_counts: Numbers of workers for which the achievable speedup is estimated.
+    """
+    # Pipeline.nodes is topologically sorted
+    order = [node.short_name for node in pipeline.nodes]
+    parents = {
+        node.short_name: [parent.short_name for parent in dependencies]
+        for node, dependencies in pipeline.node_dependencies.items()
+    }
+    duration = {name: float(durations.get(name, 0.0)) for name in order}
+
+    earliest_finish: Dict[str, float] = {}
+    critical_parent: Dict[str, Optional[str]] = {}
+    for name in order:
+        parent = max(parents[name], key=lambda candidate: earliest_finish[candidate], default=None)
+        earliest_finish[name] = (earliest_finish[parent] if parent is not None else 0.0) + duration[name]
+        critical_parent[name] = parent
+
+    length = max(earliest_finish.values(), default=0.0)
+
+    # Longest path from the start of each node to the end of the pipeline
+    tail: Dict[str, float] = {}
+    children: Dict[str, List[str]] = {name: [] for name in order}
+    for name in order:
+        for parent in parents[name]:
+            children[parent].append(name)
+    for name in reversed(order):
+        tail[name] = duration[name] + max((tail[child] for child in children[name]), default=0.0)
+
+    slack = {name: max(0.0, length - (earliest_finish[name] - duration[name]) - tail[name]) for name in order}
+
+    critical_path: List[str] = []
+    name = max(order, key=lambda candidate: earliest_finish[candidate], default=None)
+    while name is not None:
+        critical_path.append(name)
+        name = critical_parent[name]
+    critical_path.reverse()
+
+    total_work = sum(duration.values())
+    speedup = {}
+    # More workers than nodes cannot be used
+    for workers in sorted({min(count, max(1, len(order))) for count in worker_counts if count >= 1}):
+        makespan = simulate_makespan(order, parents, duration, tail, workers)
+        speedup[str(workers)] = total_work / makespan if makespan > 0 else 1.0
+
+    analysis: Dict[str, Any] = {
+        "critical_path": critical_path,
+        "critical_path_length": length,
+        "total_work": total_work,
+        "max_speedup": total_work / length if length > 0 else 1.0,
+        "speedup": speedup,
+        "slack": slack,
+    }
+    if wall_time:
+        analysis["wall_time"] = wall_time
+        analysis["achieved_parallelism"] = total_work / wall_time
+
+    return analysis
@@ -0,0 +1,120 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "RunPool",
+    "run_pool",
+]
+
+import os
+import threading
+from multiprocessing.util import Finalize
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Optional,
+)
+
+
+class RunPool:
+    """Keeps a single live Neptune run per custom run ID in the current process.
+
+    Runs are created on first use and reused by every hook and `NeptuneRunDataset` in the process
+    until they are explicitly closed. Handles inherited through `fork` are dropped, so every
+    `ParallelRunner` worker opens its own run once and keeps it for its whole lifetime.
+    Runs left open when a process exits (e.g. worker processes) are stopped by a `multiprocessing` finalizer.
+
+    Every run can have a companion object with a `close()` method (e.g. an `AsyncWriter`),
+    which is closed right before the run is stopped.
+
+    Attributes:
+        created: Number of runs created in the current process.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pid: int = os.getpid()
+        self._runs: Dict[str, Any] = {}
+        self._companions: Dict[str, Any] = {}
+        self._finalizer: Optional[Finalize] = None
+        self.created: int = 0
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._runs = {}
+            self._companions = {}
+            self._finalizer = None
+            self.created = 0
+
+    def acquire(self, key: str, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._check_pid()
+
+            run = self._runs.get(key)
+            if run is None:
+                run = factory()
+                self._runs[key] = run
+                self.created += 1
+
+                if self._finalizer is None:
+                    self._finalizer = Finalize(None, self.close_all, exitpriority=10)
+
+            return run
+
+    def attach(self, key: str, factory: Callable[[Any], Any]) -> Any:
+        with self._lock:
+            self._check_pid()
+
+            companion = self._companions.get(key)
+            if companion is None:
+                companion = factory(self._runs[key])
+                self._companions[key] = companion
+
+            return companion
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            self._check_pid()
+            return self._runs.get(key)
+
+    def close(self, key: str) -> None:
+        with self._lock:
+            self._check_pid()
+            run = self._runs.pop(key, None)
+            companion = self._companions.pop(key, None)
+
+        self._stop(run, companion)
+
+    def close_all(self) -> None:
+        with self._lock:
+            self._check_pid()
+            runs, self._runs = self._runs, {}
+            companions, self._companions = self._companions, {}
+
+        for key, run in runs.items():
+            self._stop(run, companions.get(key))
+
+    @staticmethod
+    def _stop(run: Optional[Any], companion: Optional[Any]) -> None:
+        if companion is not None:
+            companion.close()
+
+        if run is not None:
+            run.stop()
+
+
+run_pool = RunPool()
@@ -0,0 +1,568 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "ColumnSketch",
+    "CountMinSketch",
+    "DatasetSketch",
+    "HyperLogLog",
+    "TDigest",
+    "hash_values",
+    "read_sketches",
+    "write_sketch",
+]
+
+import hashlib
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import uuid
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+# Optional dependency (`sketches` extra): the hooks import this module only once numpy is imported
+import numpy as np
+
+from kedro_neptune.utils import write_bytes_atomically
+
+DEFAULT_MAX_COLUMNS = 100
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+TOP_VALUES = 10
+# Heavy hitter candidates kept per column, more than reported so that merges rarely lose a top value
+CANDIDATES = 4 * TOP_VALUES
+# Frequent values are in any large enough sample of a chunk, only sampled values can become candidates
+CANDIDATE_SAMPLE_SIZE = 10_000
+SKETCH_SUFFIX = ".npz"
+
+_UINT64_MASK_32 = np.uint64(0xFFFFFFFF)
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """The SplitMix64 finalizer, a bijection of 64-bit integers that spreads every input bit to all output bits."""
+    values = values.astype(np.uint64, copy=True)
+    values ^= values >> np.uint64(30)
+    values *= np.uint64(0xBF58476D1CE4E5B9)
+    values ^= values >> np.uint64(27)
+    values *= np.uint64(0x94D049BB133111EB)
+    values ^= values >> np.uint64(31)
+    return values
+
+
+def _numbers(values: Any) -> Optional[np.ndarray]:
+    """Returns the values of a numeric or boolean column as floats, or None for other columns."""
+    # The kind of pandas extension dtypes, e.g. nullable integers, is the kind of their values
+    if getattr(values.dtype, "kind", "O") in "biuf":
+        return np.asarray(values, dtype=np.float64)
+
+    return None
+
+
+def _pandas() -> Any:
+    try:
+        import pandas
+    except ImportError:
+        return None
+
+    return pandas
+
+
+def _hash_unicode(values: np.ndarray) -> np.ndarray:
+    """Returns hashes of an array of strings, mixing the code points of all the strings one position at a time."""
+    codes = np.ascontiguousarray(values).view(np.uint32).reshape(len(values), -1)
+    hashes = np.zeros(len(values), dtype=np.uint64)
+
+    for position in range(codes.shape[1]):
+        column = codes[:, position]
+        # Shorter strings are padded with zeros, which are skipped so that the hash of a string does not depend
+        # on the longest string of the array
+        hashes = np.where(column != 0, _mix64(hashes ^ column.astype(np.uint64)), hashes)
+
+    return hashes
+
+
+def hash_values(values: Any) -> np.ndarray:
+    """Returns 64-bit hashes of the values of a column without nulls, equal in every process and every run.
+
+    Numbers are hashed by their float64 value, so equal integers and floats have equal hashes.
+    Strings and other pandas columns are hashed by pandas when it is installed, otherwise strings are hashed
+    by numpy. Only other objects are hashed one by one, by their string representation.
+    """
+    numbers = _numbers(values)
+    if numbers is not None:
+        # Negative zero is equal to zero
+        return _mix64((numbers + 0.0).view(np.uint64))
+
+    pandas = _pandas()
+    if pandas is not None:
+        try:
+            if isinstance(values, pandas.Series):
+                return pandas.util.hash_pandas_object(values, index=False).to_numpy()
+            # Strings of polars and numpy columns are hashed like those of pandas columns
+            return pandas.util.hash_array(np.asarray(values, dtype=object).ravel(), categorize=False)
+        except (TypeError, ValueError):
+            pass
+
+    values = np.asarray(values).ravel()
+    if values.dtype.kind == "U":
+        return _hash_unicode(values)
+    if values.dtype.kind == "O" and all(isinstance(value, str) for value in values):
+        return _hash_unicode(values.astype(str))
+
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "little")
+            for value in values
+        ),
+        dtype=np.uint64,
+        count=values.size,
+    )
+
+
+class HyperLogLog:
+    """Cardinality estimate with a relative standard error of about `1.04 / sqrt(2 ** precision)`.
+
+    The precision is between 12 and 18.
+    """
+
+    def __init__(self, precision: int = 14, registers: Optional[np.ndarray] = None):
+        if registers is not None:
+            precision = int(registers.size).bit_length() - 1
+        if not 12 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 12 and 18, got {precision}")
+
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def update(self, hashes: np.ndarray) -> None:
+        if not hashes.size:
+            return
+
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # The bit below the shifted hash bounds the rank when all the remaining bits are zero
+        remainder = (hashes << np.uint64(self.precision)) | np.uint64(1 << (self.precision - 1))
+        # The top 53 bits are exact in a float, and are not all zero thanks to the bit set above,
+        # so the exponent gives the position of the highest set bit: rank = 65 - (exponent + 11)
+        _, exponent = np.frexp((remainder >> np.uint64(11)).astype(np.float64))
+        rank = 54 - exponent
+
+        # The highest rank of every register, with a scatter instead of the much slower `np.maximum.at`
+        seen = np.zeros((self.registers.size, 64), dtype=bool)
+        seen[index, rank] = True
+        highest = (63 - np.argmax(seen[:, ::-1], axis=1)) * seen.any(axis=1)
+        np.maximum(self.registers, highest.astype(np.uint8), out=self.registers)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> float:
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+
+        # Linear counting is more accurate for small cardinalities
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+
+        return estimate
+
+
+class TDigest:
+    """Quantile estimate that is most accurate near the tails, from a bounded number of weighted centroids.
+
+    Centroids are merged in one vectorized pass: after sorting, centroids whose mid quantile falls into the same unit
+    of the `k1` scale function are combined, so that the number of centroids stays below `compression / 2 + 1`.
+    """
+
+    def __init__(
+        self,
+        compression: float = 200.0,
+        means: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+        minimum: float = math.inf,
+        maximum: float = -math.inf,
+    ):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64) if means is None else means
+        self.weights = np.empty(0, dtype=np.float64) if weights is None else weights
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+        if values.size <= 10 * self.compression:
+            self._add(values, np.ones(values.size, dtype=np.float64))
+            return
+
+        # Large chunks are summarized without sorting them, by clusters between the quantiles at which the scale
+        # function reaches an integer, which are then merged as centroids. The quantiles are estimated on a sample,
+        # the clusters only have to be about the right size, while their means and weights are exact
+        steps = np.arange(-math.floor(self.compression / 4), math.floor(self.compression / 4) + 1)
+        sample = values[np.random.default_rng(0).integers(0, values.size, size=100 * int(self.compression))]
+        edges = np.quantile(sample, (1 + np.sin(2 * math.pi * steps[1:-1] / self.compression)) / 2)
+        clusters = np.searchsorted(edges, values, side="right")
+        weights = np.bincount(clusters, minlength=len(edges) + 1).astype(np.float64)
+        sums = np.bincount(clusters, weights=values, minlength=len(edges) + 1)
+        filled = weights > 0
+        self._add(sums[filled] / weights[filled], weights[filled])
+
+    def merge(self, other: "TDigest") -> None:
+        if not other.means.size:
+            return
+
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._add(other.means, other.weights)
+
+    def _add(self, means: np.ndarray, weights: np.ndarray) -> None:
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        cumulative = np.cumsum(weights)
+        quantiles = (cumulative - weights / 2) / cumulative[-1]
+        scale = np.floor(self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * quantiles - 1, -1, 1)))
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(scale)) + 1])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, quantiles: Any) -> np.ndarray:
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        if not self.means.size:
+            return np.full(quantiles.shape, np.nan)
+
+        cumulative = np.cumsum(self.weights)
+        positions = np.concatenate([[0.0], cumulative - self.weights / 2, [cumulative[-1]]])
+        values = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        return np.interp(quantiles * cumulative[-1], positions, values)
+
+    def cdf(self, values: Any) -> np.ndarray:
+        """Returns the estimated fractions of the values that are below `values`, the inverse of `quantile`."""
+        values = np.asarray(values, dtype=np.float64)
+        if not self.means.size:
+            return np.full(values.shape, np.nan)
+
+        cumulative = np.cumsum(self.weights)
+        positions = np.concatenate([[0.0], cumulative - self.weights / 2, [cumulative[-1]]])
+        points = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        return np.interp(values, points, positions) / cumulative[-1]
+
+
+class CountMinSketch:
+    """Frequency estimate that never underestimates, and overestimates by at most `e / width` of the total count
+    with probability `1 - exp(-depth)`. The width is a power of two."""
+
+    def __init__(self, width: int = 2048, depth: int = 4, table: Optional[np.ndarray] = None):
+        if table is not None:
+            depth, width = table.shape
+        if width & (width - 1):
+            raise ValueError(f"Count-min sketch width must be a power of two, got {width}")
+
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint64) if table is None else table
+
+    def _indices(self, hashes: np.ndarray) -> List[np.ndarray]:
+        # Double hashing derives the hashes of all the rows from the two halves of one 64-bit hash
+        low = hashes & _UINT64_MASK_32
+        high = hashes >> np.uint64(32)
+        mask = np.uint64(self.width - 1)
+        return [((low + np.uint64(row) * high) & mask).astype(np.intp) for row in range(self.depth)]
+
+    def update(self, hashes: np.ndarray) -> None:
+        for row, index in enumerate(self._indices(hashes)):
+            self.table[row] += np.bincount(index, minlength=self.width).astype(np.uint64)
+
+    def estimate(self, hashes: np.ndarray) -> np.ndarray:
+        estimates = [self.table[row, index] for row, index in enumerate(self._indices(hashes))]
+        return np.min(estimates, axis=0) if estimates else np.zeros(hashes.shape, dtype=np.uint64)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        self.table += other.table
+
+
+class ColumnSketch:
+    """Sketches of a column: distinct values, quantiles of numbers and most frequent values."""
+
+    def __init__(self):
+        self.count: int = 0
+        self.nulls: int = 0
+        self.distinct = HyperLogLog()
+        self.digest = TDigest()
+        self.frequencies = CountMinSketch()
+        # Hashes of the most frequent values found so far, with their string representations
+        self.candidates: Dict[int, str] = {}
+
+    def update(self, values: Any) -> None:
+        values, nulls = _drop_nulls(values)
+        self.nulls += nulls
+        self.count += len(values)
+        if not len(values):
+            return
+
+        hashes = hash_values(values)
+        self.distinct.update(hashes)
+        self.frequencies.update(hashes)
+
+        numbers = _numbers(values)
+        if numbers is not None:
+            self.digest.update(numbers)
+
+        sample = np.arange(len(hashes))
+        if len(hashes) > CANDIDATE_SAMPLE_SIZE:
+            sample = np.random.default_rng(0).integers(0, len(hashes), size=CANDIDATE_SAMPLE_SIZE)
+        unique_hashes, first_indices = np.unique(hashes[sample], return_index=True)
+
+        # The sampled distinct values with the highest estimated frequencies become candidates
+        estimates = self.frequencies.estimate(unique_hashes).astype(np.float64)
+        top = np.argpartition(-estimates, min(CANDIDATES, len(unique_hashes) - 1))[:CANDIDATES]
+        array = values.to_numpy() if hasattr(values, "to_numpy") else np.asarray(values)
+        for index in top:
+            self.candidates.setdefault(int(unique_hashes[index]), str(array[sample[first_indices[index]]]))
+        self._prune_candidates()
+
+    def merge(self, other: "ColumnSketch") -> None:
+        self.count += other.count
+        self.nulls += other.nulls
+        self.distinct.merge(other.distinct)
+        self.digest.merge(other.digest)
+        self.frequencies.merge(other.frequencies)
+        for value_hash, value in other.candidates.items():
+            self.candidates.setdefault(value_hash, value)
+        self._prune_candidates()
+
+    def top_values(self, limit: int = CANDIDATES) -> List[Tuple[str, int]]:
+        if not self.candidates:
+            return []
+
+        hashes = np.fromiter(self.candidates, dtype=np.uint64, count=len(self.candidates))
+        estimates = self.frequencies.estimate(hashes)
+        order = np.argsort(-estimates.astype(np.float64), kind="stable")[:limit]
+        return [(self.candidates[int(hashes[index])], int(estimates[index])) for index in order]
+
+    def _prune_candidates(self) -> None:
+        if len(self.candidates) > CANDIDATES:
+            hashes = np.fromiter(self.candidates, dtype=np.uint64, count=len(self.candidates))
+            top = np.argsort(-self.frequencies.estimate(hashes).astype(np.float64), kind="stable")[:CANDIDATES]
+            self.candidates = {int(hashes[index]): self.candidates[int(hashes[index])] for index in top}
+
+    def summary(self) -> Dict[str, Any]:
+        # The estimate of small cardinalities may exceed the number of values
+        distinct = min(round(self.distinct.count()), self.count)
+        summary: Dict[str, Any] = {"count": self.count, "nulls": self.nulls, "distinct": distinct}
+
+        if self.digest.means.size:
+            summary["min"] = self.digest.minimum
+            summary["max"] = self.digest.maximum
+            summary["quantiles"] = {
+                f"p{round(q * 100)}": float(value) for q, value in zip(QUANTILES, self.digest.quantile(QUANTILES))
+            }
+
+        top_values = self.top_values(limit=TOP_VALUES)
+        if top_values:
+            summary["top_values"] = {
+                str(rank): {"value": value, "count": count} for rank, (value, count) in enumerate(top_values)
+            }
+
+        return summary
+
+
+def _drop_nulls(values: Any) -> Tuple[Any, int]:
+    if hasattr(values, "isna"):
+        mask = values.isna()
+        nulls = int(mask.sum())
+        return (values[~mask] if nulls else values), nulls
+
+    if hasattr(values, "is_null"):
+        # polars
+        return values.drop_nulls().to_numpy(), values.null_count()
+
+    values = np.asarray(values).ravel()
+    if values.dtype.kind == "f":
+        mask = np.isnan(values)
+    elif values.dtype.kind == "O":
+        mask = np.equal(values, None)
+    else:
+        return values, 0
+
+    nulls = int(np.count_nonzero(mask))
+    return (values[~mask] if nulls else values), nulls
+
+
+def _columns(data: Any, max_columns: int) -> Optional[List[Tuple[str, Any]]]:
+    """Returns the columns of a pandas, polars or numpy dataset, or None for other data."""
+    if "pandas" in sys.modules:
+        pandas = sys.modules["pandas"]
+        if isinstance(data, pandas.DataFrame):
+            return [(str(name), data.iloc[:, index]) for index, name in enumerate(data.columns[:max_columns])]
+        if isinstance(data, pandas.Series):
+            return [(str(data.name) if data.name is not None else "0", data)]
+
+    if "polars" in sys.modules and isinstance(data, sys.modules["polars"].DataFrame):
+        return [(name, data.get_column(name)) for name in data.columns[:max_columns]]
+
+    if isinstance(data, np.ndarray) and data.ndim > 0 and data.dtype.names is None:
+        values = data.reshape(len(data), -1) if data.size else data.reshape(len(data), 0)
+        return [(str(index), values[:, index]) for index in range(min(values.shape[1], max_columns))]
+
+    return None
+
+
+class DatasetSketch:
+    """Sketches of the columns of a dataset, built chunk by chunk or partition by partition.
+
+    Sketches of the chunks of a dataset saved by different processes are merged with `merge`. All the sketches are
+    mergeable without loss: merging the sketches of two chunks gives the sketch of the concatenated chunks.
+    """
+
+    def __init__(self, max_columns: int = DEFAULT_MAX_COLUMNS):
+        self.max_columns = max_columns
+        self.rows: int = 0
+        self.chunks: int = 0
+        self.columns: Dict[str, ColumnSketch] = {}
+
+    def update(self, data: Any) -> bool:
+        """Adds a chunk of data, or every partition of a partitioned dataset, and returns whether any was added.
+        Partitions that are saved lazily, with a function returning the data, are not added."""
+        if isinstance(data, dict):
+            return any([self.update(partition) for partition in data.values() if not callable(partition)])
+
+        columns = _columns(data, max_columns=self.max_columns)
+        if columns is None:
+            return False
+
+        self.rows += len(data)
+        self.chunks += 1
+        for name, values in columns:
+            self.columns.setdefault(name, ColumnSketch()).update(values)
+
+        return True
+
+    def merge(self, other: "DatasetSketch") -> None:
+        self.rows += other.rows
+        self.chunks += other.chunks
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+
+    def summary(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {"rows": self.rows, "chunks": self.chunks}
+        if self.columns:
+            # A slash would start a nested namespace
+            summary["column"] = {name.replace("/", "_"): column.summary() for name, column in self.columns.items()}
+
+        return summary
+
+    def to_bytes(self) -> bytes:
+        """Serializes the sketches to a compressed numpy archive, readable without pickle."""
+        arrays: Dict[str, np.ndarray] = {}
+        columns = []
+
+        for index, (name, column) in enumerate(self.columns.items()):
+            columns.append(
+                {
+                    "name": name,
+                    "count": column.count,
+                    "nulls": column.nulls,
+                    "minimum": column.digest.minimum,
+                    "maximum": column.digest.maximum,
+                    "candidates": list(column.candidates.values()),
+                }
+            )
+            arrays[f"{index}.registers"] = column.distinct.registers
+            arrays[f"{index}.means"] = column.digest.means
+            arrays[f"{index}.weights"] = column.digest.weights
+            arrays[f"{index}.frequencies"] = column.frequencies.table
+            arrays[f"{index}.candidates"] = np.fromiter(
+                column.candidates, dtype=np.uint64, count=len(column.candidates)
+            )
+
+        metadata = {"rows": self.rows, "chunks": self.chunks, "max_columns": self.max_columns, "columns": columns}
+        output = io.BytesIO()
+        np.savez_compressed(output, metadata=np.array(json.dumps(metadata)), **arrays)
+        return output.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DatasetSketch":
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            metadata = json.loads(arrays["metadata"].item())
+            sketch = cls(max_columns=metadata["max_columns"])
+            sketch.rows = metadata["rows"]
+            sketch.chunks = metadata["chunks"]
+
+            for index, column_metadata in enumerate(metadata["columns"]):
+                column = ColumnSketch()
+                column.count = column_metadata["count"]
+                column.nulls = column_metadata["nulls"]
+                column.distinct = HyperLogLog(registers=arrays[f"{index}.registers"])
+                column.digest = TDigest(
+                    means=arrays[f"{index}.means"],
+                    weights=arrays[f"{index}.weights"],
+                    minimum=column_metadata["minimum"],
+                    maximum=column_metadata["maximum"],
+                )
+                column.frequencies = CountMinSketch(table=arrays[f"{index}.frequencies"])
+                column.candidates = {
+                    int(value_hash): value
+                    for value_hash, value in zip(arrays[f"{index}.candidates"], column_metadata["candidates"])
+                }
+                sketch.columns[column_metadata["name"]] = column
+
+        return sketch
+
+
+def write_sketch(directory: str, name: str, sketch: DatasetSketch) -> None:
+    """Writes the sketch of a chunk of a dataset to its own file, so that workers never write to the same file."""
+    path = os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex}{SKETCH_SUFFIX}")
+    write_bytes_atomically(path, json.dumps(name).encode() + b"\n" + sketch.to_bytes())
+
+
+def read_sketches(directory: str, remove: bool = False) -> List[Tuple[str, DatasetSketch]]:
+    sketches = []
+
+    if os.path.isdir(directory):
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(SKETCH_SUFFIX):
+                continue
+            with open(os.path.join(directory, file_name), "rb") as sketch_file:
+                name = json.loads(sketch_file.readline())
+                sketches.append((name, DatasetSketch.from_bytes(sketch_file.read())))
+
+    if remove:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return sketches
@@ -0,0 +1,341 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "GitIgnore",
+    "SourceSnapshot",
+    "translate_glob",
+]
+
+import glob
+import hashlib
+import json
+import os
+import re
+import zipfile
+from fnmatch import fnmatchcase
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
+)
+
+from kedro_neptune.file_manifest import (
+    FileManifest,
+    hash_stream,
+)
+from kedro_neptune.utils import write_json_atomically
+
+LISTINGS_FILE_NAME = "source_listings.json"
+ARCHIVES_DIR_NAME = "source_snapshots"
+HASH_CHUNK_SIZE = 1024 * 1024
+# Never walked, whatever the patterns and ignore files say
+# Directory of the archive holding the files outside of the root, under their absolute paths
+EXTERNAL_DIR_NAME = "external"
+SKIPPED_DIRS = frozenset({".git", ".hg", ".svn", "__pycache__"})
+
+
+def translate_glob(pattern: str) -> str:
+    """Translates a glob to a regular expression, in which `*` and `?` do not match `/`
+    and `**` matches any number of directories."""
+    regex = ""
+    index = 0
+
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+        elif pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+        elif pattern[index] == "*":
+            regex += "[^/]*"
+            index += 1
+        elif pattern[index] == "?":
+            regex += "[^/]"
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 2 :]:
+            end = pattern.index("]", index + 2)
+            characters = pattern[index + 1 : end]
+            if characters.startswith("!"):
+                characters = "^" + characters[1:]
+            regex += f"[{characters}]"
+            index = end + 1
+        else:
+            regex += re.escape(pattern[index])
+            index += 1
+
+    return regex
+
+
+class _IgnoreRule(NamedTuple):
+    regex: Pattern
+    negated: bool
+    directory_only: bool
+
+
+class GitIgnore:
+    """Rules of a `.gitignore` file, matched against paths relative to the directory of the file."""
+
+    def __init__(self, content: str):
+        self._rules: List[_IgnoreRule] = []
+
+        for line in content.splitlines():
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+
+            negated = line.startswith("!")
+            if negated or line.startswith("\\"):
+                line = line[1:]
+
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+
+            # Patterns without a slash match at any depth, other patterns are relative to the file
+            if "/" not in line:
+                line = "**/" + line
+            line = line.lstrip("/")
+
+            self._rules.append(_IgnoreRule(re.compile(translate_glob(line)), negated, directory_only))
+
+    def match(self, path: str, is_directory: bool) -> Optional[bool]:
+        """Returns whether the path is ignored, or None if no rule matches it. The last matching rule wins."""
+        for rule in reversed(self._rules):
+            if rule.directory_only and not is_directory:
+                continue
+            if rule.regex.fullmatch(path):
+                return not rule.negated
+
+        return None
+
+
+class _Pattern:
+    def __init__(self, pattern: str):
+        self.segments = pattern.split("/")
+        self.regex = re.compile(translate_glob(pattern))
+
+    def may_match_below(self, directory: Tuple[str, ...]) -> bool:
+        """Returns whether files in the directory, or in any of its subdirectories, may match."""
+        for segment, name in zip(self.segments, directory):
+            if "**" in segment:
+                return True
+            if not fnmatchcase(name, segment):
+                return False
+
+        return len(directory) < len(self.segments)
+
+
+class SourceSnapshot:
+    """Snapshot of the project source files matching the `upload_source_files` patterns.
+
+    The project is walked once for all the patterns. Directories that cannot contain matching files
+    and directories ignored by `.gitignore` files are not entered. The listings of the directories are cached
+    with their modification times, so unchanged directories are not listed again on the next run.
+    File content hashes are cached by the `FileManifest`, so unchanged files are not read again.
+
+    The snapshot is identified by a hash of all the file paths and contents. It is archived into a single
+    zip file only when it is not already uploaded to the Neptune project.
+
+    Args:
+        root: Directory the patterns are relative to.
+        patterns: Glob patterns of the source files.
+        cache_dir: Directory where the listings and the archives are stored.
+    """
+
+    def __init__(self, root: str, patterns: List[str], cache_dir: str):
+        self._root = os.path.abspath(root)
+        self._cache_dir = cache_dir
+        self._listings_path = os.path.join(cache_dir, LISTINGS_FILE_NAME)
+        self._listings: Dict[str, Dict[str, Any]] = {}
+        self._ignores: Dict[str, Optional[GitIgnore]] = {}
+
+        self._patterns: List[_Pattern] = []
+        self._external_patterns: List[str] = []
+        # Absolute paths of the matched files outside of the root, by path in the snapshot
+        self._external_files: Dict[str, str] = {}
+        for pattern in patterns or []:
+            pattern = pattern.replace(os.sep, "/")
+            if os.path.isabs(pattern) or ".." in pattern.split("/"):
+                self._external_patterns.append(pattern)
+            else:
+                self._patterns.append(_Pattern(pattern[2:] if pattern.startswith("./") else pattern))
+
+        self.listed_dirs: int = 0
+
+        self._read_listings()
+
+    def _read_listings(self) -> None:
+        try:
+            with open(self._listings_path) as listings_file:
+                content = json.load(listings_file)
+        except (OSError, ValueError):
+            return
+
+        if content.get("root") == self._root:
+            self._listings = content.get("dirs", {})
+
+    def save(self) -> None:
+        write_json_atomically(self._listings_path, {"root": self._root, "dirs": self._listings})
+
+    def _list(self, directory: str) -> Tuple[List[str], List[str]]:
+        path = os.path.join(self._root, directory)
+        mtime = os.stat(path).st_mtime_ns
+
+        listing = self._listings.get(directory)
+        if listing is not None and listing["mtime"] == mtime:
+            return listing["files"], listing["dirs"]
+
+        files, dirs = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                # Symbolic links to directories are not followed, so that the walk cannot loop
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+
+        self.listed_dirs += 1
+        self._listings[directory] = {"mtime": mtime, "files": sorted(files), "dirs": sorted(dirs)}
+        return self._listings[directory]["files"], self._listings[directory]["dirs"]
+
+    def _gitignore(self, directory: str) -> Optional[GitIgnore]:
+        if directory not in self._ignores:
+            try:
+                with open(os.path.join(self._root, directory, ".gitignore")) as gitignore_file:
+                    self._ignores[directory] = GitIgnore(gitignore_file.read())
+            except OSError:
+                self._ignores[directory] = None
+
+        return self._ignores[directory]
+
+    def _is_ignored(self, path: str, is_directory: bool) -> bool:
+        segments = path.split("/")
+        ignored = False
+
+        # Rules of the nested `.gitignore` files take precedence over the rules of their parents
+        for depth in range(len(segments)):
+            gitignore = self._gitignore("/".join(segments[:depth]))
+            if gitignore is not None:
+                matched = gitignore.match("/".join(segments[depth:]), is_directory)
+                if matched is not None:
+                    ignored = matched
+
+        return ignored
+
+    def files(self) -> List[str]:
+        """Returns the sorted paths, relative to the root, of the files matching any pattern."""
+        matched = set()
+        pending = [""]
+
+        while pending:
+            directory = pending.pop()
+            files, dirs = self._list(directory)
+            prefix = f"{directory}/" if directory else ""
+
+            for name in files:
+                path = prefix + name
+                if any(pattern.regex.fullmatch(path) for pattern in self._patterns) and not self._is_ignored(
+                    path, is_directory=False
+                ):
+                    matched.add(path)
+
+            for name in dirs:
+                path = prefix + name
+                segments = tuple(path.split("/"))
+                if (
+                    name not in SKIPPED_DIRS
+                    and any(pattern.may_match_below(segments) for pattern in self._patterns)
+                    and not self._is_ignored(path, is_directory=True)
+                ):
+                    pending.append(path)
+
+        for pattern in self._external_patterns:
+            for path in glob.glob(os.path.join(self._root, pattern), recursive=True):
+                if os.path.isfile(path):
+                    matched.add(self._snapshot_path(path))
+
+        return sorted(matched)
+
+    def _snapshot_path(self, path: str) -> str:
+        """Returns the path of a file in the snapshot: relative to the root, or for files outside of the root,
+        their absolute path in the `external` directory, so that no path of the archive contains `..`."""
+        path = os.path.normpath(os.path.abspath(path))
+
+        try:
+            relative_path = os.path.relpath(path, self._root)
+        except ValueError:
+            # On another drive
+            relative_path = os.pardir
+
+        if relative_path != os.pardir and not relative_path.startswith(os.pardir + os.sep):
+            return relative_path.replace(os.sep, "/")
+
+        snapshot_path = f"{EXTERNAL_DIR_NAME}/{os.path.splitdrive(path)[1].lstrip(os.sep)}".replace(os.sep, "/")
+        self._external_files[snapshot_path] = path
+        return snapshot_path
+
+    def _absolute_path(self, path: str) -> str:
+        return self._external_files.get(path) or os.path.join(self._root, path)
+
+    def scan(self, manifest: FileManifest) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+        """Returns the hash of the snapshot and the hash and size of every file."""
+        files = {}
+        digest = hashlib.sha256()
+
+        for path in self.files():
+            absolute_path = self._absolute_path(path)
+            try:
+                stat = os.stat(absolute_path)
+            except OSError:
+                continue
+
+            def compute(file_path: str = absolute_path) -> Tuple[str, int]:
+                with open(file_path, "rb") as source_file:
+                    return hash_stream(source_file, chunk_size=HASH_CHUNK_SIZE)
+
+            file_digest = manifest.content_hash(
+                key=absolute_path, size=stat.st_size, mtime=stat.st_mtime_ns, compute=compute
+            )
+            files[path] = {"sha256": file_digest, "size": stat.st_size}
+            digest.update(f"{path}\0{file_digest}\n".encode())
+
+        return digest.hexdigest(), files
+
+    def archive(self, digest: str, files: Dict[str, Dict[str, Any]]) -> str:
+        """Writes the files to a zip archive and returns its path. Archives of older snapshots are removed."""
+        directory = os.path.join(self._cache_dir, ARCHIVES_DIR_NAME)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{digest}.zip")
+
+        # Older archives were uploaded by previous runs
+        for name in os.listdir(directory):
+            if name.endswith(".zip") and name != os.path.basename(path):
+                os.remove(os.path.join(directory, name))
+
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for file_path in files:
+                    archive.write(self._absolute_path(file_path), arcname=file_path)
+            os.replace(tmp_path, path)
+
+        return path
@@ -0,0 +1,175 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "chrome_trace",
+    "gantt_html",
+    "read_intervals",
+    "write_intervals",
+]
+
+import json
+import os
+import shutil
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Tuple,
+)
+
+from kedro_neptune.node_timer import NodeInterval
+
+
+def write_intervals(directory: str, intervals: Iterable[NodeInterval]) -> None:
+    """Appends the intervals of the current process to its own file, so that workers never write to the same file."""
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, f"{os.getpid()}.jsonl"), "a") as intervals_file:
+        for interval in intervals:
+            intervals_file.write(json.dumps(interval._asdict()) + "\n")
+
+
+def read_intervals(directory: str, remove: bool = False) -> List[NodeInterval]:
+    intervals = []
+
+    if os.path.isdir(directory):
+        for file_name in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, file_name)) as intervals_file:
+                intervals.extend(NodeInterval(**json.loads(line)) for line in intervals_file if line.strip())
+
+    if remove:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return intervals
+
+
+def _lanes(intervals: List[NodeInterval]) -> Dict[Tuple[int, int], int]:
+    lanes: Dict[Tuple[int, int], int] = {}
+    for interval in intervals:
+        lanes.setdefault((interval.pid, interval.thread_id), len(lanes))
+
+    return lanes
+
+
+def chrome_trace(intervals: List[NodeInterval]) -> str:
+    """Returns the intervals in the Chrome trace event format, which can be opened in Perfetto or chrome://tracing."""
+    origin = min((interval.start for interval in intervals), default=0)
+    events = []
+
+    for pid, thread_id in _lanes(intervals):
+        events.append({"ph": "M", "name": "process_name", "pid": pid, "tid": thread_id, "args": {"name": f"pid {pid}"}})
+
+    thread_names = {}
+    for interval in intervals:
+        thread_names[(interval.pid, interval.thread_id)] = interval.thread_name
+        events.append(
+            {
+                "ph": "X",
+                "cat": "node",
+                "name": interval.name,
+                "pid": interval.pid,
+                "tid": interval.thread_id,
+                "ts": (interval.start - origin) / 1e3,
+                "dur": (interval.end - interval.start) / 1e3,
+            }
+        )
+
+    for (pid, thread_id), thread_name in thread_names.items():
+        events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+
+    return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+
+
+GANTT_TEMPLATE = """\
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Kedro pipeline timeline</title>
+<style>
+body { font-family: sans-serif; margin: 16px; }
+#tooltip { position: fixed; background: #fff; border: 1px solid #999; padding: 4px; display: none; font-size: 12px; }
+</style>
+</head>
+<body>
+<h3>Kedro pipeline timeline</h3>
+<canvas id="gantt"></canvas>
+<div id="tooltip"></div>
+<script>
+const data = __DATA__;
+const laneHeight = 20, labelWidth = 220, width = Math.max(800, window.innerWidth - 48);
+const total = Math.max(data.total, 1e-9), scale = (width - labelWidth) / total;
+const canvas = document.getElementById("gantt");
+canvas.width = width;
+canvas.height = (data.lanes.length + 1) * laneHeight;
+const context = canvas.getContext("2d");
+context.font = "12px sans-serif";
+data.lanes.forEach((lane, index) => {
+  context.fillStyle = index % 2 ? "#f4f4f4" : "#fff";
+  context.fillRect(0, index * laneHeight, width, laneHeight);
+  context.fillStyle = "#000";
+  context.fillText(lane, 4, index * laneHeight + 14);
+});
+data.bars.forEach(([lane, start, duration, name], index) => {
+  context.fillStyle = `hsl(${(index * 47) % 360}, 60%, 60%)`;
+  context.fillRect(labelWidth + start * scale, lane * laneHeight + 2, Math.max(1, duration * scale), laneHeight - 4);
+});
+context.fillStyle = "#000";
+context.fillText(`0 ms`, labelWidth, data.lanes.length * laneHeight + 14);
+context.fillText(`${total.toFixed(1)} ms`, width - 80, data.lanes.length * laneHeight + 14);
+const tooltip = document.getElementById("tooltip");
+canvas.addEventListener("mousemove", (event) => {
+  const rect = canvas.getBoundingClientRect();
+  const lane = Math.floor((event.clientY - rect.top) / laneHeight);
+  const time = (event.clientX - rect.left - labelWidth) / scale;
+  const bar = data.bars.find(
+    ([barLane, start, duration]) => barLane === lane && time >= start && time <= start + duration
+  );
+  if (!bar) { tooltip.style.display = "none"; return; }
+  tooltip.textContent = `${bar[3]}: ${bar[2].toFixed(1)} ms, starts at ${bar[1].toFixed(1)} ms`;
+  tooltip.style.left = `${event.clientX + 12}px`;
+  tooltip.style.top = `${event.clientY + 12}px`;
+  tooltip.style.display = "block";
+});
+</script>
+</body>
+</html>
+"""
+
+
+def gantt_html(intervals: List[NodeInterval]) -> str:
+    """Returns a self-contained HTML Gantt chart of the intervals, with one lane per process and thread."""
+    origin = min((interval.start for interval in intervals), default=0)
+    end = max((interval.end for interval in intervals), default=0)
+    lanes = _lanes(intervals)
+    thread_names = {(interval.pid, interval.thread_id): interval.thread_name for interval in intervals}
+
+    data = {
+        "total": (end - origin) / 1e6,
+        "lanes": [f"pid {pid} / {thread_names[(pid, thread_id)]}" for pid, thread_id in lanes],
+        "bars": [
+            [
+                lanes[(interval.pid, interval.thread_id)],
+                (interval.start - origin) / 1e6,
+                (interval.end - interval.start) / 1e6,
+                interval.name,
+            ]
+            for interval in intervals
+        ],
+    }
+
+    # Node names cannot close the script tag
+    return GANTT_TEMPLATE.replace("__DATA__", json.dumps(data).replace("</", "<\\/"))
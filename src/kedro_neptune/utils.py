@@ -17,12 +17,19 @@ __all__ = [
     "ensure_bool",
     "parse_config_value",
     "get_kedro_env",
+    "write_bytes_atomically",
+    "write_json_atomically",
 ]
 
+import json
 import os
 import sys
+import tempfile
+from contextlib import contextmanager
 from typing import (
+    IO,
     Any,
+    Iterator,
     Optional,
     Union,
 )
@@ -64,3 +71,31 @@ def get_kedro_env(settings: object) -> Optional[str]:
         or settings.CONFIG_LOADER_ARGS.get("default_run_env")
         or settings.CONFIG_LOADER_ARGS.get("base_env")
     )
+
+
+@contextmanager
+def _open_atomically(path: str, mode: str) -> Iterator[IO]:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    descriptor, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, mode) as tmp_file:
+            yield tmp_file
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json_atomically(path: str, content: Any) -> None:
+    """Writes `content` as JSON to `path`, so that readers never see a partially written file."""
+    with _open_atomically(path, "w") as tmp_file:
+        json.dump(content, tmp_file)
+
+
+def write_bytes_atomically(path: str, data: bytes) -> None:
+    """Writes `data` to `path`, so that readers never see a partially written file."""
+    with _open_atomically(path, "wb") as tmp_file:
+        tmp_file.write(data)
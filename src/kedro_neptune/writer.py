@@ -0,0 +1,266 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    "AsyncWriter",
+    "RecordingNamespace",
+    "Record",
+    "apply_record",
+    "BACKPRESSURE_POLICIES",
+]
+
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Optional,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+# (method, path, value) where method is one of "assign", "append", "extend" or "upload"
+Record = Tuple[str, str, Any]
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "spill")
+
+
+def _join_paths(*paths: str) -> str:
+    return "/".join(str(path) for path in paths if path)
+
+
+def apply_record(run: Any, record: Record) -> None:
+    method, path, value = record
+
+    if method == "assign":
+        run[path] = value
+    elif method == "append":
+        run[path].append(value)
+    elif method == "extend":
+        run[path].extend(value)
+    elif method == "upload":
+        run[path].upload(value)
+    else:
+        raise ValueError(f"Unsupported record method: {method}")
+
+
+class RecordingNamespace:
+    """Handler-like namespace that turns assignments, appends and uploads into records.
+
+    It supports the subset of the Neptune `Handler` API used by the logging functions of this plugin,
+    so they can write either to a live run or to a record sink without changes.
+    """
+
+    def __init__(self, sink: Callable[[Record], None], path: str = "", container: Any = None):
+        self._sink = sink
+        self._path = path
+        self._container = container
+
+    @property
+    def container(self) -> Any:
+        return self._container
+
+    def __getitem__(self, key: str) -> "RecordingNamespace":
+        return RecordingNamespace(sink=self._sink, path=_join_paths(self._path, key), container=self._container)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._sink(("assign", _join_paths(self._path, key), value))
+
+    def assign(self, value: Any) -> None:
+        self._sink(("assign", self._path, value))
+
+    def append(self, value: Any) -> None:
+        self._sink(("append", self._path, value))
+
+    def extend(self, values: Any) -> None:
+        self._sink(("extend", self._path, values))
+
+    def upload(self, value: Any) -> None:
+        self._sink(("upload", self._path, value))
+
+
+class AsyncWriter:
+    """Bounded queue of records applied to a Neptune run by a dedicated flusher thread.
+
+    Args:
+        run: Neptune run the records are applied to.
+        max_in_flight: Maximum number of records waiting in memory.
+        flush_interval: Maximum number of seconds a record waits before the flusher applies it.
+        backpressure: What to do when the queue is full:
+            "block" waits for the flusher, "drop_oldest" discards the oldest record
+            and "spill" writes new records to a temporary file on disk until the flusher catches up.
+            Records that cannot be pickled are kept in memory, after the records already spilled.
+    """
+
+    def __init__(self, run: Any, max_in_flight: int = 1000, flush_interval: float = 5.0, backpressure: str = "block"):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"backpressure must be one of {BACKPRESSURE_POLICIES}, got '{backpressure}'")
+
+        self._run = run
+        self._max_in_flight = max(1, int(max_in_flight))
+        self._flush_interval = float(flush_interval)
+        self._backpressure = backpressure
+
+        self._condition = threading.Condition()
+        self._queue: Deque[Record] = deque()
+        self._in_progress: int = 0
+        self._spill_path: Optional[str] = None
+        self._spilled: int = 0
+        self._closed: bool = False
+        self._flush_requested: bool = False
+        self._wake_up_size: int = max(1, self._max_in_flight // 2)
+
+        self.submitted: int = 0
+        self.applied: int = 0
+        self.dropped: int = 0
+        self.failed: int = 0
+
+        self._thread = threading.Thread(target=self._flush_loop, name="kedro-neptune-writer", daemon=True)
+        self._thread.start()
+
+    def namespace(self, path: str = "") -> RecordingNamespace:
+        return RecordingNamespace(sink=self.submit, path=path, container=self._run)
+
+    def submit(self, record: Record) -> None:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot submit records to a closed writer")
+
+            self.submitted += 1
+
+            if self._backpressure == "spill" and (self._spilled or len(self._queue) >= self._max_in_flight):
+                if self._spill(record):
+                    return
+                # The record stays in memory, queue it only once the flusher has taken the spilled records,
+                # which it applies first
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: not self._spilled or not self._thread.is_alive())
+
+            if len(self._queue) >= self._max_in_flight:
+                if self._backpressure == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    self._condition.notify_all()
+                    self._condition.wait_for(lambda: len(self._queue) < self._max_in_flight or self._closed)
+
+            self._queue.append(record)
+
+            if len(self._queue) >= self._wake_up_size:
+                self._condition.notify_all()
+
+    def _spill(self, record: Record) -> bool:
+        try:
+            payload = pickle.dumps(record)
+        except Exception:  # noqa: B902
+            # Records holding open streams cannot be written to disk
+            return False
+
+        if self._spill_path is None:
+            descriptor, self._spill_path = tempfile.mkstemp(prefix="kedro-neptune-", suffix=".spill")
+            os.close(descriptor)
+
+        with open(self._spill_path, "ab") as spill_file:
+            spill_file.write(payload)
+
+        self._spilled += 1
+        self._condition.notify_all()
+        return True
+
+    def _take_spilled(self) -> Optional[str]:
+        if not self._spilled:
+            return None
+
+        path, self._spill_path, self._spilled = self._spill_path, None, 0
+        return path
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed
+                    or self._flush_requested
+                    or self._spilled
+                    or len(self._queue) >= self._wake_up_size,
+                    timeout=self._flush_interval,
+                )
+
+                self._flush_requested = False
+                batch = list(self._queue)
+                self._queue.clear()
+                spill_path = self._take_spilled() if not batch else None
+                self._in_progress = len(batch) + (1 if spill_path else 0)
+                closed = self._closed
+                self._condition.notify_all()
+
+            for record in batch:
+                self._apply(record)
+
+            if spill_path is not None:
+                self._apply_spilled(spill_path)
+
+            with self._condition:
+                self._in_progress = 0
+                self._condition.notify_all()
+
+                if closed and not self._queue and not self._spilled:
+                    return
+
+    def _apply_spilled(self, path: str) -> None:
+        try:
+            with open(path, "rb") as spill_file:
+                while True:
+                    try:
+                        record = pickle.load(spill_file)
+                    except EOFError:
+                        break
+                    self._apply(record)
+        finally:
+            os.remove(path)
+
+    def _apply(self, record: Record) -> None:
+        try:
+            apply_record(self._run, record)
+            self.applied += 1
+        except Exception as exception:  # noqa: B902
+            self.failed += 1
+            logger.warning("Failed to log '%s' to Neptune: %s", record[1], exception)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._spilled and not self._in_progress or not self._thread.is_alive(),
+                timeout=None if deadline is None else max(0.0, deadline - time.monotonic()),
+            )
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        self._thread.join()
@@ -0,0 +1,59 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from kedro_neptune.catalog_index import CatalogIndex
+
+
+class TestCatalogIndex:
+    def test_dirty_includes_neptune_companions(self):
+        index = CatalogIndex()
+        index.reset(["planets", "planets@neptune", "logo", "distances"])
+
+        index.mark_dirty(["planets"])
+
+        assert index.pop_dirty() == ["planets", "planets@neptune"]
+        assert index.pop_dirty() == []
+
+    def test_logged_datasets_are_skipped(self):
+        index = CatalogIndex()
+        index.reset(["planets", "planets@neptune"])
+        index.mark_logged("planets@neptune")
+
+        index.mark_dirty(["planets"])
+
+        assert index.pop_dirty() == ["planets"]
+        assert index.is_logged("planets@neptune")
+
+    def test_changed_datasets_are_logged_again(self):
+        index = CatalogIndex()
+        index.reset(["parts", "parts@neptune"])
+        index.mark_logged("parts")
+        index.mark_logged("parts@neptune")
+
+        index.mark_changed(["parts"])
+
+        assert index.pop_dirty() == ["parts", "parts@neptune"]
+        assert not index.is_logged("parts@neptune")
+
+    def test_reset_clears_state(self):
+        index = CatalogIndex()
+        assert not index.initialized
+
+        index.reset(["planets"])
+        index.mark_logged("planets")
+        index.reset(["planets"])
+
+        assert index.initialized
+        assert not index.is_logged("planets")
@@ -0,0 +1,126 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import pickle
+from unittest import mock
+
+import pytest
+from kedro.config import OmegaConfigLoader
+
+from kedro_neptune.config import (
+    NeptuneConfigCache,
+    get_neptune_config,
+    neptune_config_cache,
+)
+
+NEPTUNE_CONFIG = """\
+neptune:
+  project: common/kedro-integration
+  base_namespace: kedro
+  enabled: true
+  upload_source_files:
+  - conf/base/*.yml
+"""
+
+NEPTUNE_CREDENTIALS = """\
+neptune:
+  api_token: $NEPTUNE_API_TOKEN
+"""
+
+
+@pytest.fixture
+def settings(tmp_path):
+    (tmp_path / "base").mkdir()
+    (tmp_path / "local").mkdir()
+    (tmp_path / "base" / "neptune.yml").write_text(NEPTUNE_CONFIG)
+    (tmp_path / "local" / "credentials_neptune.yml").write_text(NEPTUNE_CREDENTIALS)
+
+    settings = mock.Mock()
+    settings.CONF_SOURCE = str(tmp_path)
+    settings.CONFIG_LOADER_CLASS = OmegaConfigLoader
+    settings.CONFIG_LOADER_ARGS = {
+        "base_env": "base",
+        "default_run_env": "local",
+        "config_patterns": {
+            "credentials_neptune": ["credentials_neptune*"],
+            "neptune": ["neptune*"],
+        },
+    }
+
+    neptune_config_cache.clear()
+    yield settings
+    neptune_config_cache.clear()
+
+
+def _touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestNeptuneConfigCache:
+    def test_loads_once(self, settings):
+        for _ in range(10):
+            config = get_neptune_config(settings)
+
+        assert config.project == "common/kedro-integration"
+        assert neptune_config_cache.loads == 1
+        assert neptune_config_cache.hits == 9
+
+    def test_invalidated_on_file_change(self, settings):
+        config_file = os.path.join(settings.CONF_SOURCE, "base", "neptune.yml")
+
+        assert get_neptune_config(settings).enabled is True
+
+        with open(config_file, "w") as handler:
+            handler.write(NEPTUNE_CONFIG.replace("enabled: true", "enabled: false"))
+        _touch(config_file)
+
+        assert get_neptune_config(settings).enabled is False
+        assert neptune_config_cache.loads == 2
+
+    def test_only_neptune_files_are_checked(self, settings):
+        get_neptune_config(settings)
+
+        parameters_file = os.path.join(settings.CONF_SOURCE, "base", "parameters.yml")
+        with open(parameters_file, "w") as handler:
+            handler.write("seed: 1\n")
+        get_neptune_config(settings)
+        assert neptune_config_cache.loads == 1
+
+        with open(os.path.join(settings.CONF_SOURCE, "local", "neptune.yml"), "w") as handler:
+            handler.write(NEPTUNE_CONFIG.replace("enabled: true", "enabled: false"))
+
+        assert get_neptune_config(settings).enabled is False
+        assert neptune_config_cache.loads == 2
+
+    def test_env_variables_resolved_on_every_call(self, settings):
+        with mock.patch.dict(os.environ, {"NEPTUNE_API_TOKEN": "first"}):
+            assert get_neptune_config(settings).api_token == "first"
+
+        with mock.patch.dict(os.environ, {"NEPTUNE_API_TOKEN": "second"}):
+            assert get_neptune_config(settings).api_token == "second"
+
+        assert neptune_config_cache.loads == 1
+
+    def test_survives_pickling(self, settings):
+        get_neptune_config(settings)
+
+        restored = NeptuneConfigCache()
+        restored.update(pickle.loads(pickle.dumps(neptune_config_cache)))
+        restored.get(settings)
+
+        assert restored.loads == 0
+        assert restored.hits == 1
@@ -0,0 +1,79 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import numpy as np
+import pandas as pd
+import pytest
+
+from kedro_neptune.data_profiler import profile_data
+
+
+class TestProfileData:
+    def test_pandas(self):
+        frame = pd.DataFrame(
+            {
+                "value": [1.0, 2.0, None, 4.0],
+                "name/full": ["a", "b", None, "d"],
+                "count": pd.array([1, None, 3, 4], dtype="Int64"),
+            }
+        )
+
+        profile = profile_data(frame)
+
+        assert profile["rows"] == 4
+        assert profile["columns"] == 3
+        assert "sample_rows" not in profile
+        assert profile["column"]["value"]["dtype"] == "float64"
+        assert profile["column"]["value"]["null_rate"] == 0.25
+        assert profile["column"]["value"]["min"] == 1.0
+        assert profile["column"]["value"]["max"] == 4.0
+        assert profile["column"]["value"]["quantiles"]["p50"] == 2.0
+        assert profile["column"]["name_full"] == {"dtype": "object", "null_rate": 0.25}
+        assert profile["column"]["count"]["mean"] == pytest.approx(8 / 3)
+
+    def test_rows_above_the_sample_size_are_sampled(self):
+        frame = pd.DataFrame({"value": np.arange(100_000, dtype="float64")})
+
+        profile = profile_data(frame, sample_size=1000)
+
+        assert profile["rows"] == 100_000
+        assert profile["sample_rows"] == 1000
+        assert profile["column"]["value"]["mean"] == pytest.approx(50_000, rel=0.1)
+        assert profile_data(frame, sample_size=1000) == profile
+
+    def test_columns_above_the_limit_are_not_profiled(self):
+        profile = profile_data(pd.DataFrame(np.zeros((2, 5))), max_columns=2)
+
+        assert profile["columns"] == 5
+        assert list(profile["column"]) == ["0", "1"]
+
+    def test_numpy(self):
+        profile = profile_data(np.array([[1.0, np.nan], [3.0, 4.0]]))
+
+        assert profile["rows"] == 2
+        assert profile["columns"] == 2
+        assert profile["column"]["1"]["null_rate"] == 0.5
+        assert profile["column"]["1"]["mean"] == 4.0
+        assert profile_data(np.array(["a", "b"]))["column"] == {"0": {"dtype": "<U1"}}
+
+    def test_statistics_of_null_columns_are_not_logged(self):
+        profile = profile_data(pd.Series([np.nan, np.nan], name="value"))
+
+        assert profile["column"]["value"] == {"dtype": "float64", "null_rate": 1.0}
+
+    def test_other_data_is_not_profiled(self):
+        assert profile_data(b"data") is None
+        assert profile_data([1, 2, 3]) is None
+        assert profile_data(np.float64(1.0)) is None
@@ -0,0 +1,89 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import csv
+import io
+
+from kedro.io import MemoryDataset
+from kedro_datasets.text import TextDataset
+
+from kedro_neptune.dataset_io import (
+    DatasetIOTracker,
+    dataset_size,
+    read_io_records,
+    write_io_records,
+)
+
+
+class TestDatasetIOTracker:
+    def test_pending_and_stats(self):
+        tracker = DatasetIOTracker()
+
+        for _ in range(2):
+            tracker.start("load", "planets")
+            tracker.stop("load", "planets")
+        tracker.start("save", "model")
+        tracker.stop("save", "model")
+        tracker.stop("save", "not_started")
+
+        pending = tracker.pop_pending()
+        for name, operation, seconds in pending:
+            tracker.add(name=name, operation=operation, seconds=seconds, size=1000 if name == "planets" else None)
+
+        stats = tracker.stats()
+
+        assert [(name, operation) for name, operation, _ in pending] == [
+            ("planets", "load"),
+            ("planets", "load"),
+            ("model", "save"),
+        ]
+        assert tracker.pop_pending() == []
+        assert stats["planets"]["load"]["count"] == 2
+        assert stats["planets"]["load"]["total_bytes"] == 2000
+        assert stats["model"]["save"]["total_bytes"] == 0
+
+    def test_summary_is_ordered_by_total_time(self):
+        tracker = DatasetIOTracker()
+        tracker.add(name="fast", operation="load", seconds=0.1, size=None)
+        tracker.add(name="slow", operation="save", seconds=2.0, size=4_000_000)
+
+        rows = list(csv.DictReader(io.StringIO(tracker.summary(limit=1))))
+
+        assert len(rows) == 1
+        assert rows[0]["dataset"] == "slow"
+        assert float(rows[0]["mean_throughput_mb_s"]) == 2.0
+
+
+def test_io_records_of_workers(tmp_path):
+    write_io_records(str(tmp_path / "io"), [("planets", "load", 0.5, 100), ("model", "save", 1.0, None)])
+    write_io_records(str(tmp_path / "io"), [("planets", "load", 1.5, 100)])
+
+    tracker = DatasetIOTracker()
+    for name, operation, seconds, size in read_io_records(str(tmp_path / "io"), remove=True):
+        tracker.add(name=name, operation=operation, seconds=seconds, size=size)
+
+    assert tracker.stats()["planets"]["load"]["total_time"] == 2.0
+    assert tracker.stats()["model"]["save"]["count"] == 1
+    assert not (tmp_path / "io").exists()
+    assert read_io_records(str(tmp_path / "io")) == []
+
+
+def test_dataset_size(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("x" * 100)
+
+    assert dataset_size(TextDataset(filepath=str(path))) == 100
+    assert dataset_size(TextDataset(filepath=str(tmp_path / "missing.txt"))) is None
+    assert dataset_size(MemoryDataset()) is None
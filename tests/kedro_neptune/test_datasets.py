@@ -0,0 +1,127 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import io
+from unittest import mock
+
+import fsspec
+
+from kedro_neptune import (
+    NeptuneFileDataset,
+    log_file_dataset,
+    log_file_datasets,
+)
+from kedro_neptune.file_manifest import FileManifest
+from kedro_neptune.file_uploader import FileUploader
+
+
+def _namespace():
+    namespace = mock.MagicMock()
+    namespace._path = "kedro/catalog/files"
+    namespace.container.exists.return_value = False
+    return namespace
+
+
+class TestNeptuneFileDataset:
+    def test_streaming_local_file_is_uploaded_by_path(self, tmp_path):
+        filepath = tmp_path / "model.pkl"
+        filepath.write_bytes(b"model")
+        dataset = NeptuneFileDataset(filepath=str(filepath), streaming=True)
+        namespace = _namespace()
+
+        with mock.patch.object(NeptuneFileDataset, "load") as load:
+            log_file_dataset(namespace=namespace, name="model", dataset=dataset)
+
+        load.assert_not_called()
+        uploaded = namespace["model"].upload.call_args[0][0]
+        assert uploaded.path == str(filepath)
+        assert uploaded.extension == "pkl"
+
+    def test_streaming_remote_file_is_read_in_chunks(self):
+        with fsspec.open("memory:///remote/planets.csv", "wb") as remote_file:
+            remote_file.write(b"a,b\n1,2\n")
+        dataset = NeptuneFileDataset(filepath="memory:///remote/planets.csv", streaming=True, chunk_size=4)
+
+        file = dataset.as_file()
+
+        assert file.extension == "csv"
+        assert file.content == b"a,b\n1,2\n"
+
+    def test_streamed_file_is_closed_once_uploaded(self, tmp_path):
+        dataset = NeptuneFileDataset(filepath="memory:///remote/model.pkl", streaming=True, chunk_size=4)
+        # Files of the memory filesystem cannot be closed
+        stream = io.BytesIO(b"model" * 10)
+
+        with mock.patch.object(dataset._fs, "open", return_value=stream):
+            file = dataset.as_file()
+        assert not stream.closed
+
+        file._save(str(tmp_path / "model.pkl"))
+
+        assert stream.closed
+        assert (tmp_path / "model.pkl").read_bytes() == b"model" * 10
+
+    def test_streamed_file_is_closed_when_dropped(self):
+        dataset = NeptuneFileDataset(filepath="memory:///remote/model.pkl", streaming=True)
+        stream = io.BytesIO(b"model")
+
+        with mock.patch.object(dataset._fs, "open", return_value=stream):
+            dataset.as_file()
+
+        assert stream.closed
+
+    def test_non_streaming_loads_content(self, tmp_path):
+        filepath = tmp_path / "logo.png"
+        filepath.write_bytes(b"png")
+        dataset = NeptuneFileDataset(filepath=str(filepath))
+        namespace = _namespace()
+
+        log_file_dataset(namespace=namespace, name="logo", dataset=dataset)
+
+        assert namespace["logo"].upload.call_args[0][0].content == b"png"
+
+    def test_pooled_uploads_are_not_loaded(self, tmp_path):
+        datasets = []
+        for i in range(3):
+            filepath = tmp_path / f"model_{i}.pkl"
+            filepath.write_bytes(b"model")
+            datasets.append((f"model_{i}", NeptuneFileDataset(filepath=str(filepath))))
+        namespace = mock.MagicMock()
+        namespace["files"].container.exists.return_value = False
+
+        with mock.patch.object(NeptuneFileDataset, "load") as load:
+            log_file_datasets(namespace=namespace, datasets=datasets, uploader=FileUploader(max_workers=2))
+
+        load.assert_not_called()
+        uploaded = {call[0][0].path for call in namespace["files"]["model_0"].upload.call_args_list}
+        assert uploaded == {str(tmp_path / f"model_{i}.pkl") for i in range(3)}
+
+    def test_deduplicated_file_is_logged_as_reference(self, tmp_path):
+        filepath = tmp_path / "logo.png"
+        filepath.write_bytes(b"png")
+        dataset = NeptuneFileDataset(filepath=str(filepath))
+        first, second = _namespace(), _namespace()
+
+        first_manifest = FileManifest(directory=str(tmp_path / "cache"), project="a/b", run_id="first")
+        log_file_dataset(namespace=first, name="logo", dataset=dataset, manifest=first_manifest)
+        first_manifest.save()
+
+        second_manifest = FileManifest(directory=str(tmp_path / "cache"), project="a/b", run_id="second")
+        log_file_dataset(namespace=second, name="logo", dataset=dataset, manifest=second_manifest)
+
+        first["logo"].upload.assert_called_once()
+        second["logo"].upload.assert_not_called()
+        assert second.__setitem__.call_args[0][1]["run_id"] == "first"
+        assert (first_manifest.bytes_uploaded, second_manifest.bytes_skipped) == (3, 3)
@@ -0,0 +1,75 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import hashlib
+import sys
+from unittest import mock
+
+import pytest
+
+from kedro_neptune.dependencies import (
+    DependencyCache,
+    environment_key,
+    infer_requirements,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_memory():
+    DependencyCache._memory.clear()
+    yield
+    DependencyCache._memory.clear()
+
+
+class TestDependencyCache:
+    def test_infer_requirements(self):
+        requirements = infer_requirements().splitlines()
+
+        assert any(requirement.startswith("kedro==") for requirement in requirements)
+        names = [requirement.split("==")[0].lower() for requirement in requirements]
+        assert names == sorted(set(names))
+
+    def test_environment_key_is_stable(self):
+        assert environment_key() == environment_key()
+
+    def test_environment_key_ignores_project_sources(self, tmp_path):
+        key = environment_key()
+
+        with mock.patch("sys.path", [str(tmp_path), *sys.path]):
+            (tmp_path / "nodes.py").write_text("")
+            assert environment_key() == key
+
+    def test_requirements_are_computed_once_per_environment(self, tmp_path):
+        with mock.patch("kedro_neptune.dependencies.infer_requirements", return_value="a==1\nb==2") as infer:
+            first = DependencyCache(cache_dir=str(tmp_path))
+            requirements, digest = first.requirements()
+
+            # Another process, which does not share the memory cache
+            DependencyCache._memory.clear()
+            second = DependencyCache(cache_dir=str(tmp_path))
+
+            assert second.requirements() == (requirements, digest)
+            assert infer.call_count == 1
+            assert first.computed and not second.computed
+            assert digest == hashlib.sha256(b"a==1\nb==2").hexdigest()
+
+    def test_requirements_are_computed_again_when_the_environment_changes(self, tmp_path):
+        with mock.patch("kedro_neptune.dependencies.infer_requirements", side_effect=["a==1", "a==2"]):
+            with mock.patch("kedro_neptune.dependencies.environment_key", return_value="before"):
+                DependencyCache(cache_dir=str(tmp_path)).requirements()
+            with mock.patch("kedro_neptune.dependencies.environment_key", return_value="after"):
+                requirements, _ = DependencyCache(cache_dir=str(tmp_path)).requirements()
+
+        assert requirements == "a==2"
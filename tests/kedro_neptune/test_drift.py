@@ -0,0 +1,97 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kedro_neptune.drift import (
+    DriftStore,
+    dataset_drift,
+    population_stability_index,
+)
+from kedro_neptune.sketches import DatasetSketch
+
+
+def sketch(rows=50_000, shift=0.0, weights=(0.4, 0.3, 0.2, 0.1), seed=0):
+    rng = np.random.default_rng(seed)
+    dataset_sketch = DatasetSketch()
+    dataset_sketch.update(
+        pd.DataFrame(
+            {
+                "value": rng.normal(shift, 1.0, size=rows),
+                "key/name": rng.choice(list("abcd"), p=weights, size=rows),
+            }
+        )
+    )
+    return dataset_sketch
+
+
+class TestDatasetDrift:
+    def test_same_distribution(self):
+        drift = dataset_drift(baseline=sketch(seed=0), current=sketch(seed=1))
+
+        assert drift["rows_change"] == 0
+        assert drift["max_psi"] < 0.01
+        assert drift["max_ks"] < 0.02
+        assert drift["column"]["value"]["null_rate_change"] == 0.0
+        assert "ks" not in drift["column"]["key_name"]
+
+    def test_shifted_distribution(self):
+        drift = dataset_drift(baseline=sketch(), current=sketch(rows=40_000, shift=0.5, weights=(0.1, 0.2, 0.3, 0.4)))
+
+        assert drift["rows_change"] == -10_000
+        assert drift["column"]["value"]["psi"] > 0.2
+        assert drift["column"]["value"]["ks"] == pytest.approx(0.2, abs=0.03)
+        assert drift["column"]["key_name"]["psi"] > 0.25
+
+    def test_columns_missing_from_the_baseline_are_skipped(self):
+        baseline = DatasetSketch()
+        baseline.update(pd.DataFrame({"other": [1.0, 2.0]}))
+
+        assert dataset_drift(baseline=baseline, current=sketch(rows=10)) == {"rows_change": 8}
+
+    def test_population_stability_index(self):
+        assert population_stability_index(np.array([0.5, 0.5]), np.array([0.5, 0.5])) == 0.0
+        assert population_stability_index(np.array([1.0, 0.0]), np.array([0.0, 1.0])) == pytest.approx(
+            2 * (1 - 1e-4) * np.log(1e4)
+        )
+
+
+class TestDriftStore:
+    def test_previous_run_is_the_baseline(self, tmp_path):
+        store = DriftStore(directory=str(tmp_path), max_runs=10)
+        for index, run_id in enumerate(["first", "second"]):
+            store.put(name="model/input", run_id=run_id, sketch=sketch(rows=10 + index))
+            os.utime(tmp_path / "model%2Finput" / f"{run_id}.npz", ns=(index, index))
+
+        run_id, baseline = store.baseline(name="model/input", run_id="third")
+
+        assert run_id == "second"
+        assert baseline.rows == 11
+        assert store.baseline(name="model/input", run_id="second")[0] == "first"
+        assert store.baseline(name="model/input", run_id="third", baseline="first")[1].rows == 10
+        assert store.baseline(name="model/input", run_id="third", baseline="missing") is None
+        assert store.baseline(name="other", run_id="third") is None
+
+    def test_only_the_most_recent_and_kept_runs_are_stored(self, tmp_path):
+        store = DriftStore(directory=str(tmp_path), max_runs=2)
+        for index, run_id in enumerate(["first", "second", "third", "fourth"]):
+            store.put(name="data", run_id=run_id, sketch=sketch(rows=10), keep=["first"])
+            os.utime(tmp_path / "data" / f"{run_id}.npz", ns=(index, index))
+
+        assert store.runs("data") == ["first", "third", "fourth"]
@@ -0,0 +1,67 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import hashlib
+import io
+from unittest import mock
+
+from kedro_neptune.file_manifest import (
+    FileManifest,
+    hash_stream,
+)
+
+
+class TestFileManifest:
+    def test_hash_stream(self):
+        content = b"x" * 1000
+
+        assert hash_stream(io.BytesIO(content), chunk_size=7) == (hashlib.sha256(content).hexdigest(), 1000)
+
+    def test_unchanged_files_are_not_rehashed(self, tmp_path):
+        compute = mock.Mock(return_value=("digest", 10))
+        first = FileManifest(directory=str(tmp_path), project="a/b", run_id="first")
+        first.content_hash(key="file:///data.csv", size=10, mtime="1", compute=compute)
+        first.save()
+
+        manifest = FileManifest(directory=str(tmp_path), project="a/b", run_id="second")
+        manifest.content_hash(key="file:///data.csv", size=10, mtime="1", compute=compute)
+        manifest.content_hash(key="file:///data.csv", size=11, mtime="2", compute=compute)
+
+        assert compute.call_count == 2
+
+    def test_uploads_are_shared_between_runs_of_the_same_project(self, tmp_path):
+        first = FileManifest(directory=str(tmp_path), project="a/b", run_id="first")
+        first.record_upload(digest="digest", size=10, attribute_path="kedro/catalog/files/data")
+        first.save()
+
+        second = FileManifest(directory=str(tmp_path), project="a/b", run_id="second")
+        other_project = FileManifest(directory=str(tmp_path), project="a/c", run_id="third")
+
+        assert second.find_upload("digest") == {"run_id": "first", "path": "kedro/catalog/files/data", "size": 10}
+        assert other_project.find_upload("digest") is None
+        assert first.bytes_uploaded == 10
+
+    def test_save_merges_concurrent_manifests(self, tmp_path):
+        first = FileManifest(directory=str(tmp_path), project="a/b", run_id="first")
+        second = FileManifest(directory=str(tmp_path), project="a/b", run_id="second")
+
+        first.record_upload(digest="first", size=1, attribute_path="first")
+        second.record_upload(digest="second", size=1, attribute_path="second")
+        first.save()
+        second.save()
+
+        manifest = FileManifest(directory=str(tmp_path), project="a/b", run_id="third")
+        assert manifest.find_upload("first") is not None
+        assert manifest.find_upload("second") is not None
@@ -0,0 +1,62 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import threading
+
+from kedro_neptune.file_uploader import FileUploader
+
+
+class TestFileUploader:
+    def test_largest_files_first(self):
+        uploaded = []
+        jobs = [(name, size, lambda name=name: uploaded.append(name)) for name, size in [("a", 1), ("b", 3), ("c", 2)]]
+
+        FileUploader(max_workers=1).run(jobs)
+
+        assert uploaded == ["b", "c", "a"]
+
+    def test_failures_do_not_stop_other_uploads(self):
+        uploaded = []
+
+        def fail():
+            raise IOError("connection reset")
+
+        uploader = FileUploader(max_workers=4)
+        results = uploader.run(
+            [("broken", 10, fail)] + [(f"file_{i}", i, lambda i=i: uploaded.append(i)) for i in range(5)]
+        )
+
+        assert sorted(uploaded) == list(range(5))
+        assert list(uploader.failures) == ["broken"]
+        assert "connection reset" in uploader.failures["broken"]
+        assert (uploader.completed, uploader.total) == (6, 6)
+        assert sorted(result.to_dict()["status"] for result in results) == ["done"] * 5 + ["failed"]
+
+    def test_uploads_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        jobs = [(f"file_{i}", 1, barrier.wait) for i in range(3)]
+        progress = []
+
+        uploader = FileUploader(max_workers=3)
+        uploader.run(jobs, on_done=progress.append)
+
+        assert not uploader.failures
+        assert len(progress) == 3
+
+    def test_result_reports_enqueue_latency(self):
+        (result,) = FileUploader(max_workers=1).run([("model", 5, lambda: None)])
+
+        assert set(result.to_dict()) == {"status", "size", "enqueue_seconds"}
+        assert result.enqueue_seconds >= 0
@@ -0,0 +1,146 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+from kedro.io import MemoryDataset
+from kedro.io.core import Version
+from kedro.pipeline import (
+    Pipeline,
+    node,
+)
+from kedro.runner import (
+    SequentialRunner,
+    ThreadRunner,
+)
+from kedro_datasets.partitions import PartitionedDataset
+from kedro_datasets.pickle import PickleDataset
+
+from tests.kedro_neptune.utils.hook_utils import HookRunner
+
+calls = Counter()
+
+
+def double(x):
+    calls["double"] += 1
+    return x * 2
+
+
+def add_one(y):
+    calls["add_one"] += 1
+    return y + 1
+
+
+def make_frame(seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"value": rng.normal(seed, 1.0, size=1000)})
+
+
+def add_partition(name):
+    return {name: name}
+
+
+@pytest.fixture
+def hooks(monkeypatch, tmp_path):
+    calls.clear()
+    return HookRunner(monkeypatch, cache_dir=str(tmp_path / "cache"))
+
+
+def pipeline():
+    return Pipeline([node(double, "x", "y", name="double"), node(add_one, "y", "z", name="add_one")])
+
+
+@pytest.mark.parametrize("runner", [SequentialRunner, ThreadRunner])
+def test_cached_nodes_are_not_run(hooks, runner):
+    hooks.configure(cache_nodes=True)
+    cached_pipeline = pipeline()
+    functions = {node.name: node.func for node in cached_pipeline.nodes}
+
+    first = hooks.run(cached_pipeline, {"x": MemoryDataset(2)}, runner=runner())
+    second = hooks.run(cached_pipeline, {"x": MemoryDataset(2), "z": MemoryDataset()}, runner=runner())
+
+    assert calls == {"double": 1, "add_one": 1}
+    assert first["kedro/nodes/double/cache/status"] == "miss"
+    assert first["kedro/nodes/double/cache/stored"]
+    assert second["kedro/nodes/double/cache/status"] == "hit"
+    assert second["kedro/nodes/add_one/cache/status"] == "hit"
+    assert {node.name: node.func for node in cached_pipeline.nodes} == functions
+
+
+def test_cached_nodes_run_when_inputs_change(hooks):
+    hooks.configure(cache_nodes=True)
+
+    hooks.run(pipeline(), {"x": MemoryDataset(2)})
+    values = hooks.run(pipeline(), {"x": MemoryDataset(3)})
+
+    assert calls == {"double": 2, "add_one": 2}
+    assert values["kedro/nodes/add_one/cache/status"] == "miss"
+
+
+def test_async_logging(hooks):
+    hooks.configure(async_logging=True, flush_interval=0.1)
+
+    values = hooks.run(pipeline(), {"x": MemoryDataset(2)})
+
+    assert values["kedro/nodes/double/status"] == "done"
+    assert values["kedro/nodes/add_one/inputs"] == "['y']"
+    assert values["kedro/log"][-1] == "Finished pipeline"
+
+
+def test_concurrency_and_dataset_io(hooks):
+    hooks.configure(log_dataset_io=True, analyze_pipeline=True)
+
+    values = hooks.run(pipeline(), {"x": MemoryDataset(2)}, runner=ThreadRunner(2))
+
+    assert values["kedro/concurrency/thread_count"] >= 1
+    assert values["kedro/analysis/critical_path"] == "['double', 'add_one']"
+    assert values["kedro/catalog/io/x/load/count"] == 1
+
+
+def test_versions_and_lineage(hooks, tmp_path):
+    # Without a save version set by `KedroSession`, the version is generated by the save
+    versioned = PickleDataset(filepath=str(tmp_path / "y.pkl"), version=Version(None, None))
+
+    values = hooks.run(pipeline(), {"x": MemoryDataset(2), "y": versioned})
+
+    version = values["kedro/nodes/double/versions/outputs/y"]
+    assert values["kedro/nodes/add_one/versions/inputs/y"] == version
+    assert values["kedro/nodes/add_one/lineage/y"] == hooks.run_id
+
+
+def test_sketches_and_drift(hooks):
+    hooks.configure(sketch_datasets=True, detect_drift=True)
+    frame_pipeline = Pipeline([node(make_frame, "seed", "frame", name="make_frame")])
+
+    hooks.run(frame_pipeline, {"seed": MemoryDataset(0), "frame": MemoryDataset()})
+    first_run_id = hooks.run_id
+    values = hooks.run(frame_pipeline, {"seed": MemoryDataset(2), "frame": MemoryDataset()})
+
+    assert values["kedro/catalog/datasets/frame/profile/sketch/rows"] == 1000
+    assert values["kedro/catalog/datasets/frame/drift/baseline"] == first_run_id
+    assert values["kedro/catalog/datasets/frame/drift/max_psi"] > 1
+
+
+def test_partitions_saved_during_the_run(hooks, tmp_path):
+    parts = PartitionedDataset(path=str(tmp_path / "parts"), dataset="text.TextDataset", filename_suffix=".txt")
+    parts.save({"a": "a"})
+    partition_pipeline = Pipeline([node(add_partition, "name", "parts", name="add_partition")])
+
+    values = hooks.run(partition_pipeline, {"name": MemoryDataset("b"), "parts": parts})
+
+    assert values["kedro/catalog/datasets/parts/partitions/count"] == 2
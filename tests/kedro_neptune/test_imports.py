@@ -0,0 +1,75 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import subprocess
+import sys
+from typing import Dict
+
+# Modules that are imported on first use only
+LAZY_MODULES = ("neptune", "ruamel")
+
+# The Neptune client alone takes several seconds to import, the plugin takes about 0.1s on top of the Kedro CLI
+MAX_IMPORT_TIME = 1.0
+
+
+def _plugin_import_times() -> Dict[str, float]:
+    """Returns the cumulative import time in seconds of every module imported by the plugin on top of the Kedro CLI."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import kedro.framework.cli; import kedro_neptune"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+
+        # Modules are listed when they finish importing, so the Kedro CLI comes after all of its own imports
+        if name.strip() == "kedro.framework.cli":
+            times.clear()
+        else:
+            times[name.strip()] = int(cumulative) / 1e6
+
+    return times
+
+
+class TestImports:
+    def test_heavy_modules_are_not_imported(self):
+        times = _plugin_import_times()
+
+        assert "kedro_neptune" in times
+        assert [name for name in times if name.split(".")[0] in LAZY_MODULES] == []
+
+    def test_import_time(self):
+        assert _plugin_import_times()["kedro_neptune"] < MAX_IMPORT_TIME
+
+    def test_neptune_is_imported_on_first_use(self):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, kedro_neptune; "
+                "assert 'neptune' not in sys.modules; "
+                "from kedro_neptune.neptune_client import neptune_client; "
+                "assert neptune_client().File.__module__.startswith('neptune')",
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,157 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import io
+import os
+from collections import defaultdict
+from unittest import mock
+
+import pytest
+from neptune.exceptions import StreamAlreadyUsedException
+from neptune.types import File
+
+from kedro_neptune.journal import (
+    Journal,
+    list_journals,
+    read_journal_metadata,
+    sync_journal,
+)
+
+
+class FakeHandler:
+    def __init__(self, run, path):
+        self._run = run
+        self._path = path
+
+    def append(self, value):
+        self._run.series[self._path].append(value)
+
+    def extend(self, values):
+        self._run.series[self._path].extend(values)
+
+    def upload(self, value):
+        with open(value.path, "rb") as uploaded_file:
+            self._run.files[self._path] = uploaded_file.read()
+
+
+class FakeRun:
+    def __init__(self, fail_after: int = None):
+        self.values = {}
+        self.series = defaultdict(list)
+        self.files = {}
+        self.syncs = 0
+        self._fail_after = fail_after
+
+    def __setitem__(self, path, value):
+        if self._fail_after is not None and len(self.values) >= self._fail_after:
+            raise ConnectionError("Neptune is not available")
+        self.values[path] = value
+
+    def __getitem__(self, path):
+        return FakeHandler(self, path)
+
+    def sync(self):
+        self.syncs += 1
+
+
+class TestJournal:
+    def test_replay(self, tmp_path):
+        source = tmp_path / "model.pkl"
+        source.write_bytes(b"model")
+
+        journal = Journal(directory=str(tmp_path / "journals"), run_id="run", project="workspace/project")
+        namespace = journal["kedro"]
+        namespace["parameters"] = {"model": {"alpha": 0.1}, "name": "iris"}
+        namespace["log"].append("line 1")
+        namespace["log"].extend(["line 2", "line 3"])
+        namespace["model"].upload(File(str(source)))
+        namespace["report"].upload(File.from_content(b"report", extension="html"))
+        journal["status"] = "done"
+        journal.stop()
+
+        # The journal keeps its own copy of uploaded files
+        source.write_bytes(b"changed")
+
+        run = FakeRun()
+        (path,) = list_journals(str(tmp_path / "journals"))
+
+        assert read_journal_metadata(path)["project"] == "workspace/project"
+        assert sync_journal(path, run) == 6
+        assert run.values == {"kedro/parameters": {"model": {"alpha": 0.1}, "name": "iris"}, "status": "done"}
+        assert run.series["kedro/log"] == ["line 1", "line 2", "line 3"]
+        assert run.files == {"kedro/model": b"model", "kedro/report": b"report"}
+
+    def test_streams_are_copied_in_chunks(self, tmp_path):
+        journal = Journal(directory=str(tmp_path), run_id="run")
+        stream_file = File.from_stream(io.BytesIO(b"abc" * 1000), extension="bin")
+        with mock.patch("kedro_neptune.journal.BLOB_CHUNK_SIZE", 64):
+            journal["binary"].upload(stream_file)
+        journal["text"].upload(File.from_stream(io.StringIO("text"), extension="txt"))
+        journal.stop()
+
+        run = FakeRun()
+        sync_journal(str(tmp_path / "run"), run)
+
+        assert run.files == {"binary": b"abc" * 1000, "text": b"text"}
+        with pytest.raises(StreamAlreadyUsedException):
+            stream_file.content
+
+    def test_segments_are_merged_in_order(self, tmp_path):
+        journal = Journal(directory=str(tmp_path), run_id="run", segment_size=100)
+
+        for i in range(50):
+            journal["log"].append(i)
+        journal.stop()
+
+        run = FakeRun()
+        sync_journal(str(tmp_path / "run"), run)
+
+        assert len([name for name in os.listdir(tmp_path / "run") if name.endswith(".jsonl")]) > 1
+        assert run.series["log"] == list(range(50))
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        journal = Journal(directory=str(tmp_path), run_id="run")
+        for i in range(10):
+            journal[f"values/{i}"] = i
+        journal.stop()
+
+        failing_run = FakeRun(fail_after=5)
+        with pytest.raises(ConnectionError):
+            sync_journal(str(tmp_path / "run"), failing_run, batch_size=2)
+
+        run = FakeRun()
+        applied = sync_journal(str(tmp_path / "run"), run, batch_size=2)
+
+        # Records of the last full batch were saved to the checkpoint, the rest is sent again
+        assert applied == 6
+        assert {**failing_run.values, **run.values} == {f"values/{i}": i for i in range(10)}
+        assert sync_journal(str(tmp_path / "run"), FakeRun()) == 0
+
+    def test_records_written_after_sync_are_sent_by_the_next_sync(self, tmp_path):
+        journal = Journal(directory=str(tmp_path), run_id="run")
+        journal["a"] = 1
+        journal.sync()
+
+        first_run = FakeRun()
+        sync_journal(str(tmp_path / "run"), first_run)
+
+        journal["b"] = 2
+        journal.stop()
+
+        second_run = FakeRun()
+        sync_journal(str(tmp_path / "run"), second_run)
+
+        assert first_run.values == {"a": 1}
+        assert second_run.values == {"b": 2}
@@ -0,0 +1,94 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from unittest import mock
+
+from kedro.io.core import Version
+from kedro_datasets.text import TextDataset
+
+from kedro_neptune import (
+    NeptuneFileDataset,
+    log_dataset_metadata,
+)
+from kedro_neptune.lineage import (
+    LineageIndex,
+    load_version,
+    save_version,
+)
+
+
+class TestLineageIndex:
+    def test_lookup(self, tmp_path):
+        LineageIndex(directory=str(tmp_path)).record(
+            name="models.classifier", version="2024-01-31T10.15.00.000Z", run_id="abc", project="a/b", node="train"
+        )
+
+        entry = LineageIndex(directory=str(tmp_path)).lookup(
+            name="models.classifier", version="2024-01-31T10.15.00.000Z"
+        )
+
+        assert (entry.run_id, entry.project, entry.node) == ("abc", "a/b", "train")
+        assert LineageIndex(directory=str(tmp_path)).lookup(name="models.classifier", version="other") is None
+
+    def test_later_runs_replace_the_entry(self, tmp_path):
+        index = LineageIndex(directory=str(tmp_path))
+        index.record(name="model", version="v1", run_id="first")
+        index.record(name="model", version="v1", run_id="second")
+
+        assert index.lookup(name="model", version="v1").run_id == "second"
+
+
+class TestVersions:
+    def test_versions_of_a_versioned_dataset(self, tmp_path):
+        path = str(tmp_path / "data.txt")
+        TextDataset(filepath=path, version=Version(None, "v1")).save("first")
+        TextDataset(filepath=path, version=Version(None, "v2")).save("second")
+
+        assert load_version(TextDataset(filepath=path, version=Version(None, "v3"))) == "v2"
+        assert load_version(TextDataset(filepath=path, version=Version("v1", "v3"))) == "v1"
+        assert save_version(TextDataset(filepath=path, version=Version(None, "v3"))) == "v3"
+
+    def test_versions_of_other_datasets(self, tmp_path):
+        path = str(tmp_path / "data.txt")
+
+        assert load_version(TextDataset(filepath=path)) is None
+        assert save_version(TextDataset(filepath=path)) is None
+        # No version saved yet
+        assert load_version(TextDataset(filepath=path, version=Version(None, "v1"))) is None
+        assert save_version(None) is None
+
+    def test_versioned_neptune_file_dataset(self, tmp_path):
+        path = str(tmp_path / "model.pkl")
+        NeptuneFileDataset(filepath=path, version=Version(None, "v1")).save(b"model")
+
+        dataset = NeptuneFileDataset(filepath=path, version=Version(None, "v2"))
+
+        assert dataset.load() == b"model"
+        assert dataset.location.endswith("model.pkl/v1/model.pkl")
+        assert (
+            NeptuneFileDataset(filepath=str(tmp_path / "new.pkl"), version=Version(None, "v1"))._describe()["extension"]
+            == "pkl"
+        )
+
+
+def test_dataset_metadata_versions(tmp_path):
+    namespace = mock.MagicMock()
+
+    log_dataset_metadata(namespace, "data", TextDataset(filepath=str(tmp_path / "a.txt"), version=Version(None, "v1")))
+    log_dataset_metadata(namespace, "other", TextDataset(filepath=str(tmp_path / "b.txt")))
+
+    logged = {call.args[0]: call.args[1] for call in namespace.__setitem__.call_args_list}
+    assert {key: str(value) for key, value in logged["data"]["version"].items()} == {"save": "v1"}
+    assert str(logged["other"]["version"]) == "None"
@@ -0,0 +1,202 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import functools
+import importlib.util
+import os
+
+import numpy as np
+from kedro.io.core import Version
+from kedro.pipeline import node
+from kedro_datasets.text import TextDataset
+
+from kedro_neptune.file_manifest import FileManifest
+from kedro_neptune.node_cache import (
+    NodeCache,
+    dataset_fingerprint,
+    function_fingerprint,
+    node_fingerprint,
+    read_fingerprints,
+    replay_function,
+    value_fingerprint,
+    write_fingerprints,
+)
+
+
+def add(first, second):
+    return first + second
+
+
+def split(value):
+    return {"low": value - 1, "high": value + 1}
+
+
+def subtract(first, second):
+    return first - second
+
+
+class TestNodeCache:
+    def test_entries_are_shared_between_instances(self, tmp_path):
+        manifest = FileManifest(directory=str(tmp_path), project=None, run_id=None)
+        NodeCache(directory=str(tmp_path), max_size=1024, manifest=manifest).put(
+            fingerprint="a", outputs={"sum": 3}, execution_time=1.5
+        )
+
+        cache = NodeCache(directory=str(tmp_path), max_size=1024, manifest=manifest)
+
+        assert cache.get("a") == ({"sum": 3}, 1.5)
+        assert cache.get("b") is None
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        cache = NodeCache(
+            directory=str(tmp_path),
+            max_size=600,
+            manifest=FileManifest(directory=str(tmp_path), project=None, run_id=None),
+        )
+
+        for index, fingerprint in enumerate(["a", "b"]):
+            cache.put(fingerprint=fingerprint, outputs={"data": b"x" * 200}, execution_time=None)
+            os.utime(tmp_path / f"{fingerprint}.pkl", ns=(index, index))
+        # Reading an entry makes it the most recently used one
+        assert cache.get("a") is not None
+        cache.put(fingerprint="c", outputs={"data": b"x" * 200}, execution_time=None)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_outputs_larger_than_the_cache_are_not_stored(self, tmp_path):
+        cache = NodeCache(
+            directory=str(tmp_path),
+            max_size=100,
+            manifest=FileManifest(directory=str(tmp_path), project=None, run_id=None),
+        )
+
+        assert not cache.put(fingerprint="a", outputs={"data": b"x" * 200}, execution_time=None)
+        assert not cache.put(fingerprint="b", outputs={"data": lambda: None}, execution_time=None)
+        assert cache.get("a") is None
+
+
+class TestFingerprints:
+    def test_function_fingerprint(self):
+        assert function_fingerprint(add) == function_fingerprint(add)
+        assert function_fingerprint(add) != function_fingerprint(subtract)
+        assert function_fingerprint(functools.partial(add, 1)) != function_fingerprint(functools.partial(add, 2))
+
+    def test_write_and_read_fingerprints(self, tmp_path):
+        directory = str(tmp_path / "fingerprints")
+
+        write_fingerprints(directory, {"sum": "a"})
+        write_fingerprints(directory, {"sum": "b", "low": "c"})
+
+        assert read_fingerprints(directory, remove=True) == {"sum": "b", "low": "c"}
+        assert read_fingerprints(directory) == {}
+
+    def test_value_fingerprint(self):
+        assert value_fingerprint({"a": [1, 2]}) == value_fingerprint({"a": [1, 2]})
+        assert value_fingerprint({"a": [1, 2]}) != value_fingerprint({"a": [1, 3]})
+        assert value_fingerprint(lambda: None) is None
+
+    def test_value_fingerprint_of_arrays_is_bounded(self):
+        array = np.arange(1000, dtype=np.int64)
+
+        assert value_fingerprint(array) == value_fingerprint(array.copy())
+        assert value_fingerprint(array) != value_fingerprint(array[::-1].copy())
+        assert value_fingerprint(array, max_size=array.nbytes + 1024) is not None
+        assert value_fingerprint(array, max_size=array.nbytes) is None
+
+    def test_function_fingerprint_depends_on_the_module(self, tmp_path):
+        module_path = tmp_path / "nodes.py"
+
+        def fingerprint(helper_source):
+            module_path.write_text(f"def helper():\n    {helper_source}\n\ndef run():\n    return helper()\n")
+            os.utime(module_path, ns=(0, len(helper_source)))
+            spec = importlib.util.spec_from_file_location("nodes", module_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return function_fingerprint(module.run)
+
+        assert fingerprint("return 1") == fingerprint("return 1")
+        assert fingerprint("return 1") != fingerprint("return 22")
+
+    def test_node_fingerprint_depends_on_inputs_and_outputs(self):
+        fingerprint = node_fingerprint(function="f", inputs={"a": "1", "b": "2"}, outputs=["c"])
+
+        assert fingerprint == node_fingerprint(function="f", inputs={"b": "2", "a": "1"}, outputs=["c"])
+        assert fingerprint != node_fingerprint(function="f", inputs={"a": "1", "b": "3"}, outputs=["c"])
+        assert fingerprint != node_fingerprint(function="f", inputs={"a": "1", "b": "2"}, outputs=["d"])
+
+    def test_local_file_fingerprint_follows_content(self, tmp_path):
+        path = tmp_path / "data.txt"
+        path.write_text("first")
+        dataset = TextDataset(filepath=str(path))
+        manifest = FileManifest(directory=str(tmp_path), project=None, run_id=None)
+
+        first = dataset_fingerprint(dataset, manifest)
+        path.write_text("second")
+        os.utime(path, ns=(1, 1))
+
+        assert first is not None
+        assert dataset_fingerprint(dataset, manifest) != first
+
+    def test_remote_file_fingerprint_is_the_entity_tag(self, tmp_path, monkeypatch):
+        manifest = FileManifest(directory=str(tmp_path), project=None, run_id=None)
+        dataset = TextDataset(filepath="memory://bucket/a.txt")
+        info = {"type": "file", "size": 1, "ETag": '"1"'}
+        monkeypatch.setattr(dataset._fs, "info", lambda path: info)
+
+        first = dataset_fingerprint(dataset, manifest)
+        info["ETag"] = '"2"'
+
+        assert first is not None
+        assert dataset_fingerprint(dataset, manifest) != first
+
+    def test_versioned_dataset_fingerprint_is_the_version(self, tmp_path):
+        manifest = FileManifest(directory=str(tmp_path), project=None, run_id=None)
+        path = str(tmp_path / "data.txt")
+        TextDataset(filepath=path, version=Version(None, "v1")).save("data")
+
+        fingerprint = dataset_fingerprint(TextDataset(filepath=path, version=Version("v1", None)), manifest)
+
+        assert "v1" in fingerprint
+        assert dataset_fingerprint(None, manifest) is None
+
+
+class TestReplayFunction:
+    def test_replays_list_outputs(self):
+        original = node(add, ["a", "b"], "sum")
+        replayed = node(add, ["a", "b"], "sum")
+        replayed.func = replay_function(replayed.func, node_outputs=replayed._outputs, outputs={"sum": 10})
+
+        assert replayed.run({"a": 1, "b": 2}) == {"sum": 10}
+        assert replayed.short_name == original.short_name
+
+    def test_replays_dict_outputs_and_inputs(self):
+        replayed = node(split, {"value": "x"}, {"low": "low_value", "high": "high_value"})
+        inputs = replayed.inputs
+        replayed.func = replay_function(
+            replayed.func, node_outputs=replayed._outputs, outputs={"low_value": 0, "high_value": 2}
+        )
+
+        assert replayed.run({"x": 1}) == {"low_value": 0, "high_value": 2}
+        assert replayed.inputs == inputs
+
+    def test_replays_partial_functions(self):
+        original = node(functools.partial(add, 1), "a", "sum")
+        replayed = node(functools.partial(add, 1), "a", "sum")
+        replayed.func = replay_function(replayed.func, node_outputs=replayed._outputs, outputs={"sum": 10})
+
+        assert replayed.run({"a": 1}) == {"sum": 10}
+        assert replayed.short_name == original.short_name
@@ -0,0 +1,58 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import tracemalloc
+
+from kedro_neptune.node_profiler import NodeProfiler
+
+
+class TestNodeProfiler:
+    def test_cpu_and_memory(self):
+        profiler = NodeProfiler()
+
+        profiler.start("node")
+        sum(i * i for i in range(200_000))
+        profile = profiler.stop("node")
+
+        assert profile["cpu_user_time"] + profile["cpu_system_time"] > 0
+        assert profile["cpu_utilization"] >= 0
+        assert profile["peak_rss"] > 0
+        assert profile["peak_rss_delta"] >= 0
+        assert "allocations" not in profile
+
+    def test_allocations(self):
+        profiler = NodeProfiler(trace_allocations=True, top_allocations=3)
+
+        try:
+            profiler.start("node")
+            data = [bytearray(1024) for _ in range(1000)]
+            profile = profiler.stop("node")
+        finally:
+            profiler.close()
+
+        allocations = profile["allocations"]
+        assert len(data) == 1000
+        assert allocations["peak"] >= 1024 * 1000
+        assert allocations["net"] >= 1024 * 1000
+        assert len(allocations["top"]) <= 3
+        assert allocations["top"]["1"]["site"].startswith(__file__)
+        assert not tracemalloc.is_tracing()
+
+    def test_sampling(self):
+        profiler = NodeProfiler(sample_rate=0.0)
+
+        profiler.start("node")
+
+        assert profiler.stop("node") is None
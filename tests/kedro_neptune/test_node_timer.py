@@ -0,0 +1,97 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import threading
+import time
+
+from kedro_neptune.node_timer import (
+    NodeInterval,
+    NodeTimer,
+)
+
+
+class TestNodeTimer:
+    def test_same_node_name_in_several_threads(self):
+        timer = NodeTimer()
+        barrier = threading.Barrier(4)
+        results = []
+
+        def run_node():
+            timer.start("node")
+            barrier.wait()
+            time.sleep(0.05)
+            results.append(timer.stop("node").duration)
+
+        threads = [threading.Thread(target=run_node) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = timer.stats()
+
+        assert len(results) == 4
+        assert all(result >= 0.05 for result in results)
+        assert stats["thread_count"] == 4
+        assert stats["max_concurrent_nodes"] == 4
+        assert stats["mean_concurrent_nodes"] > 1
+        assert sum(thread["nodes"] for thread in stats["threads"].values()) == 4
+
+    def test_sequential_nodes(self):
+        timer = NodeTimer()
+
+        for name in ("a", "b", "c"):
+            timer.start(name)
+            timer.stop(name)
+
+        stats = timer.stats()
+
+        assert [interval.name for interval in timer.intervals()] == ["a", "b", "c"]
+        assert stats["thread_count"] == 1
+        assert stats["max_concurrent_nodes"] == 1
+
+    def test_stats_with_worker_intervals(self):
+        timer = NodeTimer()
+        worker_intervals = [
+            NodeInterval(name=name, start=start, end=start + 2 * 10**9, pid=pid, thread_id=1, thread_name="MainThread")
+            for name, start, pid in [("a", 0, 101), ("b", 0, 102), ("c", 2 * 10**9, 101)]
+        ]
+
+        stats = timer.stats(worker_intervals)
+
+        assert os.getpid() not in (101, 102)
+        assert stats["threads"] == {
+            "MainThread (pid 101)": {"nodes": 2, "busy_time": 4.0},
+            "MainThread (pid 102)": {"nodes": 1, "busy_time": 2.0},
+        }
+        assert stats["max_concurrent_nodes"] == 2
+        assert stats["mean_concurrent_nodes"] == 1.5
+        assert stats["wall_time"] == 4.0
+
+    def test_stop_without_start(self):
+        timer = NodeTimer()
+
+        assert timer.stop("node") is None
+        assert timer.stats() == {}
+
+    def test_reset(self):
+        timer = NodeTimer()
+        timer.start("node")
+        timer.stop("node")
+
+        timer.reset()
+
+        assert timer.intervals() == []
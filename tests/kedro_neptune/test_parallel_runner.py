@@ -13,9 +13,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import os
+import threading
+from unittest import mock
+
+import numpy as np
+import pandas as pd
 import pytest
+from kedro.io import MemoryDataset
+from kedro.pipeline import (
+    Pipeline,
+    node,
+)
 from kedro.runner import ParallelRunner
 
+from kedro_neptune.coordinator import (
+    COORDINATOR_ADDRESS_ENV_NAME,
+    COORDINATOR_PID_ENV_NAME,
+    Coordinator,
+    CoordinatorClient,
+    coordinator_address,
+)
+from tests.kedro_neptune.utils.hook_utils import HookRunner
 from tests.kedro_neptune.utils.kedro_utils import run_pipeline
 from tests.kedro_neptune.utils.run_utils import assert_structure
 
@@ -24,3 +43,144 @@ from tests.kedro_neptune.utils.run_utils import assert_structure
 def test_run():
     run_pipeline(project="planets", run_params={"runner": ParallelRunner(2)})
     assert_structure()
+
+
+def double(x):
+    return x * 2
+
+
+def add_one(y):
+    return y + 1
+
+
+def make_frame(seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"value": rng.normal(seed, 1.0, size=1000)})
+
+
+def pipeline():
+    return Pipeline(
+        [
+            node(double, "x", "y", name="double"),
+            node(add_one, "y", "z", name="add_one"),
+            node(make_frame, "x", "frame", name="make_frame"),
+        ]
+    )
+
+
+@pytest.fixture
+def hooks(monkeypatch, tmp_path):
+    return HookRunner(monkeypatch, cache_dir=str(tmp_path / "cache"), coordinator=True)
+
+
+def test_cached_nodes(hooks):
+    hooks.configure(cache_nodes=True)
+    cached_pipeline = pipeline()
+    functions = {node.name: node.func for node in cached_pipeline.nodes}
+
+    first = hooks.run(cached_pipeline, {"x": MemoryDataset(2)}, runner=ParallelRunner(2))
+    second = hooks.run(cached_pipeline, {"x": MemoryDataset(2)}, runner=ParallelRunner(2))
+
+    assert first["kedro/nodes/double/cache/status"] == "miss"
+    assert second["kedro/nodes/double/cache/status"] == "hit"
+    assert second["kedro/nodes/add_one/cache/status"] == "hit"
+    assert second["kedro/nodes/add_one/status"] == "done"
+    assert {node.name: node.func for node in cached_pipeline.nodes} == functions
+
+
+def test_worker_metrics_are_merged(hooks):
+    hooks.configure(log_dataset_io=True, analyze_pipeline=True, log_timeline=True, sketch_datasets=True)
+
+    values = hooks.run(pipeline(), {"x": MemoryDataset(2)}, runner=ParallelRunner(2))
+
+    threads = {path: value for path, value in values.items() if path.startswith("kedro/concurrency/threads/")}
+    # Nodes run in the workers only
+    assert sum(value for path, value in threads.items() if path.endswith("/nodes")) == 3
+    assert all("(pid " in path for path in threads)
+    assert values["kedro/analysis/total_work"] > 0
+    assert values["kedro/catalog/io/x/load/count"] == 2
+    assert "kedro/timeline/trace" in values
+    assert values["kedro/catalog/datasets/frame/profile/sketch/rows"] == 1000
+
+
+def _send_records(address, authkey, worker):
+    client = CoordinatorClient(address, authkey, batch_size=10)
+    namespace = client["kedro"]
+
+    for i in range(25):
+        namespace[f"nodes/{worker}/step"] = i
+    namespace["log"].append(f"Finished {worker}")
+    namespace["values"].extend([1, 2, 3])
+    namespace["unpicklable"] = threading.Lock()
+
+    client.stop()
+
+
+class TestCoordinator:
+    def test_records_from_clients_are_applied(self):
+        records = []
+        coordinator = Coordinator(sink=records.append)
+        coordinator.export()
+
+        with mock.patch.dict(os.environ, {COORDINATOR_PID_ENV_NAME: "0"}):
+            address, authkey = coordinator_address()
+
+        workers = [threading.Thread(target=_send_records, args=(address, authkey, name)) for name in ("a", "b")]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        coordinator.close()
+
+        assert coordinator.connections == 2
+        assert coordinator.received == 2 * 27
+        assert [value for method, path, value in records if path == "kedro/nodes/a/step"] == list(range(25))
+        assert ("append", "kedro/log", "Finished b") in records
+        assert ("extend", "kedro/values", [1, 2, 3]) in records
+        assert not any(path == "kedro/unpicklable" for _, path, _ in records)
+
+    def test_address_is_not_visible_in_the_coordinator_process(self):
+        coordinator = Coordinator(sink=mock.Mock())
+        coordinator.export()
+
+        try:
+            assert coordinator_address() is None
+        finally:
+            coordinator.close()
+
+        assert COORDINATOR_ADDRESS_ENV_NAME not in os.environ
+
+    def test_sink_errors_do_not_stop_the_coordinator(self):
+        sink = mock.Mock(side_effect=[ValueError("invalid"), None])
+        coordinator = Coordinator(sink=sink)
+        coordinator.export()
+
+        with mock.patch.dict(os.environ, {COORDINATOR_PID_ENV_NAME: "0"}):
+            client = CoordinatorClient(*coordinator_address())
+
+        client["first"] = 1
+        client["second"] = 2
+        client.stop()
+        coordinator.close()
+
+        assert sink.call_count == 2
+        assert coordinator.received == 2
+
+    def test_missing_paths_are_claimed_by_one_client(self):
+        records = []
+        coordinator = Coordinator(sink=records.append, exists=lambda path: path == "logged")
+        coordinator.export()
+
+        with mock.patch.dict(os.environ, {COORDINATOR_PID_ENV_NAME: "0"}):
+            first, second = CoordinatorClient(*coordinator_address()), CoordinatorClient(*coordinator_address())
+
+        first["pending"] = 1
+        answers = [first.exists("logged"), first.exists("files/a"), second.exists("files/a"), first.exists("files/a")]
+        sent_before_the_answer = list(records)
+        first.stop()
+        second.stop()
+        coordinator.close()
+
+        assert answers == [True, False, True, True]
+        assert sent_before_the_answer == [("assign", "pending", 1)]
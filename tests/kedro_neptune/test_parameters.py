@@ -0,0 +1,55 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from kedro_neptune.parameters import (
+    encode_parameters,
+    find_parameter,
+)
+
+
+def test_encode_parameters():
+    encoded = encode_parameters(
+        {
+            "travel_speed": 10000,
+            "model": {"learning_rate": 0.1, "layers": [64, 32], "options": {}, "seed": None},
+            "enabled": True,
+        }
+    )
+
+    assert encoded == {
+        "travel_speed": 10000,
+        "model": {"learning_rate": 0.1, "layers": {"0": 64, "1": 32}, "options": "{}", "seed": "None"},
+        "enabled": True,
+    }
+
+
+def test_encode_large_tree():
+    parameters = {f"group_{i}": {f"leaf_{j}": j for j in range(100)} for i in range(100)}
+
+    encoded = encode_parameters(parameters)
+
+    assert sum(len(group) for group in encoded.values()) == 10_000
+    assert encoded["group_99"]["leaf_99"] == 99
+
+
+def test_find_parameter():
+    encoded = encode_parameters({"model": {"learning_rate": 0.1, "layers": [64]}, "a.b": 1})
+
+    assert find_parameter(encoded, "model.learning_rate") == 0.1
+    assert find_parameter(encoded, "model") == {"learning_rate": 0.1, "layers": {"0": 64}}
+    assert find_parameter(encoded, "a.b") == 1
+    assert find_parameter(encoded, "model.missing") is None
+    assert find_parameter(encoded, "model.learning_rate.value") is None
+    assert find_parameter({}, "model") is None
@@ -0,0 +1,193 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from unittest import mock
+
+from kedro.io import DataCatalog
+from kedro_datasets.partitions import (
+    IncrementalDataset,
+    PartitionedDataset,
+)
+from kedro_datasets.text import TextDataset
+
+from kedro_neptune import (
+    NeptuneFileDataset,
+    log_data_catalog_metadata,
+    log_file_datasets,
+    partition_file_datasets,
+)
+from kedro_neptune.catalog_index import CatalogIndex
+from kedro_neptune.partitions import (
+    PartitionLister,
+    is_partitioned,
+    sample_partitions,
+)
+
+
+def _dataset(path, dataset_type=PartitionedDataset):
+    return dataset_type(path=str(path), dataset="text.TextDataset", filename_suffix=".txt")
+
+
+def _save(path, partition_ids):
+    _dataset(path).save({partition_id: partition_id for partition_id in partition_ids})
+
+
+class TestPartitionLister:
+    def test_listing(self, tmp_path):
+        _save(tmp_path / "parts", ["day=1/a", "day=1/b", "day=2/a"])
+        dataset = _dataset(tmp_path / "parts")
+
+        listing = PartitionLister(cache_dir=str(tmp_path / "cache")).list(name="parts", dataset=dataset)
+
+        expected = sorted(dataset._path_to_partition(path) for path in dataset._list_partitions())
+        assert sorted(listing.partitions) == expected == ["day=1/a", "day=1/b", "day=2/a"]
+        assert listing.to_dict() == {
+            "count": 3,
+            "total_size": 21,
+            "new": 3,
+            "new_partitions": "day=1/a, day=1/b, day=2/a",
+        }
+
+    def test_new_partitions_and_unchanged_directories(self, tmp_path):
+        _save(tmp_path / "parts", ["day=1/a", "day=2/a"])
+        dataset = _dataset(tmp_path / "parts")
+        PartitionLister(cache_dir=str(tmp_path / "cache")).list(name="parts", dataset=dataset)
+        _save(tmp_path / "parts", ["day=2/b"])
+
+        filesystem = type(dataset._filesystem)
+        with mock.patch.object(filesystem, "ls", autospec=True, side_effect=filesystem.ls) as ls:
+            listing = PartitionLister(cache_dir=str(tmp_path / "cache")).list(name="parts", dataset=dataset)
+
+        assert listing.new == ["day=2/b"]
+        assert len(listing.partitions) == 3
+        # Only the directory with the new partition is listed again
+        assert [call.args[1].rsplit("/", 1)[-1] for call in ls.call_args_list] == ["day=2"]
+
+    def test_listings_are_reused_until_invalidated(self, tmp_path):
+        _save(tmp_path / "parts", ["a"])
+        dataset = _dataset(tmp_path / "parts")
+        lister = PartitionLister()
+
+        assert len(lister.list(name="parts", dataset=dataset).partitions) == 1
+        _save(tmp_path / "parts", ["b"])
+        assert len(lister.list(name="parts", dataset=dataset).partitions) == 1
+
+        assert lister.invalidate("parts")
+        assert not lister.invalidate("other")
+
+        assert len(lister.list(name="parts", dataset=dataset).partitions) == 2
+
+    def test_partitions_added_during_the_run(self, tmp_path):
+        _save(tmp_path / "parts", ["a"])
+        PartitionLister(cache_dir=str(tmp_path / "cache")).list(name="parts", dataset=_dataset(tmp_path / "parts"))
+        _save(tmp_path / "parts", ["b"])
+
+        lister = PartitionLister(cache_dir=str(tmp_path / "cache"))
+        first = lister.list(name="parts", dataset=_dataset(tmp_path / "parts"))
+        _save(tmp_path / "parts", ["c"])
+        lister.invalidate("parts")
+        second = lister.list(name="parts", dataset=_dataset(tmp_path / "parts"))
+
+        assert (first.new, first.added) == (["b"], ["b"])
+        # New partitions are still compared with the previous run
+        assert (sorted(second.new), second.added) == (["b", "c"], ["c"])
+
+    def test_incremental_dataset_checkpoint(self, tmp_path):
+        _save(tmp_path / "parts", ["1", "2", "3"])
+        dataset = _dataset(tmp_path / "parts", dataset_type=IncrementalDataset)
+        dataset.load()
+        dataset.confirm()
+        _save(tmp_path / "parts", ["4"])
+
+        listing = PartitionLister().list(name="parts", dataset=_dataset(tmp_path / "parts", IncrementalDataset))
+
+        assert listing.checkpoint == "3"
+        assert listing.pending == 1
+        assert len(listing.partitions) == 4
+
+    def test_is_partitioned(self, tmp_path):
+        assert is_partitioned(_dataset(tmp_path, dataset_type=IncrementalDataset))
+        assert not is_partitioned(TextDataset(filepath=str(tmp_path / "a.txt")))
+
+
+def test_sample_partitions():
+    partition_ids = [str(index) for index in range(100)]
+
+    sample = sample_partitions(partition_ids, limit=10)
+
+    assert len(sample) == 10
+    assert sample == sorted(sample) == sample_partitions(partition_ids, limit=10)
+    assert sample_partitions(["b", "a"], limit=10) == ["a", "b"]
+
+
+def test_partition_file_datasets(tmp_path):
+    _save(tmp_path / "parts", ["a", "b", "c"])
+    dataset = _dataset(tmp_path / "parts")
+    listing = PartitionLister().list(name="parts@neptune", dataset=dataset)
+
+    datasets = partition_file_datasets("parts@neptune", dataset, listing, limit=2)
+
+    assert len(datasets) == 2
+    name, file_dataset = datasets[0]
+    assert isinstance(file_dataset, NeptuneFileDataset)
+    assert file_dataset.streaming
+    assert file_dataset.load() == name.rsplit("/", 1)[-1].encode()
+
+
+def test_partitions_are_not_listed_by_the_dataset(tmp_path):
+    _save(tmp_path / "parts", ["a", "b"])
+    catalog = DataCatalog({"parts": _dataset(tmp_path / "parts"), "empty": _dataset(tmp_path / "empty")})
+    namespace = mock.MagicMock()
+    namespace["catalog"].container.exists.return_value = False
+
+    with mock.patch.object(PartitionedDataset, "_list_partitions", side_effect=AssertionError):
+        log_data_catalog_metadata(namespace=namespace, catalog=catalog, lister=PartitionLister())
+
+    logged = {call.args[0]: call.args[1] for call in namespace["catalog"].__setitem__.call_args_list}
+    assert logged["datasets/parts/partitions"]["count"] == 2
+    assert "datasets/empty/partitions" not in logged
+
+
+def test_partitions_saved_during_the_run_are_logged_and_uploaded(tmp_path):
+    _save(tmp_path / "parts", ["a"])
+    catalog = DataCatalog({"parts": _dataset(tmp_path / "parts"), "parts@neptune": _dataset(tmp_path / "parts")})
+    index = CatalogIndex()
+    index.reset(catalog._datasets.keys())
+    lister = PartitionLister()
+    namespace = mock.MagicMock()
+    namespace["catalog"].container.exists.return_value = False
+
+    with mock.patch("kedro_neptune.log_file_datasets", wraps=log_file_datasets) as log_files:
+        log_data_catalog_metadata(
+            namespace=namespace, catalog=catalog, index=index, lister=lister, partition_files_limit=10
+        )
+
+        # What `after_dataset_saved` does when a node saves partitions
+        _save(tmp_path / "parts", ["b"])
+        assert lister.invalidate("parts")
+        index.mark_changed(["parts"])
+        log_data_catalog_metadata(
+            namespace=namespace,
+            catalog=catalog,
+            index=index,
+            dataset_names=index.pop_dirty(),
+            lister=lister,
+            partition_files_limit=10,
+        )
+
+    logged = [call.args for call in namespace["catalog"].__setitem__.call_args_list]
+    assert [value["count"] for key, value in logged if key == "datasets/parts/partitions"] == [1, 2]
+    uploaded = [[name for name, _ in call.kwargs["datasets"]] for call in log_files.call_args_list]
+    assert uploaded == [["parts@neptune/a"], ["parts@neptune/b"]]
@@ -0,0 +1,64 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pytest
+from kedro.pipeline import (
+    Pipeline,
+    node,
+)
+
+from kedro_neptune.pipeline_analysis import analyze_pipeline
+
+
+def identity(*args):
+    return args[0]
+
+
+@pytest.fixture
+def pipeline():
+    # a -> b -> d and a -> c -> d
+    return Pipeline(
+        [
+            node(identity, "raw", "x", name="a"),
+            node(identity, "x", "y", name="b"),
+            node(identity, "x", "z", name="c"),
+            node(identity, ["y", "z"], "out", name="d"),
+        ]
+    )
+
+
+class TestAnalyzePipeline:
+    def test_critical_path_and_slack(self, pipeline):
+        analysis = analyze_pipeline(pipeline, durations={"a": 1.0, "b": 5.0, "c": 2.0, "d": 1.0}, wall_time=9.0)
+
+        assert analysis["critical_path"] == ["a", "b", "d"]
+        assert analysis["critical_path_length"] == 7.0
+        assert analysis["total_work"] == 9.0
+        assert analysis["slack"] == {"a": 0.0, "b": 0.0, "c": 3.0, "d": 0.0}
+        assert analysis["achieved_parallelism"] == 1.0
+
+    def test_speedup(self, pipeline):
+        analysis = analyze_pipeline(pipeline, durations={"a": 1.0, "b": 5.0, "c": 2.0, "d": 1.0})
+
+        assert analysis["speedup"]["1"] == 1.0
+        assert analysis["speedup"]["2"] == pytest.approx(9.0 / 7.0)
+        assert set(analysis["speedup"]) == {"1", "2", "4"}
+        assert analysis["max_speedup"] == pytest.approx(9.0 / 7.0)
+
+    def test_missing_durations(self, pipeline):
+        analysis = analyze_pipeline(pipeline, durations={})
+
+        assert analysis["critical_path_length"] == 0.0
+        assert analysis["speedup"]["1"] == 1.0
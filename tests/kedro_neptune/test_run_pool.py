@@ -0,0 +1,60 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from unittest import mock
+
+from kedro_neptune.run_pool import RunPool
+
+
+class TestRunPool:
+    def test_acquire_reuses_run(self):
+        pool = RunPool()
+        factory = mock.Mock(side_effect=lambda: mock.Mock())
+
+        runs = [pool.acquire(key="run", factory=factory) for _ in range(100)]
+
+        assert factory.call_count == 1
+        assert all(run is runs[0] for run in runs)
+        assert pool.created == 1
+
+    def test_close_stops_run(self):
+        pool = RunPool()
+        run = pool.acquire(key="run", factory=mock.Mock)
+
+        pool.close("run")
+
+        run.stop.assert_called_once()
+        assert pool.get("run") is None
+
+    def test_close_all(self):
+        pool = RunPool()
+        first = pool.acquire(key="first", factory=mock.Mock)
+        second = pool.acquire(key="second", factory=mock.Mock)
+
+        pool.close_all()
+        pool.close_all()
+
+        first.stop.assert_called_once()
+        second.stop.assert_called_once()
+
+    def test_drops_runs_inherited_from_parent_process(self):
+        pool = RunPool()
+        inherited = pool.acquire(key="run", factory=mock.Mock)
+
+        with mock.patch("os.getpid", return_value=-1):
+            assert pool.get("run") is None
+            assert pool.acquire(key="run", factory=mock.Mock) is not inherited
+
+        inherited.stop.assert_not_called()
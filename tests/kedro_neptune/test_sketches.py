@@ -0,0 +1,186 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import numpy as np
+import pandas as pd
+import pytest
+
+from kedro_neptune.sketches import (
+    CountMinSketch,
+    DatasetSketch,
+    HyperLogLog,
+    TDigest,
+    hash_values,
+    read_sketches,
+    write_sketch,
+)
+
+
+class TestHyperLogLog:
+    @pytest.mark.parametrize("distinct", [10, 1000, 200_000])
+    def test_count(self, distinct):
+        sketch = HyperLogLog()
+        sketch.update(hash_values(np.arange(distinct, dtype="int64").repeat(2)))
+
+        assert sketch.count() == pytest.approx(distinct, rel=0.03)
+
+    def test_merge(self):
+        first, second, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        first.update(hash_values(np.arange(0, 60_000)))
+        second.update(hash_values(np.arange(40_000, 100_000)))
+        both.update(hash_values(np.arange(0, 100_000)))
+
+        first.merge(second)
+
+        assert np.array_equal(first.registers, both.registers)
+
+    def test_precision_is_bounded(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(precision=20)
+
+
+class TestTDigest:
+    def test_quantiles(self):
+        values = np.random.default_rng(0).normal(size=500_000)
+        digest = TDigest()
+        for chunk in np.array_split(values, 7):
+            digest.update(chunk)
+
+        estimates = digest.quantile([0.01, 0.5, 0.99])
+
+        assert estimates == pytest.approx(np.quantile(values, [0.01, 0.5, 0.99]), abs=0.02)
+        assert digest.count == len(values)
+        assert len(digest.means) <= digest.compression / 2 + 1
+
+    def test_extremes_are_exact(self):
+        digest = TDigest()
+        digest.update(np.array([3.0, np.nan, -1.0, 2.0]))
+
+        assert digest.quantile([0.0, 1.0]).tolist() == [-1.0, 3.0]
+        assert digest.count == 3
+
+
+class TestCountMinSketch:
+    def test_estimates_are_never_below_the_counts(self):
+        values = np.random.default_rng(0).zipf(1.5, size=100_000)
+        sketch = CountMinSketch(width=256)
+        sketch.update(hash_values(values))
+
+        unique, counts = np.unique(values, return_counts=True)
+        estimates = sketch.estimate(hash_values(unique))
+
+        assert np.all(estimates >= counts)
+        assert estimates[0] == pytest.approx(counts[0], rel=0.01)
+
+    def test_width_is_a_power_of_two(self):
+        with pytest.raises(ValueError):
+            CountMinSketch(width=1000)
+
+
+class TestHashValues:
+    def test_strings_hash_alike_in_every_container(self):
+        strings = ["a", "bb", "a", "ccc"]
+        hashes = hash_values(pd.Series(strings))
+
+        assert hashes[0] == hashes[2] != hashes[1]
+        assert list(hash_values(np.array(strings))) == list(hashes)
+        assert list(hash_values(np.array(strings, dtype=object))) == list(hashes)
+
+    def test_strings_are_hashed_without_pandas(self, monkeypatch):
+        monkeypatch.setattr("kedro_neptune.sketches._pandas", lambda: None)
+
+        first = hash_values(np.array(["a", "bb", "a", "a longer string"]))
+        second = hash_values(np.array(["bb", "a"], dtype=object))
+
+        assert first[0] == first[2] == second[1]
+        assert first[1] == second[0]
+        assert len(set(first.tolist())) == 3
+
+    def test_other_objects_are_hashed_by_their_representation(self):
+        hashes = hash_values(np.array([(1, 2), "a", (1, 2)], dtype=object))
+
+        assert hashes[0] == hashes[2] != hashes[1]
+
+
+class TestDatasetSketch:
+    @staticmethod
+    def frame(rows, seed):
+        rng = np.random.default_rng(seed)
+        return pd.DataFrame(
+            {
+                "value": rng.normal(size=rows),
+                "key/name": rng.choice(["a", "b", "c", None], p=[0.6, 0.2, 0.1, 0.1], size=rows),
+            }
+        )
+
+    def test_summary(self):
+        sketch = DatasetSketch()
+        sketch.update(self.frame(10_000, seed=0))
+        summary = sketch.summary()
+
+        assert summary["rows"] == 10_000
+        assert summary["chunks"] == 1
+        assert summary["column"]["value"]["distinct"] == pytest.approx(10_000, rel=0.03)
+        assert summary["column"]["value"]["quantiles"]["p50"] == pytest.approx(0.0, abs=0.05)
+        assert summary["column"]["key_name"]["distinct"] == 3
+        assert summary["column"]["key_name"]["nulls"] == pytest.approx(1000, rel=0.1)
+        assert summary["column"]["key_name"]["top_values"]["0"]["value"] == "a"
+        assert "quantiles" not in summary["column"]["key_name"]
+
+    def test_merged_sketches_equal_the_sketch_of_the_concatenated_chunks(self):
+        first, second = self.frame(5000, seed=1), self.frame(5000, seed=2)
+        merged, concatenated = DatasetSketch(), DatasetSketch()
+        merged.update(first)
+        other = DatasetSketch()
+        other.update(second)
+        merged.merge(other)
+        concatenated.update({"first": first, "second": second})
+
+        summary, expected = merged.summary(), concatenated.summary()
+
+        assert summary["chunks"] == expected["chunks"] == 2
+        assert summary["column"]["key_name"] == expected["column"]["key_name"]
+        for statistic in ["count", "nulls", "distinct", "min", "max"]:
+            assert summary["column"]["value"][statistic] == expected["column"]["value"][statistic]
+        # Centroids depend on the order in which values are merged
+        assert summary["column"]["value"]["quantiles"] == pytest.approx(
+            expected["column"]["value"]["quantiles"], abs=0.05
+        )
+
+    def test_serialization(self):
+        sketch = DatasetSketch()
+        sketch.update(self.frame(1000, seed=0))
+
+        assert DatasetSketch.from_bytes(sketch.to_bytes()).summary() == sketch.summary()
+
+    def test_other_data_and_lazy_partitions_are_not_sketched(self):
+        sketch = DatasetSketch()
+
+        assert not sketch.update(b"data")
+        assert not sketch.update({"partition": lambda: np.zeros(3)})
+        assert sketch.update(np.zeros((3, 2)))
+        assert list(sketch.summary()["column"]) == ["0", "1"]
+
+    def test_files(self, tmp_path):
+        for seed in range(3):
+            sketch = DatasetSketch()
+            sketch.update(self.frame(100, seed=seed))
+            write_sketch(str(tmp_path / "sketches"), name="data", sketch=sketch)
+
+        sketches = read_sketches(str(tmp_path / "sketches"), remove=True)
+
+        assert [name for name, _ in sketches] == ["data"] * 3
+        assert sum(sketch.rows for _, sketch in sketches) == 300
+        assert read_sketches(str(tmp_path / "sketches")) == []
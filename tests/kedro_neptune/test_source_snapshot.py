@@ -0,0 +1,128 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import zipfile
+
+import pytest
+
+from kedro_neptune.file_manifest import FileManifest
+from kedro_neptune.source_snapshot import (
+    GitIgnore,
+    SourceSnapshot,
+)
+
+PATTERNS = ["**/*.py", "conf/base/*.yml"]
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    for path in (
+        "src/package/__init__.py",
+        "src/package/nodes.py",
+        "src/package/generated/model.py",
+        "conf/base/catalog.yml",
+        "conf/local/credentials.yml",
+        "data/01_raw/iris.csv",
+        "venv/lib/site.py",
+        "setup.py",
+    ):
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(path)
+
+    (root / ".gitignore").write_text("venv/\n# comment\n")
+    (root / "src/package/.gitignore").write_text("generated\n")
+
+    return root
+
+
+def _snapshot(project, tmp_path):
+    return SourceSnapshot(root=str(project), patterns=PATTERNS, cache_dir=str(tmp_path / "cache"))
+
+
+class TestGitIgnore:
+    def test_rules(self):
+        gitignore = GitIgnore("*.pyc\n/build\nlogs/\n!logs/keep.txt\ndocs/**/*.md\n")
+
+        assert gitignore.match("src/module.pyc", is_directory=False)
+        assert gitignore.match("build", is_directory=True)
+        assert gitignore.match("src/build", is_directory=True) is None
+        assert gitignore.match("logs", is_directory=True)
+        assert gitignore.match("logs", is_directory=False) is None
+        assert gitignore.match("logs/keep.txt", is_directory=False) is False
+        assert gitignore.match("docs/api/index.md", is_directory=False)
+        assert gitignore.match("src/module.py", is_directory=False) is None
+
+
+class TestSourceSnapshot:
+    def test_files(self, project, tmp_path):
+        assert _snapshot(project, tmp_path).files() == [
+            "conf/base/catalog.yml",
+            "setup.py",
+            "src/package/__init__.py",
+            "src/package/nodes.py",
+        ]
+
+    def test_unchanged_directories_are_not_listed_again(self, project, tmp_path):
+        first = _snapshot(project, tmp_path)
+        first.files()
+        first.save()
+
+        (project / "src/package/nodes.py").write_text("changed")
+        (project / "src/package/pipeline.py").write_text("new")
+        second = _snapshot(project, tmp_path)
+
+        assert "src/package/pipeline.py" in second.files()
+        assert second.listed_dirs == 1
+
+    def test_unchanged_snapshot_has_the_same_hash(self, project, tmp_path):
+        manifest = FileManifest(directory=str(tmp_path / "cache"), project="a/b", run_id="run")
+
+        first_digest, files = _snapshot(project, tmp_path).scan(manifest)
+        second_digest, _ = _snapshot(project, tmp_path).scan(manifest)
+        (project / "setup.py").write_text("changed")
+        third_digest, _ = _snapshot(project, tmp_path).scan(manifest)
+
+        assert first_digest == second_digest != third_digest
+        assert files["setup.py"]["size"] == len("setup.py")
+
+    def test_archive(self, project, tmp_path):
+        manifest = FileManifest(directory=str(tmp_path / "cache"), project="a/b", run_id="run")
+        snapshot = _snapshot(project, tmp_path)
+        first_archive = snapshot.archive(*snapshot.scan(manifest))
+
+        (project / "setup.py").write_text("changed")
+        second_archive = snapshot.archive(*snapshot.scan(manifest))
+
+        with zipfile.ZipFile(second_archive) as archive:
+            assert archive.read("setup.py") == b"changed"
+            assert len(archive.namelist()) == 4
+        assert not os.path.exists(first_archive)
+
+    def test_files_outside_of_the_root_are_archived_under_external(self, project, tmp_path):
+        (tmp_path / "shared").mkdir()
+        (tmp_path / "shared" / "utils.py").write_text("shared")
+        manifest = FileManifest(directory=str(tmp_path / "cache"), project="a/b", run_id="run")
+        snapshot = SourceSnapshot(
+            root=str(project), patterns=["../shared/*.py", "src/../setup.py"], cache_dir=str(tmp_path / "cache")
+        )
+
+        archive_path = snapshot.archive(*snapshot.scan(manifest))
+
+        external_path = f"external/{str(tmp_path / 'shared' / 'utils.py').lstrip('/')}"
+        with zipfile.ZipFile(archive_path) as archive:
+            assert sorted(archive.namelist()) == sorted([external_path, "setup.py"])
+            assert archive.read(external_path) == b"shared"
@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import json
+import time
+
+from kedro_neptune.node_timer import NodeInterval
+from kedro_neptune.timeline import (
+    chrome_trace,
+    gantt_html,
+    read_intervals,
+    write_intervals,
+)
+
+INTERVALS = [
+    NodeInterval(name="a", start=1_000_000, end=3_000_000, pid=1, thread_id=10, thread_name="MainThread"),
+    NodeInterval(name="b", start=2_000_000, end=5_000_000, pid=2, thread_id=20, thread_name="MainThread"),
+    NodeInterval(name="</script>", start=3_000_000, end=4_000_000, pid=1, thread_id=10, thread_name="MainThread"),
+]
+
+
+def test_write_and_read_intervals(tmp_path):
+    directory = str(tmp_path / "timeline")
+
+    write_intervals(directory, INTERVALS[:1])
+    write_intervals(directory, INTERVALS[1:])
+
+    assert read_intervals(directory, remove=True) == INTERVALS
+    assert read_intervals(directory) == []
+
+
+def test_chrome_trace():
+    trace = json.loads(chrome_trace(INTERVALS))
+
+    nodes = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    threads = [event for event in trace["traceEvents"] if event["name"] == "thread_name"]
+
+    assert [(event["name"], event["pid"], event["tid"]) for event in nodes] == [
+        ("a", 1, 10),
+        ("b", 2, 20),
+        ("</script>", 1, 10),
+    ]
+    assert nodes[0]["ts"] == 0
+    assert nodes[1]["ts"] == 1000
+    assert nodes[1]["dur"] == 3000
+    assert len(threads) == 2
+
+
+def test_gantt_html():
+    html = gantt_html(INTERVALS)
+
+    assert html.count("</script>") == 1
+    assert '"lanes": ["pid 1 / MainThread", "pid 2 / MainThread"]' in html
+
+
+def test_large_timeline():
+    intervals = [
+        NodeInterval(name=f"node_{i}", start=i * 1000, end=i * 1000 + 500, pid=i % 8, thread_id=i % 8, thread_name="t")
+        for i in range(10_000)
+    ]
+
+    start = time.perf_counter()
+    chrome_trace(intervals)
+    gantt_html(intervals)
+
+    assert time.perf_counter() - start < 5
@@ -13,12 +13,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import json
+import os
 from unittest import mock
 from unittest.mock import patch
 
+import pytest
+
 from kedro_neptune.utils import (
     ensure_bool,
     get_kedro_env,
+    write_bytes_atomically,
+    write_json_atomically,
 )
 
 
@@ -80,3 +86,25 @@ class TestGetKedroEnv:
                 config_loader_args={"default_run_env": "default", "base_env": "base"},
                 expected="argv",
             )
+
+
+class TestWriteAtomically:
+    def test_write_json_atomically(self, tmp_path):
+        path = str(tmp_path / "cache" / "listing.json")
+
+        write_json_atomically(path, {"a": 1})
+        write_json_atomically(path, {"b": 2})
+
+        with open(path) as listing_file:
+            assert json.load(listing_file) == {"b": 2}
+        assert os.listdir(tmp_path / "cache") == ["listing.json"]
+
+    def test_failed_write_leaves_the_file_unchanged(self, tmp_path):
+        path = str(tmp_path / "entry.pkl")
+        write_bytes_atomically(path, b"entry")
+
+        with pytest.raises(TypeError):
+            write_json_atomically(path, {"value": object()})
+
+        assert (tmp_path / "entry.pkl").read_bytes() == b"entry"
+        assert os.listdir(tmp_path) == ["entry.pkl"]
@@ -0,0 +1,129 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import threading
+from collections import defaultdict
+
+import pytest
+
+from kedro_neptune.writer import AsyncWriter
+
+
+class FakeHandler:
+    def __init__(self, run, path):
+        self._run = run
+        self._path = path
+
+    def append(self, value):
+        self._run.series[self._path].append(value)
+
+    def upload(self, value):
+        self._run.files[self._path] = value
+
+
+class FakeRun:
+    def __init__(self, delay: threading.Event = None):
+        self.values = {}
+        self.series = defaultdict(list)
+        self.files = {}
+        self._delay = delay
+
+    def __setitem__(self, path, value):
+        if self._delay is not None:
+            self._delay.wait()
+        self.values[path] = value
+
+    def __getitem__(self, path):
+        return FakeHandler(self, path)
+
+
+class TestAsyncWriter:
+    def test_records_are_applied_in_order(self):
+        run = FakeRun()
+        writer = AsyncWriter(run=run, max_in_flight=10, flush_interval=0.01)
+        namespace = writer.namespace("kedro")
+
+        for i in range(100):
+            namespace["log"].append(f"line {i}")
+        namespace["nodes/a"]["status"] = "done"
+        namespace["structure"].upload("file")
+        writer.close()
+
+        assert run.series["kedro/log"] == [f"line {i}" for i in range(100)]
+        assert run.values["kedro/nodes/a/status"] == "done"
+        assert run.files["kedro/structure"] == "file"
+        assert writer.applied == writer.submitted == 102
+
+    def test_flush_waits_for_pending_records(self):
+        run = FakeRun()
+        writer = AsyncWriter(run=run, max_in_flight=1000, flush_interval=60)
+
+        writer.namespace()["status"] = "done"
+
+        assert writer.flush(timeout=5)
+        assert run.values["status"] == "done"
+        writer.close()
+
+    def test_drop_oldest(self):
+        blocker = threading.Event()
+        run = FakeRun(delay=blocker)
+        writer = AsyncWriter(run=run, max_in_flight=2, flush_interval=60, backpressure="drop_oldest")
+        namespace = writer.namespace()
+
+        for i in range(10):
+            namespace[f"value/{i}"] = i
+        blocker.set()
+        writer.close()
+
+        assert writer.dropped > 0
+        assert writer.applied + writer.dropped == 10
+        assert run.values["value/9"] == 9
+
+    def test_spill_to_disk(self):
+        blocker = threading.Event()
+        run = FakeRun(delay=blocker)
+        writer = AsyncWriter(run=run, max_in_flight=1, flush_interval=60, backpressure="spill")
+        namespace = writer.namespace()
+
+        for i in range(50):
+            namespace[f"value/{i}"] = i
+        blocker.set()
+        writer.close()
+
+        assert run.values == {f"value/{i}": i for i in range(50)}
+        assert writer.dropped == 0
+
+    def test_unpicklable_records_are_applied_after_spilled_ones(self):
+        blocker = threading.Event()
+        run = FakeRun(delay=blocker)
+        writer = AsyncWriter(run=run, max_in_flight=1, flush_interval=60, backpressure="spill")
+        namespace = writer.namespace()
+        lock = threading.Lock()
+
+        namespace["first"] = 0
+        for i in range(5):
+            namespace["log"].append(i)
+        # Waits until the spilled records are taken by the flusher, which is blocked by the first record
+        threading.Timer(0.2, blocker.set).start()
+        namespace["log"].append(lock)
+        for i in range(5, 10):
+            namespace["log"].append(i)
+        writer.close()
+
+        assert run.series["log"] == [0, 1, 2, 3, 4, lock, 5, 6, 7, 8, 9]
+
+    def test_invalid_backpressure(self):
+        with pytest.raises(ValueError):
+            AsyncWriter(run=FakeRun(), backpressure="ignore")
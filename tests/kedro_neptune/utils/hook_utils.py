@@ -0,0 +1,141 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = ["HookRunner"]
+
+import dataclasses
+import itertools
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+from kedro.framework.hooks.manager import _create_hook_manager
+from kedro.io import (
+    AbstractDataset,
+    DataCatalog,
+    MemoryDataset,
+)
+from kedro.pipeline import Pipeline
+from kedro.runner import (
+    AbstractRunner,
+    SequentialRunner,
+)
+
+import kedro_neptune
+from kedro_neptune import neptune_hooks
+from kedro_neptune.config import NeptuneConfig
+from kedro_neptune.neptune_client import CUSTOM_RUN_ID_ENV_NAME
+from kedro_neptune.run_pool import run_pool
+
+_run_ids = itertools.count()
+
+
+def _values(run: Any) -> Dict[str, Any]:
+    """Returns the values of all the fields of a run in debug mode, by path."""
+    values = {}
+
+    def visit(structure: Dict[str, Any], prefix: str) -> None:
+        for key, attribute in structure.items():
+            path = f"{prefix}{key}"
+            if isinstance(attribute, dict):
+                visit(attribute, f"{path}/")
+            elif hasattr(attribute, "fetch_values"):
+                series = attribute.fetch_values(include_timestamp=False)
+                values[path] = series["value"].tolist() if "value" in series else []
+            elif hasattr(attribute, "fetch"):
+                values[path] = attribute.fetch()
+            else:
+                # Files and file sets
+                values[path] = attribute
+
+    visit(run.get_structure(), "")
+    return values
+
+
+class HookRunner:
+    """Runs pipelines with the plugin hooks, as a `KedroSession` does, logging to Neptune runs in debug mode.
+
+    The configuration is taken from the `config` attribute instead of the project configuration files.
+    Patches are made with `monkeypatch`, and are inherited by `ParallelRunner` workers, which are forked.
+
+    Args:
+        monkeypatch: Pytest `monkeypatch` fixture.
+        cache_dir: Cache directory of the plugin.
+        options: Options of the configuration.
+    """
+
+    def __init__(self, monkeypatch: Any, cache_dir: str, **options: Any):
+        self.config = NeptuneConfig(
+            api_token="",
+            project="workspace/project",
+            base_namespace="kedro",
+            source_files=[],
+            enabled=True,
+            dependencies=None,
+            cache_dir=cache_dir,
+            **options,
+        )
+        self.run_id: Optional[str] = None
+        self._runs = []
+        self._monkeypatch = monkeypatch
+
+        init_run = kedro_neptune._init_run
+
+        def init_debug_run(config: NeptuneConfig, run_id: str, **kwargs: Any) -> Any:
+            run = init_run(config, run_id, **{**kwargs, "mode": "debug", "capture_hardware_metrics": False})
+            self._runs.append(run)
+            return run
+
+        def stop(run: Any, companion: Any) -> None:
+            # Runs are stopped once their values are read
+            if companion is not None:
+                companion.close()
+
+        monkeypatch.setattr(kedro_neptune, "get_neptune_config", lambda settings: self.config)
+        monkeypatch.setattr(kedro_neptune, "_init_run", init_debug_run)
+        monkeypatch.setattr(run_pool, "_stop", stop)
+        monkeypatch.setenv("NEPTUNE_API_TOKEN", "")
+        monkeypatch.setenv("NEPTUNE_PROJECT", "")
+
+    def configure(self, **options: Any) -> None:
+        self.config = dataclasses.replace(self.config, **options)
+
+    def run(
+        self, pipeline: Pipeline, datasets: Dict[str, AbstractDataset], runner: Optional[AbstractRunner] = None
+    ) -> Dict[str, Any]:
+        """Runs the pipeline and returns the values logged to the Neptune run of the main process, by path."""
+        self.run_id = f"run-{next(_run_ids)}"
+        self._monkeypatch.setenv(CUSTOM_RUN_ID_ENV_NAME, self.run_id)
+
+        catalog = DataCatalog({"parameters": MemoryDataset({}), **datasets})
+        hook_manager = _create_hook_manager()
+        hook_manager.register(neptune_hooks)
+
+        neptune_hooks.after_catalog_created(catalog=catalog)
+        neptune_hooks.before_pipeline_run(run_params={}, pipeline=pipeline, catalog=catalog)
+        try:
+            (runner or SequentialRunner()).run(pipeline, catalog, hook_manager)
+        except Exception:
+            neptune_hooks.on_pipeline_error(catalog=catalog)
+            raise
+        neptune_hooks.after_pipeline_run(pipeline=pipeline, catalog=catalog)
+
+        run = self._runs.pop()
+        try:
+            return _values(run)
+        finally:
+            run.stop()